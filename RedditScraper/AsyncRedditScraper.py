@@ -0,0 +1,220 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+import aiohttp
+import orjson
+
+from .RedditComment import RedditComment
+from .RedditPost import RedditPost
+from .RedditScraper import RedditScraper
+
+
+class AsyncRedditScraper:
+    """asyncio variant of RedditScraper that runs several Reddit requests concurrently
+    over one pooled HTTP session
+
+    Authentication is not repeated here: the caller passes the headers (User-Agent
+    and bearer token) of an already-authenticated RedditScraper. Use as an async
+    context manager so the underlying connection pool is closed afterwards:
+
+        async with AsyncRedditScraper(scraper.headers) as reddit:
+            posts_by_source = await reddit.fetch_sources(
+                {q: reddit.search_keyword_in_reddit("new", q) for q in ["btc", "bitcoin"]}
+            )
+    """
+
+    def __init__(self, headers: dict, max_connections: int = 8, timeout: float = 10):
+        """
+        Parameters:
+        headers: Request headers, including the Authorization bearer token
+        max_connections: Size of the shared connection pool
+        timeout: Total timeout (in seconds) for each request
+        """
+        self.headers = dict(headers)
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self.session = None
+
+    async def _get_raw(self, url: str, params: dict = None) -> bytes:
+        """GETs a Reddit API URL on the shared session and returns the raw body."""
+        async with self.session.get(url, params=params) as response:
+            return await response.read()
+
+    async def get_posts_from_subreddit(
+        self,
+        sort: str,
+        subreddit: str,
+        time: str = "",
+        limit: int = 10,
+        after: str = "",
+    ) -> List[RedditPost]:
+        """Returns a list of posts from a specified subreddit
+
+        Parameters:
+            sort: What to sort the posts by (can be one of "top", "new",
+                  "rising", "hot", or "controversial")
+            subreddit: Name of subreddit to get posts from
+            time: Timeframe of posts (ONLY REQUIRED IF sort in ["top", "controversial"])
+            limit: Number of posts to return
+            after: The full name of the last post from the previous page
+
+        Returns:
+            A list of RedditPosts
+
+        Raises:
+            ValueError: Propogates the ValueError raised by RedditScraper.validate_params()
+        """
+        RedditScraper.validate_params(
+            sort=[sort, "posts_in_subreddit"], limit=limit, subreddit=subreddit
+        )
+
+        params = {"limit": limit, "after": after}
+        if sort == "top" or sort == "controversial":
+            RedditScraper.validate_params(time=time)
+            params["t"] = time
+
+        res = await self._get_raw(
+            f"https://oauth.reddit.com/r/{subreddit}/{sort}.json", params=params
+        )
+        return RedditScraper.parse_post_listing(res)
+
+    async def search_keyword_in_reddit(
+        self,
+        sort: str,
+        keyword: str,
+        time: str = "",
+        limit: int = 10,
+        after: str = "",
+    ) -> List[RedditPost]:
+        """Returns posts most relevant to a keyword in all of Reddit
+
+        Parameters:
+            sort: What to sort the posts by (can be one of "relevance", "hot", "top",
+                  "new", or "comments")
+            keyword: Keyword to search posts by
+            time: Timeframe of posts (ONLY REQUIRED IF sort in ["relevance", "top",
+                  "comments"])
+            limit: Number of posts to return
+            after: The full name of the last post from the previous page
+
+        Returns:
+            A list of RedditPosts
+
+        Raises:
+            ValueError: Propogates the ValueError raised by RedditScraper.validate_params()
+        """
+        RedditScraper.validate_params(
+            keyword=keyword, limit=limit, sort=[sort, "keywords_in_reddit"]
+        )
+
+        params = {
+            "q": "+".join(keyword.strip().split(" ")),
+            "limit": limit,
+            "sort": sort,
+            "after": after,
+        }
+        if sort in ["relevance", "top", "comments"]:
+            RedditScraper.validate_params(time=time)
+            params["t"] = time
+
+        res = await self._get_raw("https://oauth.reddit.com/search.json", params=params)
+        return RedditScraper.parse_post_listing(res)
+
+    async def get_comments_from_post(
+        self, sort: str, subreddit: str, depth: int, post_id: str, limit: int
+    ) -> List[RedditComment]:
+        """Returns the top-level comments of a post
+
+        Parameters:
+            sort: What to sort the comments by (can be one of "confidence" (best),
+                 "top", "new", "controversial", or "old")
+            subreddit: Name of the subreddit that the post was created in
+            depth: Maximum depth of subtrees in the thread
+            post_id: Unique ID Reddit assigns to every post
+            limit: Number of comments to return
+
+        Returns:
+            A list of RedditComments
+
+        Raises:
+            ValueError: Propogates the ValueError raised by RedditScraper.validate_params()
+        """
+        RedditScraper.validate_params(
+            limit=limit,
+            post_id=post_id,
+            depth=depth,
+            subreddit=subreddit,
+            sort=[sort, "comments_in_post"],
+        )
+
+        res = orjson.loads(
+            await self._get_raw(
+                f"https://oauth.reddit.com/r/{subreddit}/comments/{post_id}",
+                params={"limit": limit, "sort": sort, "depth": depth},
+            )
+        )
+
+        # Top-level children are comments ("t1") plus a trailing "more" stub
+        return [
+            RedditComment.from_api(child["data"], depth=0)
+            for child in res[1]["data"]["children"]
+            if child.get("kind") == "t1"
+        ]
+
+    async def fetch_sources(
+        self, sources: Dict[str, object]
+    ) -> Dict[str, List[RedditPost]]:
+        """
+        Awaits several post-fetching coroutines concurrently.
+
+        Parameters:
+            sources: Mapping of a caller-chosen source key to an un-awaited coroutine
+                     returned by one of the methods above
+
+        Returns:
+            A mapping of the same keys to their posts. A source that fails (network
+            error, Reddit error body, ...) is logged and maps to an empty list, so one
+            bad source never sinks the whole feed.
+        """
+        keys = list(sources)
+        results = await asyncio.gather(*sources.values(), return_exceptions=True)
+
+        posts_by_source = {}
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                logging.warning("Reddit source %r failed: %r", key, result)
+                result = []
+            posts_by_source[key] = result
+        return posts_by_source
+
+
+def merge_posts(posts_by_source: Dict[str, List[RedditPost]]) -> List[RedditPost]:
+    """
+    Merges posts from several sources into one feed, dropping duplicates.
+
+    Sources are interleaved round-robin so every source keeps its own ranking and none
+    of them crowds the others out of the first screen. A post that appears in more than
+    one source (same ``fullname``) is kept only at its first position.
+    """
+    merged = []
+    seen = set()
+    queues = [list(posts) for posts in posts_by_source.values()]
+    for i in range(max((len(q) for q in queues), default=0)):
+        for queue in queues:
+            if i < len(queue) and queue[i].fullname not in seen:
+                seen.add(queue[i].fullname)
+                merged.append(queue[i])
+    return merged
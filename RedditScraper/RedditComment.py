@@ -1,13 +1,41 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
 class RedditComment:
-    """Class for storing information about a Reddit comment"""
-
-    def __init__(self, text: str, score: int):
-        """
-        Intialises the RedditComment object with the required data
-
-        Parameters:
-        text: Comment text
-        score: Net number of upvotes minus number of downvotes
-        """
-        self.text = text
-        self.score = score
+    """Class for storing information about a Reddit comment
+
+    Attributes:
+    text: Comment text
+    score: Net number of upvotes minus number of downvotes
+    id: Unique id Reddit associates with the comment
+    parent_id: Full name of the parent (a "t3_" post or a "t1_" comment)
+    depth: Nesting level of the comment (0 for top-level comments)
+    """
+
+    text: str
+    score: int
+    id: str = ""
+    parent_id: str = ""
+    depth: int = 0
+
+    @classmethod
+    def from_api(cls, data: dict, depth: int) -> "RedditComment":
+        """Builds a RedditComment from the "data" object of a Reddit "t1" thing."""
+        return cls(
+            text=data.get("body"),
+            score=data.get("ups"),
+            id=data.get("id", ""),
+            parent_id=data.get("parent_id", ""),
+            depth=depth,
+        )
+
+    def to_json(self) -> dict:
+        """Returns the comment as a JSON-serializable dict."""
+        return {
+            "text": self.text,
+            "score": self.score,
+            "id": self.id,
+            "parent_id": self.parent_id,
+            "depth": self.depth,
+        }
@@ -1,41 +1,55 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
 class RedditPost:
-    """Class for storing information about a Reddit post"""
+    """Class for storing information about a Reddit post
+
+    Attributes:
+    title: Post title
+    thumbnail: Thumbnail image if the video contains an image/video/gif ("" for text
+               posts)
+    content: Actual body content of the post
+    subreddit: Name of the subreddit the post was made in
+    score: Net number of upvotes minus number of downvotes
+    comment_count: Number of comments under the post
+    id: Unique id Reddit associates with the post
+    url: Reddit URL for the post
+    fullname: The full name of the post, which is used by Reddit's API for
+              pagination
+    timestamp: UNIX timestamp (in seconds) of when the post was created
+    """
+
+    title: str
+    thumbnail: str
+    content: str
+    subreddit: str
+    score: int
+    comment_count: int
+    id: str
+    url: str
+    fullname: str
+    timestamp: int
 
-    def __init__(
-        self,
-        title: str,
-        thumbnail: str,
-        content: str,
-        subreddit: str,
-        score: int,
-        comment_count: int,
-        id: str,
-        url: str,
-        fullname: str,
-        timestamp: int,
-    ):
+    def to_json(self, format_timestamp=None) -> dict:
         """
-        Intialises the RedditPost object
+        Returns the post as a JSON-serializable dict.
 
         Parameters:
-        title: Post title
-        thumbnail: Thumbnail image if the video contains an image/video/gif
-        content: Actual body content of the post
-        subreddit: Name of the subreddit the post was made in
-        score: Net number of upvotes minus number of downvotes
-        comment_count: Number of comments under the post
-        id: Unique id Reddit associates with the post
-        url: Reddit URL for the post
-        fullname: The full name of the post, which is used by Reddit's API for
-                  pagination
+        format_timestamp: Optional function applied to the UNIX timestamp (e.g. to
+                          render it as "3 hours ago")
         """
-        self.title = title
-        self.thumbnail = thumbnail
-        self.content = content
-        self.subreddit = subreddit
-        self.score = score
-        self.comment_count = comment_count
-        self.id = id
-        self.url = url
-        self.fullname = fullname
-        self.timestamp = timestamp
+        return {
+            "title": self.title,
+            "thumbnail": self.thumbnail,
+            "content": self.content,
+            "subreddit": self.subreddit,
+            "score": self.score,
+            "comment_count": self.comment_count,
+            "id": self.id,
+            "url": self.url,
+            "fullname": self.fullname,
+            "timestamp": (
+                format_timestamp(self.timestamp) if format_timestamp else self.timestamp
+            ),
+        }
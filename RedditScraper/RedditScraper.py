@@ -1,98 +1,50 @@
-import time
-from typing import List
+from collections import deque
+from typing import Iterator, List
 
+import orjson
 import requests
 
-from constants import (
-    REDDIT_CLIENT_ID,
-    REDDIT_PASSWORD,
-    REDDIT_SECRET_KEY,
-    REDDIT_USER_AGENT,
-    REDDIT_USERNAME,
-)
-
 from .RedditComment import RedditComment
 from .RedditPost import RedditPost
 from .RedditSub import RedditSub
+from .TokenManager import RedditTokenManager
 
 
 class RedditScraper:
     """Class for scraping posts, comments, subreddits, etc. from Reddit"""
 
-    def __init__(self):
+    def __init__(self, token_manager: RedditTokenManager = None):
         """
         Initialises an instance of the RedditScraper class with the necessary
-        authentication details for accessing the Reddit API. This constructor sets up
-        authentication parameters, retrieves an access token, and prepares the header
-        with the access token for future API requests.
-
-        Parameters:
-        client_id: The client ID provided by Reddit for API access
-        secret_key: The secret key provided by Reddit that pairs with the client ID
-        username: The Reddit account username used for authentication
-        password: The password corresponding to the Reddit account
-        user_agent: A string identifying the application making the request, typically
-                    formatted as 'appname/version'
-        """
-        # Creates an authentication object, which is used to securely pass user
-        # credentials to API services
-        self.auth = requests.auth.HTTPBasicAuth(REDDIT_CLIENT_ID, REDDIT_SECRET_KEY)
-
-        # Info needed to login to the Reddit API
-        self.data = {
-            "grant_type": "password",
-            "username": REDDIT_USERNAME,
-            "password": REDDIT_PASSWORD,
-        }
-
-        # Name + version of application making the request
-        self.headers = {"User-Agent": REDDIT_USER_AGENT}
-
-        response = requests.post(
-            "https://www.reddit.com/api/v1/access_token",
-            auth=self.auth,
-            data=self.data,
-            headers=self.headers,
-            timeout=10,
-        )
-
-        # Requests access token from Reddit API
-        try:
-            token_data = response.json()
-        except Exception as exc:
-            # Treat a failed token fetch as already expired so it is not cached/reused.
-            self.token_expires_at = 0
-            raise RuntimeError("Failed to obtain Reddit access token") from exc
-
-        access_token = (
-            token_data.get("access_token") if isinstance(token_data, dict) else None
-        )
+        authentication details for accessing the Reddit API.
 
-        # If the response was not successful or did not contain a usable token, fail
-        # loudly instead of proceeding with a "bearer None" header.
-        if response.status_code != 200 or not access_token:
-            # Treat a failed token fetch as already expired so it is not cached/reused.
-            self.token_expires_at = 0
-            raise RuntimeError("Failed to obtain Reddit access token")
+        Authentication is delegated to a RedditTokenManager. When a shared, already
+        started manager is passed in, construction is free and every request reads the
+        manager's current token (refreshed in the background before it expires).
+        Without one, a private manager is created and an access token is fetched
+        synchronously, as a standalone scraper always did.
 
-        # Reddit returns the token lifetime in seconds (typically 3600). Store an
-        # absolute expiry timestamp so callers can cache/reuse this scraper until
-        # the token is close to expiring.
-        expires_in = token_data.get("expires_in", 3600)
-        self.token_expires_at = time.time() + float(expires_in)
+        Parameters:
+        token_manager: Shared RedditTokenManager to read the access token from
 
-        self.access_token = access_token
+        Raises:
+        RuntimeError: If no token manager is given and the synchronous token fetch
+                      fails
+        """
+        if token_manager is None:
+            token_manager = RedditTokenManager()
+            token_manager.refresh()
+        self.token_manager = token_manager
 
-        # Adds access token to header so that subsequent requests to the Reddit API
-        # are made with the access token included
-        self.headers["Authorization"] = f"bearer {access_token}"
+    @property
+    def headers(self) -> dict:
+        """Request headers (User-Agent + bearer token) for the Reddit API."""
+        return self.token_manager.headers()
 
     def is_token_valid(self, leeway: float = 60) -> bool:
         """Returns True if a valid access token exists and is not within ``leeway``
         seconds of expiring."""
-        return self.access_token is not None and (
-            time.time() < self.token_expires_at - leeway
-        )
+        return self.token_manager.is_token_valid(leeway)
 
     def get_posts_from_subreddit(
         self, sort: str, subreddit: str, time: str = "", limit: int = 10
@@ -123,35 +75,15 @@ class RedditScraper:
                 f"https://oauth.reddit.com/r/{subreddit}/{sort}.json?limit={limit}&t={time}",
                 headers=self.headers,
                 timeout=10,
-            ).json()
+            )
         else:
             res = requests.get(
                 f"https://oauth.reddit.com/r/{subreddit}/{sort}.json?limit={limit}",
                 headers=self.headers,
                 timeout=10,
-            ).json()
-
-        posts = []
-
-        for post in res["data"]["children"]:
-            post = post["data"]
-            posts.append(
-                RedditPost(
-                    title=post["title"],
-                    thumbnail=(
-                        post["thumbnail"] if post["thumbnail"] != "self" else None
-                    ),
-                    content=post["selftext"],
-                    subreddit=post["subreddit_name_prefixed"],
-                    score=post["ups"],
-                    comment_count=post["num_comments"],
-                    id=post["id"],
-                    url=post["url"],
-                    timestamp=post["created_utc"],
-                )
             )
 
-        return posts
+        return RedditScraper.parse_post_listing(res.content)
 
     def search_keyword_in_subreddit(
         self, sort: str, subreddit: str, keyword: str, time: str = "", limit: int = 10
@@ -189,33 +121,15 @@ class RedditScraper:
                 f"https://oauth.reddit.com/r/{subreddit}/search?q={keyword}&limit={limit}&restrict_sr=on&sort={sort}&t={time}",
                 headers=self.headers,
                 timeout=10,
-            ).json()
+            )
         else:
             res = requests.get(
                 f"https://oauth.reddit.com/r/{subreddit}/search?q={keyword}&limit={limit}&restrict_sr=on&sort={sort}",
                 headers=self.headers,
                 timeout=10,
-            ).json()
-
-        posts = []
-
-        for post in res["data"]["children"]:
-            post = post["data"]
-            posts.append(
-                RedditPost(
-                    title=post["title"],
-                    thumbnail=post["thumbnail"],
-                    content=post["selftext"],
-                    subreddit=post["subreddit_name_prefixed"],
-                    score=post["ups"],
-                    comment_count=post["num_comments"],
-                    id=post["id"],
-                    url=post["url"],
-                    timestamp=post["created_utc"],
-                )
             )
 
-        return posts
+        return RedditScraper.parse_post_listing(res.content)
 
     def search_keyword_in_reddit(
         self,
@@ -272,53 +186,9 @@ class RedditScraper:
             params=params,
             headers=self.headers,
             timeout=10,
-        ).json()
-
-        posts = []
-
-        # Reddit error bodies (e.g. 401/429) do not contain a "data"/"children"
-        # structure, so validate the shape before indexing to avoid a KeyError.
-        if not isinstance(res, dict):
-            return []
-        data = res.get("data")
-        if not isinstance(data, dict):
-            return []
-        children = data.get("children")
-        if not isinstance(children, list):
-            return []
-
-        for post in children:
-            if not isinstance(post, dict):
-                continue
-            post = post.get("data")
-            if not isinstance(post, dict):
-                continue
-            thumbnail = post.get("thumbnail")
-            permalink = post.get("permalink")
-            posts.append(
-                RedditPost(
-                    title=post.get("title"),
-                    thumbnail=(
-                        thumbnail.replace("&amp;", "&")
-                        if isinstance(thumbnail, str)
-                        else thumbnail
-                    ),
-                    content=post.get("selftext"),
-                    subreddit=post.get("subreddit_name_prefixed"),
-                    score=post.get("ups"),
-                    comment_count=post.get("num_comments"),
-                    id=post.get("id"),
-                    url=(
-                        "https://www.reddit.com" + permalink
-                        if isinstance(permalink, str)
-                        else permalink
-                    ),
-                    fullname=post.get("name"),
-                    timestamp=post.get("created_utc"),
-                )
-            )
+        )
 
-        return posts
+        return RedditScraper.parse_post_listing(res.content)
 
     def search_for_subreddits(self, keyword: str, limit: int = 5) -> List[RedditSub]:
         """Returns subreddits most relevant to a keyword in all of Reddit
@@ -341,7 +211,8 @@ class RedditScraper:
             f"https://oauth.reddit.com/search.json?q={keyword}&type=sr&limit={limit}",
             headers=self.headers,
             timeout=10,
-        ).json()
+        ).content
+        res = orjson.loads(res)
 
         subreddits = []
 
@@ -361,7 +232,7 @@ class RedditScraper:
     def get_comments_from_post(
         self, sort: str, subreddit: str, depth: int, post_id: str, limit: int
     ) -> List[RedditComment]:
-        """Returns subreddits most relevant to a keyword in all of Reddit
+        """Returns the top-level comments of a post
 
         Parameters:
             sort: What to sort the comments by (can be one of "confidence" (best),
@@ -389,16 +260,200 @@ class RedditScraper:
             f"https://oauth.reddit.com/r/{subreddit}/comments/{post_id}?limit={limit}&sort={sort}&depth={depth}",
             headers=self.headers,
             timeout=10,
-        ).json()
+        ).content
+        res = orjson.loads(res)
+
+        # Top-level children are comments ("t1"), plus a "more" stub only when the
+        # thread has more comments than were returned
+        return [
+            RedditComment.from_api(child["data"], depth=0)
+            for child in res[1]["data"]["children"]
+            if child.get("kind") == "t1"
+        ]
+
+    def iter_comment_tree(
+        self,
+        sort: str,
+        subreddit: str,
+        post_id: str,
+        max_depth: int = 10,
+        max_comments: int = 500,
+        batch_size: int = 100,
+    ) -> Iterator[RedditComment]:
+        """Yields every comment of a post, walking nested replies and expanding the
+        collapsed "load more comments" nodes
+
+        Comments are yielded in thread (pre-)order as soon as they are parsed: first
+        everything contained in the initial thread response, then the comments behind
+        its "more" nodes, fetched ``batch_size`` ids at a time from /api/morechildren.
+        Only the ids of still-unexpanded "more" nodes are held between batches, so a
+        large thread can be consumed without materialising the whole tree.
+
+        Parameters:
+            sort: What to sort the comments by (can be one of "confidence" (best),
+                 "top", "new", "controversial", or "old")
+            subreddit: Name of the subreddit that the post was created in
+            post_id: Unique ID Reddit assigns to every post
+            max_depth: Deepest reply level to yield (top-level comments are depth 0)
+            max_comments: Maximum number of comments to yield in total
+            batch_size: Number of "more" ids expanded per request (Reddit allows 100)
+
+        Yields:
+            RedditComments, with ``id``, ``parent_id`` and ``depth`` filled in
+
+        Raises:
+            ValueError: Propogates the ValueError raised by RedditScraper.validate_params()
+        """
+        RedditScraper.validate_params(
+            limit=max_comments,
+            post_id=post_id,
+            depth=max_depth + 1,
+            subreddit=subreddit,
+            sort=[sort, "comments_in_post"],
+        )
+
+        res = orjson.loads(
+            requests.get(
+                f"https://oauth.reddit.com/r/{subreddit}/comments/{post_id}",
+                params={
+                    "sort": sort,
+                    "depth": max_depth + 1,
+                    "limit": max_comments,
+                    "raw_json": 1,
+                },
+                headers=self.headers,
+                timeout=10,
+            ).content
+        )
+
+        yielded = 0
+        pending_more = deque()
+
+        # Depth-first walk of the nested replies, using an explicit stack (reversed
+        # so children come out in thread order) instead of recursion
+        stack = [(node, 0) for node in reversed(res[1]["data"]["children"])]
+        while stack and yielded < max_comments:
+            node, depth = stack.pop()
+            if depth > max_depth:
+                continue
+            data = node.get("data", {})
+            if node.get("kind") == "more":
+                pending_more.extend(data.get("children", []))
+            elif node.get("kind") == "t1":
+                yield RedditComment.from_api(data, depth)
+                yielded += 1
+                replies = data.get("replies")
+                if isinstance(replies, dict):
+                    stack.extend(
+                        (child, depth + 1)
+                        for child in reversed(replies["data"]["children"])
+                    )
+
+        # Expand collapsed subtrees in batches. /api/morechildren returns a flat,
+        # pre-ordered list whose items carry their own depth; nested "more" nodes
+        # are queued for a later batch.
+        while pending_more and yielded < max_comments:
+            batch = [
+                pending_more.popleft()
+                for _ in range(min(batch_size, len(pending_more)))
+            ]
+            res = orjson.loads(
+                requests.get(
+                    "https://oauth.reddit.com/api/morechildren",
+                    params={
+                        "api_type": "json",
+                        "link_id": f"t3_{post_id}",
+                        "children": ",".join(batch),
+                        "sort": sort,
+                        "limit_children": "false",
+                        "raw_json": 1,
+                    },
+                    headers=self.headers,
+                    timeout=10,
+                ).content
+            )
+
+            for node in res.get("json", {}).get("data", {}).get("things", []):
+                data = node.get("data", {})
+                depth = data.get("depth", 0)
+                if depth > max_depth:
+                    continue
+                if node.get("kind") == "more":
+                    pending_more.extend(data.get("children", []))
+                elif node.get("kind") == "t1":
+                    yield RedditComment.from_api(data, depth)
+                    yielded += 1
+                    if yielded >= max_comments:
+                        return
+
+    @staticmethod
+    def parse_post_listing(res) -> List[RedditPost]:
+        """
+        Converts a Reddit listing response into a list of RedditPosts.
+
+        The raw body is decoded with orjson (several times faster than the stdlib json
+        module on Reddit's large listing documents), and only the ten fields a
+        RedditPost needs are read from each child; everything else in the ~100 keys
+        Reddit returns per post is ignored.
 
-        comments = []
-        length = len(res[1]["data"]["children"]) - 1
+        Parameters:
+            res: The raw (bytes/str) or already-decoded JSON body of a Reddit
+                 search/listing request
+
+        Returns:
+            A list of RedditPosts (empty if the body is not a listing, e.g. an error)
+        """
+        if isinstance(res, (bytes, bytearray, memoryview, str)):
+            try:
+                res = orjson.loads(res)
+            except orjson.JSONDecodeError:
+                return []
+
+        # Reddit error bodies (e.g. 401/429) do not contain a "data"/"children"
+        # structure, so validate the shape before indexing to avoid a KeyError.
+        if not isinstance(res, dict):
+            return []
+        data = res.get("data")
+        if not isinstance(data, dict):
+            return []
+        children = data.get("children")
+        if not isinstance(children, list):
+            return []
 
-        for i in range(length):
-            temp_comment = res[1]["data"]["children"][i]["data"]
-            comments.append(RedditComment(temp_comment["body"], temp_comment["ups"]))
+        posts = []
+        for post in children:
+            if not isinstance(post, dict):
+                continue
+            post = post.get("data")
+            if not isinstance(post, dict):
+                continue
+            get = post.get
+            thumbnail = get("thumbnail")
+            permalink = get("permalink")
+            if thumbnail == "self":
+                thumbnail = ""
+            elif isinstance(thumbnail, str):
+                thumbnail = thumbnail.replace("&amp;", "&")
+            posts.append(
+                RedditPost(
+                    title=get("title"),
+                    thumbnail=thumbnail,
+                    content=get("selftext"),
+                    subreddit=get("subreddit_name_prefixed"),
+                    score=get("ups"),
+                    comment_count=get("num_comments"),
+                    id=get("id"),
+                    url=(
+                        "https://www.reddit.com" + permalink
+                        if isinstance(permalink, str)
+                        else permalink
+                    ),
+                    fullname=get("name"),
+                    timestamp=get("created_utc"),
+                )
+            )
 
-        return comments
+        return posts
 
     def validate_params(
         limit: int = None,
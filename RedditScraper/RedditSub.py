@@ -1,17 +1,30 @@
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
 class RedditSub:
-    """Class for storing information about a Subreddit"""
+    """Class for storing information about a Subreddit
+
+    Attributes:
+    name: Name of the subreddit
+    description: Description/slogan associated with the subreddit
+    subscribers: Number of members/subscribers to the subreddit
+    url: URL of the subreddit (the relative path Reddit returns is made absolute)
+    """
+
+    name: str
+    description: str
+    subscribers: int
+    url: str
 
-    def __init__(self, name: str, description: str, subscribers: str, url: str):
-        """
-        Intialises the RedditSub object with the required data
+    def __post_init__(self):
+        self.url = "https://reddit.com/" + self.url
 
-        Parameters:
-        name: Name of the subreddit
-        description: Description/slogan associated with the subreddit
-        Subcribers: Number of members/subscribers to the subreddit
-        url: URL of the subreddit
-        """
-        self.name = name
-        self.description = description
-        self.subscribers = subscribers
-        self.url = "https://reddit.com/" + url
+    def to_json(self) -> dict:
+        """Returns the subreddit as a JSON-serializable dict."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "subscribers": self.subscribers,
+            "url": self.url,
+        }
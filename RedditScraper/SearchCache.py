@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List
+
+from .RedditPost import RedditPost
+
+
+class RedditSearchCache:
+    """TTL cache in front of paginated Reddit searches
+
+    Pages are keyed on the normalized query and the pagination cursor (``after``), so
+    everyone viewing the same coin shares one upstream request per page. On top of
+    plain caching:
+
+    - Concurrent requests for the same page are coalesced: the first caller fetches,
+      the rest wait on its result instead of sending duplicate requests.
+    - Serving page N schedules a background fetch of page N+1 (cursor = fullname of
+      the last post), so infinite scroll hits a warm cache.
+
+    Empty pages are not cached: the parser returns an empty list for Reddit error
+    bodies (401/429), and those must not be pinned for the whole TTL.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str], List[RedditPost]],
+        ttl: float = 300,
+        max_entries: int = 512,
+        prefetch_workers: int = 2,
+        wait_timeout: float = 15,
+    ):
+        """
+        Parameters:
+        fetch: Function (normalized_query, after) -> list of RedditPosts that performs
+               the actual upstream search
+        ttl: Seconds a fetched page stays fresh
+        max_entries: Maximum number of cached pages (least recently used are evicted)
+        prefetch_workers: Number of background threads used for next-page prefetches
+        wait_timeout: Seconds a coalesced caller waits for the in-flight fetch
+        """
+        self._fetch = fetch
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._entries = OrderedDict()  # key -> (expires_at, posts)
+        self._in_flight = {}  # key -> Future
+        self._lock = threading.Lock()
+        self._prefetcher = ThreadPoolExecutor(
+            max_workers=prefetch_workers, thread_name_prefix="reddit-prefetch"
+        )
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Case- and whitespace-insensitive form of a search query."""
+        return " ".join(query.lower().split())
+
+    def get_page(self, query: str, after: str = "") -> List[RedditPost]:
+        """
+        Returns one page of search results, from cache when possible, and prefetches
+        the following page in the background.
+
+        Raises:
+            Whatever the fetch function raises on a cache miss.
+        """
+        key = (self.normalize(query), after or "")
+        posts = self._get_or_fetch(key)
+        if posts:
+            self._prefetch((key[0], posts[-1].fullname))
+        return posts
+
+    def _lookup(self, key):
+        """Returns the fresh cached page for key, or None. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _store(self, key, posts) -> None:
+        """Caches a non-empty page, evicting the oldest entries. Caller holds the lock."""
+        if not posts:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, posts)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_or_fetch(self, key) -> List[RedditPost]:
+        """Cache lookup with single-flight fetching on a miss."""
+        with self._lock:
+            posts = self._lookup(key)
+            if posts is not None:
+                return posts
+            future = self._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_owner:
+            return future.result(timeout=self.wait_timeout)
+
+        try:
+            posts = self._fetch(*key)
+        except BaseException as exc:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            self._store(key, posts)
+            self._in_flight.pop(key, None)
+        future.set_result(posts)
+        return posts
+
+    def _prefetch(self, key) -> None:
+        """Warms the cache for key in the background unless it is already cached or
+        being fetched."""
+        with self._lock:
+            if self._lookup(key) is not None or key in self._in_flight:
+                return
+        self._prefetcher.submit(self._prefetch_page, key)
+
+    def _prefetch_page(self, key) -> None:
+        try:
+            self._get_or_fetch(key)
+        except Exception:
+            logging.warning("Reddit search prefetch failed for %r", key, exc_info=True)
@@ -0,0 +1,157 @@
+import logging
+import threading
+import time
+
+import requests
+
+from constants import (
+    REDDIT_CLIENT_ID,
+    REDDIT_PASSWORD,
+    REDDIT_SECRET_KEY,
+    REDDIT_USER_AGENT,
+    REDDIT_USERNAME,
+)
+
+
+class RedditTokenManager:
+    """Owns the Reddit OAuth access token and refreshes it ahead of expiry
+
+    ``start()`` launches a daemon thread that fetches a token immediately and then
+    re-fetches it ``refresh_margin`` seconds before it expires. Readers always get the
+    current token without touching the network: during a refresh the previous token
+    keeps being served, and a failed refresh is retried every ``retry_interval``
+    seconds while the old token stays in use. Only one refresh can run at a time.
+
+    Without ``start()`` the manager can still be refreshed synchronously with
+    ``refresh()`` (this is what a standalone RedditScraper does).
+    """
+
+    def __init__(
+        self,
+        refresh_margin: float = 300,
+        retry_interval: float = 30,
+        cold_start_timeout: float = 10,
+    ):
+        """
+        Parameters:
+        refresh_margin: Seconds before expiry at which the token is refreshed
+        retry_interval: Seconds between attempts after a failed refresh
+        cold_start_timeout: Seconds a reader waits for the very first token of the
+                            process before giving up
+        """
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.cold_start_timeout = cold_start_timeout
+
+        self.access_token = None
+        self.token_expires_at = 0
+
+        self._state_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        """Starts the background refresher thread (idempotent)."""
+        with self._state_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="reddit-token-refresher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.refresh()
+                delay = self.token_expires_at - self.refresh_margin - time.time()
+                delay = max(self.retry_interval, delay)
+            except Exception:
+                logging.exception("Reddit token refresh failed; keeping current token")
+                delay = self.retry_interval
+            time.sleep(delay)
+
+    def refresh(self) -> bool:
+        """
+        Fetches a new access token and swaps it in.
+
+        Returns:
+            True if this call refreshed the token, False if another refresh was already
+            running (its result is used instead).
+
+        Raises:
+            RuntimeError: If Reddit did not return a usable token. The previous token
+                          (if any) is left in place.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            access_token, expires_at = self._request_token()
+            with self._state_lock:
+                self.access_token = access_token
+                self.token_expires_at = expires_at
+            self._ready.set()
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    @staticmethod
+    def _request_token():
+        """POSTs the password grant to Reddit and returns (token, absolute expiry)."""
+        response = requests.post(
+            "https://www.reddit.com/api/v1/access_token",
+            auth=requests.auth.HTTPBasicAuth(REDDIT_CLIENT_ID, REDDIT_SECRET_KEY),
+            data={
+                "grant_type": "password",
+                "username": REDDIT_USERNAME,
+                "password": REDDIT_PASSWORD,
+            },
+            headers={"User-Agent": REDDIT_USER_AGENT},
+            timeout=10,
+        )
+
+        try:
+            token_data = response.json()
+        except Exception as exc:
+            raise RuntimeError("Failed to obtain Reddit access token") from exc
+
+        access_token = (
+            token_data.get("access_token") if isinstance(token_data, dict) else None
+        )
+
+        # If the response was not successful or did not contain a usable token, fail
+        # loudly instead of proceeding with a "bearer None" header.
+        if response.status_code != 200 or not access_token:
+            raise RuntimeError("Failed to obtain Reddit access token")
+
+        # Reddit returns the token lifetime in seconds (typically 3600)
+        expires_in = token_data.get("expires_in", 3600)
+        return access_token, time.time() + float(expires_in)
+
+    def is_token_valid(self, leeway: float = 60) -> bool:
+        """Returns True if a token exists and is not within ``leeway`` seconds of
+        expiring."""
+        with self._state_lock:
+            return self.access_token is not None and (
+                time.time() < self.token_expires_at - leeway
+            )
+
+    def headers(self) -> dict:
+        """
+        Returns request headers carrying the current token.
+
+        Never blocks on the token endpoint once a token exists. Only the first request
+        of a process can wait (up to ``cold_start_timeout``) for the initial fetch.
+
+        Raises:
+            RuntimeError: If no token has been obtained yet.
+        """
+        if not self._ready.wait(self.cold_start_timeout):
+            raise RuntimeError("Reddit access token is not available yet")
+        with self._state_lock:
+            access_token = self.access_token
+        return {
+            "User-Agent": REDDIT_USER_AGENT,
+            "Authorization": f"bearer {access_token}",
+        }
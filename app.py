@@ -2,29 +2,13 @@ import os
 import threading
 import uuid
 from datetime import timedelta
-from decimal import Decimal
 
 from flask import Flask, jsonify, send_from_directory
-from flask.json.provider import DefaultJSONProvider
 from flask_compress import Compress
 from flask_cors import CORS
 from flask_mail import Mail
 from flask_migrate import Migrate
 
-
-class DecimalJSONProvider(DefaultJSONProvider):
-    """JSON provider that serializes ``Decimal`` (our exact-money type) as a
-    float on the wire, so existing frontend code (parseFloat, numeric sorting)
-    keeps working unchanged. Money stays exact in the database and in every
-    server-side calculation; only the final serialized representation is a float.
-    """
-
-    @staticmethod
-    def default(o):
-        if isinstance(o, Decimal):
-            return float(o)
-        return DefaultJSONProvider.default(o)
-
 from constants import (
     JWT_ACCESS_TOKEN_EXPIRES_HOURS,
     JWT_REFRESH_TOKEN_EXPIRES_DAYS,
@@ -33,8 +17,13 @@ from constants import (
     MAIL_USERNAME,
     FLASK_APP_SECRET_KEY,
     FLASK_ENV,
+    JSON_PROVIDER,
+    REDDIT_CLIENT_ID,
+    STATS_LOG_INTERVAL_SECONDS,
 )
 from extensions import db, jwt, login_manager, limiter
+from json_provider import get_json_provider_class
+from metrics import start_stats_logging
 from models import TokenBlocklist, User
 
 
@@ -51,8 +40,9 @@ def create_app():
     """
     # Initialize Flask app
     app = Flask(__name__)
-    # Serialize Decimal money values as floats for the frontend (see provider).
-    app.json = DecimalJSONProvider(app)
+    # Serialize Decimal money values as floats for the frontend (see json_provider).
+    app.config["JSON_PROVIDER"] = JSON_PROVIDER
+    app.json = get_json_provider_class(app.config["JSON_PROVIDER"])(app)
     CORS(
         app,
         supports_credentials=True,
@@ -67,7 +57,9 @@ def create_app():
 
     # Compress responses (brotli preferred, gzip fallback) over the wire. This
     # wraps every response, including the static React assets served by
-    # serve_frontend via send_from_directory.
+    # serve_frontend via send_from_directory. Responses that already carry a
+    # Content-Encoding (the precompressed market payloads of http_cache) are passed
+    # through untouched.
     Compress(app)
 
     # Configure app
@@ -165,13 +157,27 @@ def create_app():
         return db.session.get(User, uid)
 
     # Import blueprints
-    from core.app import core
+    from core.app import core, start_reddit_token_refresh
+    from core.price_series import start_price_series_mirror
     from login.app import user_authentication
 
     # Register blueprints
     app.register_blueprint(user_authentication)
     app.register_blueprint(core)
 
+    # Fetch the Reddit OAuth token in the background at boot (and keep refreshing it
+    # ahead of expiry), rather than inside whichever request first needs it.
+    if REDDIT_CLIENT_ID:
+        start_reddit_token_refresh()
+
+    # Log the latency histograms (password hashing, order placement, ...) of this
+    # process every STATS_LOG_INTERVAL_SECONDS
+    start_stats_logging(STATS_LOG_INTERVAL_SECONDS)
+
+    # Keep this host's memory-mapped price series files up to date from Postgres:
+    # only the worker syncs them from CoinGecko, and dynos share no filesystem
+    start_price_series_mirror(app)
+
     # Serve the built React frontend (single-app Heroku deploy). The Vite build
     # output lives in frontend/dist. Registered blueprint/API rules are static and
     # take routing precedence; any remaining path serves an existing asset, or
@@ -213,6 +219,10 @@ if __name__ == "__main__":
         update_open_trades_in_background,
         update_user_wallet_value_in_background,
     )
+    from core.news import update_news_articles_in_background
+    from core.open_interest import check_open_interest_in_background
+    from core.price_series import update_price_series_in_background
+    from core.social import update_social_metrics_in_background
     from background_supervisor import supervise_threads
 
     # Supervise the background tasks in a daemon thread (app.run() owns the main
@@ -225,6 +235,10 @@ if __name__ == "__main__":
             [
                 ("wallet-value-updater", update_user_wallet_value_in_background),
                 ("open-trade-executor", update_open_trades_in_background),
+                ("news-updater", update_news_articles_in_background),
+                ("social-metrics-updater", update_social_metrics_in_background),
+                ("price-series-updater", update_price_series_in_background),
+                ("open-interest-checker", check_open_interest_in_background),
             ],
         ),
         daemon=True,
@@ -0,0 +1,134 @@
+"""Size and encode time of columnar frames vs JSON for chart data (user-044).
+
+Encodes a year of chart data the way the chart endpoints serve it, once as the JSON
+document (with the default orjson provider and with the stdlib one) and once as a
+columnar frame (columnar.encode_frame), for:
+
+- history: get_coin_historical_data, 8,760 hourly [timestamp_ms, value] points of
+  price, market cap and volume
+- ohlc: get_coin_OHLC_data, 2,190 4-hourly [timestamp_ms, o, h, l, c] candles
+- wallet: get_wallet_history, 8,760 hourly [timestamp, value] pairs of balance,
+  assets and total value
+
+and reports the raw and gzip-compressed (level 6, as Flask-Compress sends it) sizes
+and the best encode time of each.
+
+Usage (from the repository root, with the backend requirements installed):
+
+    python bench/bench_columnar.py [--repeat 50]
+"""
+
+import argparse
+import gzip
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from columnar import encode_frame  # noqa: E402
+from json_provider import get_json_provider_class  # noqa: E402
+
+rng = random.Random(44)
+START = 1_730_000_000
+
+
+def walk(count: int, value: float) -> list:
+    values = []
+    for _ in range(count):
+        value *= 1 + rng.gauss(0, 0.01)
+        values.append(value)
+    return values
+
+
+def history():
+    timestamps = [(START + 3_600 * i) * 1000 for i in range(8_760)]
+    prices = walk(len(timestamps), 60_000.0)
+    caps = [price * 19_700_000 for price in prices]
+    volumes = [rng.uniform(1e10, 5e10) for _ in timestamps]
+    document = {
+        "prices": [list(point) for point in zip(timestamps, prices)],
+        "market_caps": [list(point) for point in zip(timestamps, caps)],
+        "total_volumes": [list(point) for point in zip(timestamps, volumes)],
+    }
+    columns = {
+        "timestamp": ("q", timestamps),
+        "price": ("d", prices),
+        "market_cap": ("d", caps),
+        "total_volume": ("d", volumes),
+    }
+    return document, columns
+
+
+def ohlc():
+    timestamps = [(START + 14_400 * i) * 1000 for i in range(2_190)]
+    closes = walk(len(timestamps), 60_000.0)
+    opens = [closes[0]] + closes[:-1]
+    highs = [max(o, c) * (1 + rng.uniform(0, 0.01)) for o, c in zip(opens, closes)]
+    lows = [min(o, c) * (1 - rng.uniform(0, 0.01)) for o, c in zip(opens, closes)]
+    document = [list(row) for row in zip(timestamps, opens, highs, lows, closes)]
+    columns = {
+        "timestamp": ("q", timestamps),
+        "open": ("d", opens),
+        "high": ("d", highs),
+        "low": ("d", lows),
+        "close": ("d", closes),
+    }
+    return document, columns
+
+
+def wallet():
+    timestamps = [START + 3_600 * i for i in range(8_760)]
+    # Stored as Numeric(20, 8), so every value has cent-or-finer precision
+    balance = [round(value, 8) for value in walk(len(timestamps), 1_000_000.0)]
+    assets = [round(value, 8) for value in walk(len(timestamps), 250_000.0)]
+    total = [round(b + a, 8) for b, a in zip(balance, assets)]
+    document = {
+        "balance": [list(point) for point in zip(timestamps, balance)],
+        "assets": [list(point) for point in zip(timestamps, assets)],
+        "totalValue": [list(point) for point in zip(timestamps, total)],
+    }
+    columns = {
+        "timestamp": ("q", timestamps),
+        "balance": ("d", balance),
+        "assets": ("d", assets),
+        "totalValue": ("d", total),
+    }
+    return document, columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    providers = {}
+    for name in ("orjson", "stdlib"):
+        app = Flask(name)
+        app.json = get_json_provider_class(name)(app)
+        providers[name] = app
+
+    print(f"best of {args.repeat}")
+    print(f"{'series':<9}{'format':<14}{'KiB':>8}{'gzip KiB':>10}{'encode ms':>11}")
+    for label, build in (("history", history), ("ohlc", ohlc), ("wallet", wallet)):
+        document, columns = build()
+        encoders = {
+            f"json {name}": (lambda app=app: app.json.dumps(document).encode())
+            for name, app in providers.items()
+        }
+        encoders["columnar"] = lambda: encode_frame(columns)
+
+        for fmt, encode in encoders.items():
+            body = encode()
+            best = min(timeit.repeat(encode, number=1, repeat=args.repeat))
+            print(
+                f"{label:<9}{fmt:<14}{len(body) / 1024:>8.0f}"
+                f"{len(gzip.compress(body, 6)) / 1024:>10.0f}{best * 1000:>11.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
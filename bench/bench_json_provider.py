@@ -0,0 +1,141 @@
+"""Serialization time of the JSON providers over endpoint payloads (user-042).
+
+Builds payloads shaped like the responses of get_trades_info (a page of trades),
+get_feedposts (a page of feed posts) and get_wallet_history (a year of hourly
+balance/assets/total value pairs), with Decimal money and UUID ids as they come out
+of the database, and serializes each with app.json.response() under both
+JSON_PROVIDER settings:
+
+- stdlib: DecimalJSONProvider (json.dumps with a Python default() per Decimal)
+- orjson: OrjsonJSONProvider
+
+Both must produce the same document; the script checks that before timing.
+
+Usage (from the repository root, with the backend requirements installed):
+
+    python bench/bench_json_provider.py [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+from json_provider import get_json_provider_class  # noqa: E402
+
+rng = random.Random(42)
+
+
+def money(places: int) -> Decimal:
+    return Decimal(f"{rng.uniform(0.01, 70_000):.{places}f}")
+
+
+def trades_page(size: int = 10) -> dict:
+    return {
+        "data": [
+            {
+                "orderType": rng.choice(["market", "limit", "stop"]),
+                "transactionType": rng.choice(["buy", "sell"]),
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "timestamp": 1_760_000_000 + i,
+                "coin_id": "bitcoin",
+                "quantity": money(18),
+                "price_per_unit": money(8),
+                "comment": "",
+                "status": "finished",
+                "price_at_execution": money(8),
+                "ticker": "btc",
+            }
+            for i in range(size)
+        ],
+        "maxPages": 12,
+    }
+
+
+def feed_page(size: int = 10) -> dict:
+    return {
+        "data": [
+            {
+                "id": uuid.UUID(int=rng.getrandbits(128)),
+                "username": f"trader{i}",
+                "timestamp": 1_760_000_000 + i,
+                "comment": "to the moon",
+                "likes": rng.randrange(100),
+                "coin_id": "ethereum",
+                "quantity": money(18),
+                "price_per_unit": money(8),
+                "transaction_type": "buy",
+                "order_type": "market",
+                "curr_user_liked": False,
+            }
+            for i in range(size)
+        ],
+        "nextPage": 1,
+    }
+
+
+def wallet_history(points: int = 8_760) -> dict:
+    timestamps = [1_760_000_000 + 3_600 * i for i in range(points)]
+    return {
+        key: [[ts, money(8)] for ts in timestamps]
+        for key in ("balance", "assets", "totalValue")
+    }
+
+
+def count_decimals(obj) -> int:
+    if isinstance(obj, Decimal):
+        return 1
+    if isinstance(obj, dict):
+        obj = obj.values()
+    elif not isinstance(obj, list):
+        return 0
+    return sum(count_decimals(value) for value in obj)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    payloads = {
+        "get_trades_info": trades_page(),
+        "get_feedposts": feed_page(),
+        "get_wallet_history": wallet_history(),
+    }
+    providers = {}
+    for name in ("stdlib", "orjson"):
+        app = Flask(name)
+        app.json = get_json_provider_class(name)(app)
+        providers[name] = app
+
+    print(f"best of {args.repeat}")
+    print(f"{'payload':<20}{'Decimals':>9}{'stdlib ms':>11}{'orjson ms':>11}{'x':>7}")
+    for label, payload in payloads.items():
+        bodies = {}
+        times = {}
+        for name, app in providers.items():
+            with app.app_context():
+                bodies[name] = app.json.response(payload).get_data()
+                times[name] = min(
+                    timeit.repeat(
+                        lambda: app.json.response(payload), number=1, repeat=args.repeat
+                    )
+                )
+        assert json.loads(bodies["stdlib"]) == json.loads(bodies["orjson"])
+
+        print(
+            f"{label:<20}{count_decimals(payload):>9}{times['stdlib'] * 1000:>11.3f}"
+            f"{times['orjson'] * 1000:>11.3f}{times['stdlib'] / times['orjson']:>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
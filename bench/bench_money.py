@@ -0,0 +1,123 @@
+"""Decimal ledger math vs the fixed-point integer kernel (user-048).
+
+Times the operations of the order hot paths (reservation and balance checks, balance
+updates, the amounts of a new Transaction and the total of an open-order fill) two
+ways on the same inputs:
+
+- decimal: what models.py runs (Decimal values as loaded from NUMERIC columns,
+  amounts rounded with quantize_usd / quantize_qty, exact products via usd_product)
+- int: the same operation through the money.py integer kernel, converting each
+  value to units and back
+
+Both must give the same result; the script checks that before timing.
+
+Usage (from the repository root):
+
+    python bench/bench_money.py [--number 100000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from money import (  # noqa: E402
+    D,
+    QTY_UNITS,
+    price_units,
+    pro_rata_units,
+    qty_from_units,
+    qty_units,
+    quantize_qty,
+    quantize_usd,
+    usd_from_units,
+    usd_product,
+    usd_units,
+    value_units,
+)
+
+BALANCE = Decimal("98231.41572019")
+RESERVED = Decimal("1520.00000000")
+QUANTITY = Decimal("0.731927401938475612")
+PRICE = Decimal("64123.18000000")
+MARKET_PRICE = 64127.913482  # as it comes from CoinGecko
+COST = QUANTITY * PRICE  # an order's cost, as core/app.py computes it
+
+
+def available_check_decimal():
+    return D(BALANCE) - D(RESERVED) >= quantize_usd(COST)
+
+
+def available_check_int():
+    return usd_units(BALANCE) - usd_units(RESERVED) >= usd_units(COST)
+
+
+def balance_update_decimal():
+    return D(BALANCE) - quantize_usd(COST)
+
+
+def balance_update_int():
+    return usd_from_units(usd_units(BALANCE) - usd_units(COST))
+
+
+def transaction_amounts_decimal():
+    quantity = quantize_qty(QUANTITY)
+    price = quantize_usd(PRICE)
+    total = usd_product(quantity, price)
+    balance = quantize_usd(BALANCE)
+    return quantity, price, total, balance - total
+
+
+def transaction_amounts_int():
+    quantity = qty_units(QUANTITY)
+    price = usd_units(PRICE)
+    total = pro_rata_units(quantity, price, QTY_UNITS)
+    balance = usd_units(BALANCE)
+    return (
+        qty_from_units(quantity),
+        usd_from_units(price),
+        usd_from_units(total),
+        usd_from_units(balance - total),
+    )
+
+
+def fill_total_decimal():
+    return usd_product(QUANTITY, MARKET_PRICE)
+
+
+def fill_total_int():
+    return usd_from_units(value_units(qty_units(QUANTITY), price_units(MARKET_PRICE)))
+
+
+CASES = {
+    "available balance check": (available_check_decimal, available_check_int),
+    "balance update": (balance_update_decimal, balance_update_int),
+    "transaction amounts": (transaction_amounts_decimal, transaction_amounts_int),
+    "open order fill total": (fill_total_decimal, fill_total_int),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"best of 5 x {args.number}")
+    print(f"{'operation':<26}{'decimal us':>12}{'int us':>9}{'int/decimal':>13}")
+    for label, (decimal_path, int_path) in CASES.items():
+        assert decimal_path() == int_path(), label
+        times = [
+            min(timeit.repeat(path, number=args.number, repeat=5)) / args.number
+            for path in (decimal_path, int_path)
+        ]
+        print(
+            f"{label:<26}{times[0] * 1e6:>12.2f}{times[1] * 1e6:>9.2f}"
+            f"{times[1] / times[0]:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
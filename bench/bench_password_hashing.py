@@ -0,0 +1,120 @@
+"""Login throughput against the number of concurrent clients (user-026).
+
+Runs the password check of a login (werkzeug's scrypt check_password_hash) from N
+concurrent client threads, N = 1, 2, 4, ..., once inline on the client thread (as
+login() used to) and once through password_hashing.verify_password (the process
+pool). For each run it reports:
+
+- logins/s: completed checks per second
+- rejected/s: checks refused because the pool was saturated (pool only)
+- p50/p95: latency of a completed check, in ms
+- probe p95: latency of a tiny pure-Python task run alongside, in ms; this is what
+  every other request served by the same worker sees while the logins run
+
+Usage (from the repository root):
+
+    python bench/bench_password_hashing.py [--seconds 5] [--max-clients 32]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import check_password_hash, generate_password_hash  # noqa: E402
+
+import password_hashing  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+
+
+def _percentile(values, p):
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def _probe(stop, latencies):
+    """A cheap, GIL-bound unit of work, timed once every millisecond."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(range(2_000))
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.001)
+
+
+def run(check, clients: int, seconds: float) -> dict:
+    """Runs `check` from `clients` threads for `seconds`."""
+    stop = threading.Event()
+    latencies, rejected, probe = [], [0], []
+    lock = threading.Lock()
+
+    def client():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                check()
+            except password_hashing.PasswordHashingUnavailable:
+                with lock:
+                    rejected[0] += 1
+                # A rejected client backs off briefly, like a user retrying
+                time.sleep(0.01)
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    threads.append(threading.Thread(target=_probe, args=(stop, probe)))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "logins/s": len(latencies) / seconds,
+        "rejected/s": rejected[0] / seconds,
+        "p50": statistics.median(latencies) if latencies else float("nan"),
+        "p95": _percentile(latencies, 95),
+        "probe p95": _percentile(probe, 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--max-clients", type=int, default=32)
+    args = parser.parse_args()
+
+    password_hash = generate_password_hash(PASSWORD)
+    modes = {
+        "inline": lambda: check_password_hash(password_hash, PASSWORD),
+        "pool": lambda: password_hashing.verify_password(password_hash, PASSWORD),
+    }
+    # Start the pool's worker processes before timing anything
+    password_hashing.verify_password(password_hash, PASSWORD)
+
+    print(
+        f"{'mode':<7}{'clients':>8}{'logins/s':>10}{'rejected/s':>12}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'probe p95 ms':>14}"
+    )
+    clients = 1
+    while clients <= args.max_clients:
+        for mode, check in modes.items():
+            result = run(check, clients, args.seconds)
+            print(
+                f"{mode:<7}{clients:>8}{result['logins/s']:>10.1f}"
+                f"{result['rejected/s']:>12.1f}{result['p50']:>9.1f}"
+                f"{result['p95']:>9.1f}{result['probe p95']:>14.2f}"
+            )
+        clients *= 2
+
+
+if __name__ == "__main__":
+    main()
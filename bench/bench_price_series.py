@@ -0,0 +1,121 @@
+"""Reading a year of price history: memory-mapped series vs JSON (user-036).
+
+Builds one year of hourly points (8,760) and of daily points (365) for a coin and
+serves the full range and the last 30 days of each two ways:
+
+- json: decoding the /market_chart JSON body (what get_coin_historical_data did with
+  every CoinGecko response) and slicing the requested range out of it
+- mmap: core/price_series.py, i.e. a binary search over the memory-mapped timestamp
+  column and the /market_chart lists built from zero-copy column slices, as
+  read_history() does before adding the Postgres tail
+
+and reports the best time per read and the size of the source (JSON body or series
+file, including its spare capacity).
+
+Usage (from the repository root, with the backend requirements installed):
+
+    python bench/bench_price_series.py [--repeat 200]
+"""
+
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["PRICE_SERIES_DIR"] = tempfile.mkdtemp(prefix="price_series_bench_")
+atexit.register(shutil.rmtree, os.environ["PRICE_SERIES_DIR"], True)
+
+from core import price_series  # noqa: E402
+
+END = 1_760_000_000 - 1_760_000_000 % 86_400
+
+
+def make_points(spacing: int, count: int) -> list:
+    rng = random.Random(36)
+    price = 60_000.0
+    points = []
+    for i in range(count):
+        price *= 1 + rng.gauss(0, 0.01)
+        points.append(
+            (
+                END - (count - 1 - i) * spacing,
+                price,
+                price * 19_700_000,
+                rng.uniform(1e10, 5e10),
+            )
+        )
+    return points
+
+
+def read_json(body: bytes, start: int, end: int) -> dict:
+    data = json.loads(body)
+    return {
+        key: [point for point in data[key] if start <= point[0] // 1000 <= end]
+        for key in ("prices", "market_caps", "total_volumes")
+    }
+
+
+def read_mmap(coin_id: str, interval: str, start: int, end: int) -> dict:
+    series = price_series.open_series(coin_id, interval)
+    columns = series.range(start, end)
+    timestamps_ms = [ts * 1000 for ts in columns["timestamp"].tolist()]
+    return {
+        "prices": list(map(list, zip(timestamps_ms, columns["price"].tolist()))),
+        "market_caps": list(
+            map(
+                list,
+                zip(timestamps_ms, price_series._nan_to_none(columns["market_cap"])),
+            )
+        ),
+        "total_volumes": list(
+            map(
+                list,
+                zip(timestamps_ms, price_series._nan_to_none(columns["total_volume"])),
+            )
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"best of {args.repeat}")
+    print(f"{'series':<14}{'range':<7}{'source':<7}{'ms':>8}{'KiB':>9}")
+    for interval, spacing, count in (("1h", 3_600, 8_760), ("1d", 86_400, 365)):
+        points = make_points(spacing, count)
+        price_series.append_points("bitcoin", interval, points)
+        body = json.dumps(
+            {
+                "prices": [[ts * 1000, price] for ts, price, _, _ in points],
+                "market_caps": [[ts * 1000, cap] for ts, _, cap, _ in points],
+                "total_volumes": [[ts * 1000, vol] for ts, _, _, vol in points],
+            }
+        ).encode()
+        file_size = os.path.getsize(price_series.series_path("bitcoin", interval))
+
+        for label, start in (("365d", END - 365 * 86_400), ("30d", END - 30 * 86_400)):
+            expected = read_json(body, start, END)
+            assert read_mmap("bitcoin", interval, start, END) == expected
+
+            for source, read, size in (
+                ("json", lambda: read_json(body, start, END), len(body)),
+                ("mmap", lambda: read_mmap("bitcoin", interval, start, END), file_size),
+            ):
+                best = min(timeit.repeat(read, number=1, repeat=args.repeat))
+                print(
+                    f"{interval + f' ({count})':<14}{label:<7}{source:<7}"
+                    f"{best * 1000:>8.2f}{size / 1024:>9.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Parse time and allocations of a 100-post Reddit listing (user-029).
+
+Parses bench/fixtures/reddit_listing_100.json, a 100-post search listing with the
+full set of fields Reddit returns per post, two ways:
+
+- legacy: the stdlib decoder (what requests' .json() used), the old __dict__
+  RedditPost built from every post, and the per-field `temp` dict copy
+  get_reddit_posts used to make
+- current: RedditScraper.parse_post_listing (orjson on the raw bytes, ten fields
+  read per post, slotted RedditPost) followed by RedditPost.to_json()
+
+and reports the best time per listing, the peak memory allocated while parsing, the
+memory the result keeps alive and the part of it held by the post objects (all via
+tracemalloc).
+
+Usage (from the repository root):
+
+    python bench/bench_reddit_listing.py [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from RedditScraper.RedditScraper import RedditScraper  # noqa: E402
+
+FIXTURE = os.path.join(ROOT, "bench", "fixtures", "reddit_listing_100.json")
+
+
+class LegacyRedditPost:
+    """The RedditPost model before user-029 (a plain __dict__ class)."""
+
+    def __init__(
+        self,
+        title,
+        thumbnail,
+        content,
+        subreddit,
+        score,
+        comment_count,
+        id,
+        url,
+        fullname,
+        timestamp,
+    ):
+        self.title = title
+        self.thumbnail = thumbnail
+        self.content = content
+        self.subreddit = subreddit
+        self.score = score
+        self.comment_count = comment_count
+        self.id = id
+        self.url = url
+        self.fullname = fullname
+        self.timestamp = timestamp
+
+
+def parse_legacy(body: bytes) -> list:
+    res = json.loads(body)
+    posts = [
+        LegacyRedditPost(
+            title=post["title"],
+            thumbnail=post["thumbnail"],
+            content=post["selftext"],
+            subreddit=post["subreddit_name_prefixed"],
+            score=post["ups"],
+            comment_count=post["num_comments"],
+            id=post["id"],
+            url=post["url"],
+            fullname=post["name"],
+            timestamp=post["created_utc"],
+        )
+        for post in (child["data"] for child in res["data"]["children"])
+    ]
+    out = []
+    for post in posts:
+        temp = {}
+        temp["title"] = post.title
+        temp["thumbnail"] = post.thumbnail if post.thumbnail != "self" else ""
+        temp["content"] = post.content
+        temp["subreddit"] = post.subreddit
+        temp["score"] = post.score
+        temp["comment_count"] = post.comment_count
+        temp["id"] = post.id
+        temp["url"] = post.url
+        temp["fullname"] = post.fullname
+        temp["timestamp"] = post.timestamp
+        out.append(temp)
+    return posts, out
+
+
+def parse_current(body: bytes) -> list:
+    posts = RedditScraper.parse_post_listing(body)
+    return posts, [post.to_json() for post in posts]
+
+
+def measure(parse, body: bytes, repeat: int) -> dict:
+    best = min(timeit.repeat(lambda: parse(body), number=1, repeat=repeat))
+
+    tracemalloc.start()
+    result = parse(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    # Memory kept alive by the post objects alone (without the JSON dicts)
+    tracemalloc.start()
+    posts = parse(body)[0]
+    with_posts = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del posts
+
+    return {
+        "ms": best * 1000,
+        "peak_kib": peak / 1024,
+        "retained_kib": retained / 1024,
+        "posts_kib": with_posts / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(FIXTURE, "rb") as f:
+        body = f.read()
+
+    legacy, current = parse_legacy(body)[1], parse_current(body)[1]
+    assert len(legacy) == len(current) == 100
+    assert [post["fullname"] for post in legacy] == [
+        post["fullname"] for post in current
+    ]
+
+    print(f"fixture: {len(body) / 1024:.0f} KiB, 100 posts (best of {args.repeat})")
+    print(f"{'path':<9}{'ms':>8}{'peak KiB':>11}{'kept KiB':>11}{'posts KiB':>11}")
+    for name, parse in (("legacy", parse_legacy), ("current", parse_current)):
+        result = measure(parse, body, args.repeat)
+        print(
+            f"{name:<9}{result['ms']:>8.2f}{result['peak_kib']:>11.0f}"
+            f"{result['retained_kib']:>11.0f}{result['posts_kib']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compact binary columnar frames for chart data.
+
+Chart endpoints serve JSON like [[timestamp, value], ...] by default. Clients that
+send ``Accept: application/vnd.coinpulse.columnar`` get the same series as one
+binary frame instead, with one fixed-width column per field. A browser can view each
+column as a typed array (BigInt64Array / Float64Array) without parsing anything:
+
+    header       <4s I Q     magic b"CPC1", column count, row count      (16 bytes)
+    descriptors  32 bytes per column: UTF-8 name, NUL-padded to 31 bytes, followed
+                 by its type: b"q" (int64) or b"d" (float64)
+    columns      8 * row count bytes per column, in descriptor order
+
+Everything is little-endian and every column starts at a multiple of 8 bytes. Missing
+float values are NaN; timestamps are in the same unit as the JSON response.
+"""
+
+import math
+import struct
+import sys
+from array import array
+
+from flask import Response, request
+
+COLUMNAR_MIMETYPE = "application/vnd.coinpulse.columnar"
+
+HEADER = struct.Struct("<4sIQ")
+MAGIC = b"CPC1"
+DESCRIPTOR = struct.Struct("<31sc")
+COLUMN_TYPES = ("q", "d")
+
+
+def wants_columnar() -> bool:
+    """Whether the client prefers a columnar frame over JSON (JSON wins ties, so
+    clients sending */* or no Accept header keep getting JSON)."""
+    best = request.accept_mimetypes.best_match(["application/json", COLUMNAR_MIMETYPE])
+    return best == COLUMNAR_MIMETYPE
+
+
+def _column_bytes(fmt: str, values) -> bytes:
+    if isinstance(values, memoryview) and values.format == fmt:
+        # Already a native column (e.g. sliced from a price series file)
+        column = array(fmt, values.tobytes())
+    else:
+        try:
+            column = array(fmt, values)
+        except TypeError:
+            if fmt != "d":
+                raise
+            # Unknown values (None) become NaN; the slower path is only taken for
+            # columns that have any
+            column = array(
+                fmt, (math.nan if value is None else value for value in values)
+            )
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def encode_frame(columns: dict) -> bytes:
+    """
+    Encodes columns of equal length into a frame (see the module docstring).
+
+    Parameters:
+        columns: Maps each column name to (type, values), where type is "q" (int64)
+                 or "d" (float64) and values is any sequence of numbers (None is
+                 allowed in float columns)
+
+    Returns:
+        bytes: The encoded frame
+
+    Raises:
+        ValueError: If the columns differ in length, or a name or type is invalid
+    """
+    lengths = {len(values) for _, values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("All columns must have the same length")
+
+    parts = [HEADER.pack(MAGIC, len(columns), lengths.pop() if lengths else 0)]
+    for name, (fmt, _) in columns.items():
+        encoded = name.encode()
+        if fmt not in COLUMN_TYPES or len(encoded) > 31:
+            raise ValueError(f"Invalid column: {name} ({fmt})")
+        parts.append(DESCRIPTOR.pack(encoded, fmt.encode()))
+    for fmt, values in columns.values():
+        parts.append(_column_bytes(fmt, values))
+    return b"".join(parts)
+
+
+def columnar_response(columns: dict) -> Response:
+    """Returns a response with the frame of `columns` (see encode_frame)."""
+    response = Response(encode_frame(columns), mimetype=COLUMNAR_MIMETYPE)
+    response.vary.add("Accept")
+    return response
@@ -24,6 +24,8 @@ MAIL_USERNAME = os.getenv("MAIL_USERNAME")
 MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
 FLASK_APP_SECRET_KEY = os.getenv("FLASK_APP_SECRET_KEY")
 FLASK_ENV = os.getenv("FLASK_ENV")
+# "orjson" (C-accelerated, default) or "stdlib" (see json_provider.py)
+JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
 
 TOKEN_GENERATOR_SECRET_KEY = os.getenv("TOKEN_GENERATOR_SECRET_KEY")
 
@@ -35,6 +37,11 @@ COINGECKO_API_HEADERS = {
 
 NEWSDATA_API_KEY = os.getenv("NEWSDATA_API_KEY")
 
+# Background news ingestion (see core/news.py). Each cycle costs one NewsData credit
+# per tracked coin, so 20 coins every 3 hours stays well inside the free daily quota.
+NEWS_TRACKED_COINS_COUNT = 20
+NEWS_RETENTION_DAYS = 30
+
 POSTGRESQL_USERNAME = os.getenv("POSTGRESQL_USERNAME")
 POSTGRESQL_PASSWORD = os.getenv("POSTGRESQL_PASSWORD")
 
@@ -43,14 +50,73 @@ REDDIT_SECRET_KEY = os.getenv("REDDIT_SECRET_KEY")
 REDDIT_USERNAME = os.getenv("REDDIT_USERNAME")
 REDDIT_PASSWORD = os.getenv("REDDIT_PASSWORD")
 REDDIT_USER_AGENT = os.getenv("REDDIT_USER_AGENT")
+REDDIT_SEARCH_CACHE_TTL_SECONDS = 300
+REDDIT_TOKEN_REFRESH_MARGIN_SECONDS = 300
+# Reddit search results are kept this long for local full-text search (the upstream
+# search is restricted to the past week, so older posts would never be served anyway)
+REDDIT_POST_RETENTION_DAYS = 7
+
+# Local full-text search (see core/search.py): relevance is halved for every
+# SEARCH_DECAY_HALF_LIFE_SECONDS of age, and at most SEARCH_MAX_RESULTS are ranked
+SEARCH_DECAY_HALF_LIFE_SECONDS = 86_400
+SEARCH_MAX_RESULTS = 200
 
 OPEN_TRADE_UPDATE_INTERVAL_SECONDS = 60
 WALLET_VALUE_UPDATE_INTERVAL_SECONDS = 3_600
+NEWS_UPDATE_INTERVAL_SECONDS = 10_800
+SOCIAL_METRICS_UPDATE_INTERVAL_SECONDS = 3_600
+PRICE_SERIES_UPDATE_INTERVAL_SECONDS = 3_600
+OPEN_INTEREST_CHECK_INTERVAL_SECONDS = 3_600
+
+# Social activity rollups (see core/social.py): metrics cover a rolling window and
+# snapshots are kept for SOCIAL_METRICS_RETENTION_DAYS
+SOCIAL_METRICS_WINDOW_SECONDS = 86_400
+SOCIAL_METRICS_RETENTION_DAYS = 30
+
+# Local candle / price history store (see core/candles.py). Closed candles are never
+# re-fetched; the newest, still-forming one is refreshed at most this often.
+CANDLE_LIVE_REFRESH_SECONDS = 300
+
+# Order placement fills at a cached price no older than this (see core/price_cache.py)
+# and only asks CoinGecko when there is none
+ORDER_PRICE_MAX_AGE_SECONDS = 30
+# Orders accepted per /process_orders request
+MAX_BATCH_ORDERS = 50
+
+# Top-coins table snapshots (see core/market_cache.py): served from memory, refreshed
+# in the background once older than the TTL, never served older than MAX_STALE
+TOP_COINS_CACHE_TTL_SECONDS = 120
+TOP_COINS_CACHE_MAX_STALE_SECONDS = 1_800
+TOP_COINS_SNAPSHOT_SIZE = 500
+TRENDING_CACHE_TTL_SECONDS = 300
+TRENDING_CACHE_MAX_STALE_SECONDS = 3_600
+# CoinGecko's full coin list (used to validate coin ids) changes a few times a day
+COINS_LIST_CACHE_TTL_SECONDS = 600
+COINS_LIST_CACHE_MAX_STALE_SECONDS = 86_400
+SPARKLINE_POINTS = 48
+
+# Memory-mapped price series of the hot coins (see core/price_series.py)
+PRICE_SERIES_DIR = os.getenv("PRICE_SERIES_DIR", "data/price_series")
+PRICE_SERIES_HOT_COINS_COUNT = 50
+# Each web process copies new closed points from Postgres into its local series
+# files this often (the worker appends them to Postgres hourly)
+PRICE_SERIES_MIRROR_INTERVAL_SECONDS = 600
 
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_ACCESS_TOKEN_EXPIRES_HOURS = 1
 JWT_REFRESH_TOKEN_EXPIRES_DAYS = 7
 
+# Password hashing runs in a dedicated process pool (see password_hashing.py). Calls
+# beyond MAX_IN_FLIGHT are rejected immediately instead of queueing behind a burst.
+PASSWORD_HASH_POOL_WORKERS = int(os.getenv("PASSWORD_HASH_POOL_WORKERS", "2"))
+PASSWORD_HASH_MAX_IN_FLIGHT = int(
+    os.getenv("PASSWORD_HASH_MAX_IN_FLIGHT", str(PASSWORD_HASH_POOL_WORKERS * 4))
+)
+PASSWORD_HASH_TIMEOUT_SECONDS = 2
+
+# Each process logs its latency stats (see metrics.py) at most this often
+STATS_LOG_INTERVAL_SECONDS = 300
+
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
 PASSWORD_ALLOWED_SPECIAL_CHARS = [
@@ -1,5 +1,5 @@
 from flask_jwt_extended import verify_jwt_in_request
-from constants import NEWSDATA_API_KEY
+import asyncio
 import logging
 import math
 import time
@@ -17,52 +17,95 @@ from flask_login import current_user
 from sqlalchemy import and_, or_
 from sqlalchemy.orm import joinedload
 
+from columnar import (
+    COLUMNAR_MIMETYPE,
+    columnar_response,
+    encode_frame,
+    wants_columnar,
+)
 from constants import (
+    CANDLE_LIVE_REFRESH_SECONDS,
     COINGECKO_API_HEADERS,
+    COINS_LIST_CACHE_TTL_SECONDS,
+    MAX_BATCH_ORDERS,
     OPEN_TRADE_UPDATE_INTERVAL_SECONDS,
+    REDDIT_SEARCH_CACHE_TTL_SECONDS,
+    REDDIT_TOKEN_REFRESH_MARGIN_SECONDS,
+    SOCIAL_METRICS_RETENTION_DAYS,
     WALLET_VALUE_UPDATE_INTERVAL_SECONDS,
 )
+from core import (
+    candles,
+    market_cache,
+    news,
+    open_interest,
+    positions,
+    price_cache,
+    price_series,
+    search,
+    social,
+)
 from extensions import db
+from http_cache import cached_json_response, cached_response
+from json_stream import stream_json_object
+from metrics import LatencyHistogram, register_stats
 from models import Transaction, TransactionLikes, User, Wallet
 from money import D, qty_get
+from RedditScraper.AsyncRedditScraper import AsyncRedditScraper, merge_posts
 from RedditScraper.RedditScraper import RedditScraper
+from RedditScraper.SearchCache import RedditSearchCache
+from RedditScraper.TokenManager import RedditTokenManager
 
 core = Blueprint("core", __name__)
 
-_COINS_LIST_CACHE = {"data": None, "fetched_at": 0}
-_COINS_LIST_CACHE_SET = set()
-COINS_LIST_CACHE_TTL_SECONDS = 600  # 10 minutes
+# Latency of each phase of order placement (see process_order)
+ORDER_LATENCY = {
+    phase: LatencyHistogram(f"process_order_{phase}")
+    for phase in ("validation", "price", "lock", "commit")
+}
+
+
+def get_order_latency_stats() -> dict:
+    """Returns the latency counters of each order placement phase."""
+    return {phase: histogram.snapshot() for phase, histogram in ORDER_LATENCY.items()}
+
+
+register_stats("order_latency", get_order_latency_stats)
 
 
 def _lock_wallet(wallet_id):
     """Load and row-lock a wallet within the current transaction (SELECT ... FOR UPDATE)."""
+    # populate_existing: a wallet loaded before the lock (e.g. via user.wallet) is
+    # refreshed, holdings included, instead of keeping its pre-lock state. Holding
+    # rows are only ever modified under this wallet lock.
     return db.session.scalar(
-        db.select(Wallet).filter_by(id=wallet_id).with_for_update()
+        db.select(Wallet)
+        .filter_by(id=wallet_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
     )
 
 
 def get_coins_list_cached():
-    """Returns the full CoinGecko /coins/list as a Python list, cached for COINS_LIST_CACHE_TTL_SECONDS."""
-    global _COINS_LIST_CACHE_SET
+    """Returns the full CoinGecko /coins/list as a Python list (cached, see
+    market_cache.get_coins_list), or an error response if it cannot be fetched."""
     try:
-        now = int(time.time())
-        if (
-            _COINS_LIST_CACHE["data"] is not None
-            and now - _COINS_LIST_CACHE["fetched_at"] < COINS_LIST_CACHE_TTL_SECONDS
-        ):
-            return _COINS_LIST_CACHE["data"]
-        url = "https://api.coingecko.com/api/v3/coins/list"
-        response = requests.get(url, headers=COINGECKO_API_HEADERS, timeout=10)
-        data = response.json()
-
-        _COINS_LIST_CACHE["data"] = data
-        _COINS_LIST_CACHE["fetched_at"] = now
-        _COINS_LIST_CACHE_SET = set([coin["id"] for coin in data])
-        return data
+        return market_cache.get_coins_list()[0].coins
     except Exception:
+        logging.exception("Failed to fetch the coin list")
         return jsonify({"error": "Internal server error"}), 502
 
 
+def _is_unknown_coin(coin_id) -> bool:
+    """
+    Whether coin_id is missing from the cached coin list. Never waits on CoinGecko:
+    while no list is cached yet the check passes (one is fetched in the background),
+    and unknown coins are left to the upstream price/chart lookups to reject.
+    """
+    coins_list = market_cache.peek_coins_list()
+    return coins_list is not None and coin_id not in coins_list.ids
+
+
 # Verify user has a username
 @core.before_request
 def require_username():
@@ -394,168 +437,298 @@ def update_likes():
     )
 
 
-@core.route("/process_order", methods=["POST"])
-def process_order():
-    """
-    Processes a cryptocurrency transaction submitted via a POST request containing JSON
-    data.
+ORDER_REQUIRED_FIELDS = {
+    "transactionType",
+    "orderType",
+    "quantity",
+    "coin_id",
+    "comment",
+    "visibility",
+    "price_per_unit",
+}
 
-    The function validates the input JSON for necessary fields and constraints, such as
-    ensuring positive quantities and sufficient balances to complete buy or sell
-    orders. It handles different transaction types and order types accordingly.
 
-    If the transaction is valid:
-    - It updates the user's wallet balance and assets based on the transaction type and
-      order type.
-    - It records the transaction in the database along with a new TransactionLikes
-      object to track likes.
-    - It invokes a background task to update the wallet value if necessary.
+def _is_positive_number(value) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+        and value > 0
+    )
 
-    Returns:
-        JSON response: A JSON object indicating the success or failure of the
-                       transaction. On success, returns HTTP 201. On failure due to
-                       client errors (e.g., missing data, insufficient funds), returns
-                       HTTP 400. On failure due to server errors (e.g., database
-                       issues), returns HTTP 500.
 
-    Raises:
-        HTTPException: If the input JSON is missing or incorrectly formatted, or if any
-                       data constraints are violated, the function will raise an HTTP
-                       exception with an appropriate status code and error message.
+def _validate_order_request(data):
     """
-    # Ensure request contains necessary JSON data
-    data = request.get_json()
-
-    # Check data contains all required fields
-    required_fields = {
-        "transactionType",
-        "orderType",
-        "quantity",
-        "coin_id",
-        "comment",
-        "visibility",
-        "price_per_unit",
-    }
+    Validates the fields of one order request and converts its quantity and price
+    to Decimal in place (so the float values from JSON never enter the ledger).
 
+    Returns:
+        tuple | None: (error message, HTTP status) if the order is invalid, else None
+    """
     # Verify required fields have been provided
-    for key in required_fields:
-        if key not in data:
-            return jsonify({"error": "Invalid order request"}), 422
+    if not isinstance(data, dict) or not ORDER_REQUIRED_FIELDS <= data.keys():
+        return "Invalid order request", 422
 
     # Validate data properties are correct
     if data["orderType"] not in ["market", "limit", "stop"] or data[
         "transactionType"
     ] not in ["buy", "sell"]:
-        return jsonify({"error": "Invalid order request"}), 422
+        return "Invalid order request", 422
+
+    # coin_id is used as a set/dict key below (a list or dict would raise TypeError)
+    if not isinstance(data["coin_id"], str) or not data["coin_id"]:
+        return "Invalid coin_id", 422
 
     # Make sure user did not enter an invalid quantity
-    if (
-        not isinstance(data["quantity"], (int, float))
-        or isinstance(data["quantity"], bool)
-        or not math.isfinite(data["quantity"])
-        or data["quantity"] <= 0
-    ):
-        return (
-            jsonify({"error": "Quantity must be a positive number"}),
-            422,
-        )
+    if not _is_positive_number(data["quantity"]):
+        return "Quantity must be a positive number", 422
 
     # Validate correct trigger/quoted price
-    if (
-        not isinstance(data["price_per_unit"], (int, float))
-        or isinstance(data["price_per_unit"], bool)
-        or not math.isfinite(data["price_per_unit"])
-        or data["price_per_unit"] <= 0
-    ):
-        return (
-            jsonify({"error": "Trigger/quoted price must be a positive number"}),
-            422,
-        )
+    if not _is_positive_number(data["price_per_unit"]):
+        return "Trigger/quoted price must be a positive number", 422
 
-    # All money/quantity math below runs in Decimal. Convert the validated request
-    # values once here so the float values from JSON never enter the ledger.
+    # All money/quantity math below runs in Decimal
     data["quantity"] = D(data["quantity"])
     data["price_per_unit"] = D(data["price_per_unit"])
 
-    # Validate that the coin exists and get its current price
-    try:
-        market_data = get_coins_data(data["coin_id"])
-        raw_price = market_data[0]["current_price"]
-    except (requests.RequestException, IndexError, KeyError, TypeError, ValueError):
-        return (
-            jsonify({"error": "Invalid coin_id. Coin does not exist."}),
-            422,
-        )
+    # Validate that the coin exists against the cached coin list (if no list is
+    # cached yet, the live price lookup still rejects unknown coins)
+    if _is_unknown_coin(data["coin_id"]):
+        return "Invalid coin_id. Coin does not exist.", 422
+    return None
+
+
+def _get_current_prices(coin_ids) -> dict:
+    """
+    Returns {coin_id: raw price} for the given coins: recently fetched prices from the
+    local price cache, and the rest from one CoinGecko call. Coins CoinGecko does not
+    know are missing from the result.
 
+    Raises:
+        requests.RequestException: If the CoinGecko call fails
+    """
+    prices = {}
+    missing = []
+    for coin_id in coin_ids:
+        price = price_cache.get_price(coin_id)
+        if price is None:
+            missing.append(coin_id)
+        else:
+            prices[coin_id] = price
+
+    if missing:
+        market_data = get_coins_data(",".join(missing))
+        if not isinstance(market_data, list):
+            raise requests.RequestException("Unexpected /coins/markets response")
+        for coin in market_data:
+            if coin.get("id") in missing:
+                prices[coin["id"]] = coin.get("current_price")
+    return prices
+
+
+def _check_order_price(data, raw_price):
+    """
+    Validates an order against the coin's current market price: the price must be
+    valid, a market order must be within the 0.5% slippage tolerance of the quoted
+    price, and a limit/stop trigger must sit on the meaningful side of the market.
+
+    Returns:
+        tuple | None: (error message, HTTP status) if the order is rejected, else None
+    """
     # CoinGecko can return a null/zero price for unknown or delisted coins. Validate
-    # the raw number, then convert into the Decimal ledger domain.
-    if (
-        not isinstance(raw_price, (int, float))
-        or isinstance(raw_price, bool)
-        or not math.isfinite(raw_price)
-        or raw_price <= 0
-    ):
-        return (
-            jsonify({"error": "No valid market price for this coin"}),
-            422,
-        )
+    # the raw number before converting it into the Decimal ledger domain.
+    if not _is_positive_number(raw_price):
+        return "No valid market price for this coin", 422
 
     current_price = D(raw_price)
 
     # Validate unfavourable slippage tolerance for market orders
     if data["orderType"] == "market":
-        if (
-            data["transactionType"] == "buy"
-            and ((current_price - data["price_per_unit"]) / data["price_per_unit"])
-            > 0.005
-        ):
-            return (
-                jsonify(
-                    {"error": "Slippage tolerance exceeded (0.5%). Please refresh."}
-                ),
-                409,
-            )
-        elif (
-            data["transactionType"] == "sell"
-            and ((current_price - data["price_per_unit"]) / data["price_per_unit"])
-            < -0.005
+        slippage = (current_price - data["price_per_unit"]) / data["price_per_unit"]
+        if (data["transactionType"] == "buy" and slippage > 0.005) or (
+            data["transactionType"] == "sell" and slippage < -0.005
         ):
-            return (
-                jsonify(
-                    {"error": "Slippage tolerance exceeded (0.5%). Please refresh."}
-                ),
-                409,
-            )
+            return "Slippage tolerance exceeded (0.5%). Please refresh.", 409
 
     # A limit/stop trigger must sit on the meaningful side of the current market
     # price; otherwise the order would fill on the next executor pass at ~the
     # current price (defeating the point of the order type). The frontend enforces
     # this, but validate server-side too so a direct API client can't place a
     # wrong-side order.
-    trigger_side_error = None
     if data["orderType"] == "limit" and data["transactionType"] == "buy":
         if data["price_per_unit"] > current_price:
-            trigger_side_error = (
-                "A limit buy price must be at or below the current market price."
+            return (
+                "A limit buy price must be at or below the current market price.",
+                422,
             )
     elif data["orderType"] == "limit" and data["transactionType"] == "sell":
         if data["price_per_unit"] < current_price:
-            trigger_side_error = (
-                "A limit sell price must be at or above the current market price."
+            return (
+                "A limit sell price must be at or above the current market price.",
+                422,
             )
     elif data["orderType"] == "stop" and data["transactionType"] == "buy":
         if data["price_per_unit"] < current_price:
-            trigger_side_error = (
-                "A stop buy price must be at or above the current market price."
+            return (
+                "A stop buy price must be at or above the current market price.",
+                422,
             )
     elif data["orderType"] == "stop" and data["transactionType"] == "sell":
         if data["price_per_unit"] > current_price:
-            trigger_side_error = (
-                "A stop sell price must be at or below the current market price."
+            return (
+                "A stop sell price must be at or below the current market price.",
+                422,
             )
+    return None
+
+
+def _new_transaction(data, current_price, wallet) -> Transaction:
+    """Builds the Transaction of a validated order (not added to the session)."""
+    return Transaction(
+        status="finished" if data["orderType"] == "market" else "open",
+        transactionType=data["transactionType"],
+        orderType=data["orderType"],
+        coin_id=data["coin_id"],
+        quantity=data["quantity"],
+        price_per_unit=(
+            current_price if data["orderType"] == "market" else data["price_per_unit"]
+        ),
+        wallet_id=wallet.id,
+        comment=data["comment"],
+        balance_before=wallet.balance,
+        visibility=data["visibility"],
+    )
+
+
+def _apply_order(user_wallet, transaction):
+    """
+    Applies an order to a wallet that is row-locked by the current transaction:
+    fills a market order (and updates the wallet's position in the coin), or reserves
+    the funds (buy) / coins (sell) of an open limit/stop order. Every check runs
+    against the locked wallet, including what earlier orders of the same database
+    transaction already took from it. The wallet is only modified if all checks pass.
+
+    Returns:
+        tuple | None: (error message, HTTP status) if the wallet cannot cover the
+                      order, else None
+    """
+    if transaction.orderType == "market" and transaction.transactionType == "buy":
+        # Re-validate against the locked wallet before mutating
+        if not user_wallet.has_enough_available_balance(
+            transaction.quantity * transaction.price_per_unit
+        ):
+            return "Order failed: insufficient USD balance", 400
+
+        # Record the balance as read under the lock
+        transaction.balance_before = user_wallet.balance
+
+        # Update wallet balance
+        user_wallet.update_balance_subtract(
+            transaction.quantity * transaction.price_per_unit
+        )
+
+        # Update wallet assets dictionary
+        user_wallet.update_assets_add(transaction.coin_id, transaction.quantity)
+        positions.record_fill(transaction)
+    elif transaction.orderType == "market" and transaction.transactionType == "sell":
+        # Re-validate against the locked wallet before mutating
+        if not user_wallet.has_enough_available_coins(
+            transaction.coin_id, transaction.quantity
+        ):
+            return "Order failed: insufficient coin balance", 400
+
+        # Record the balance as read under the lock
+        transaction.balance_before = user_wallet.balance
+
+        # Update wallet balance
+        user_wallet.update_balance_add(
+            transaction.quantity * transaction.price_per_unit
+        )
+
+        # Update wallet assets dictionary
+        user_wallet.update_assets_subtract(transaction.coin_id, transaction.quantity)
+        positions.record_fill(transaction)
+    elif transaction.status == "open":
+        # Placing an open limit/stop order: reserve the funds (buy) or coins
+        # (sell) against the locked wallet so they cannot be double-spent by
+        # other orders before this one fills. Reservation is computed at the
+        # TRIGGER price (transaction.price_per_unit) and validated against the
+        # AVAILABLE (unreserved) balance/holdings; the pre-lock checks are only a
+        # looser total-funds fast-fail and do not reserve.
+        if transaction.transactionType == "buy":
+            required = transaction.quantity * transaction.price_per_unit
+            if not user_wallet.has_enough_available_balance(required):
+                return "Order failed: insufficient available USD balance", 400
+            user_wallet.reserve_balance(required)
+        elif transaction.transactionType == "sell":
+            if not user_wallet.has_enough_available_coins(
+                transaction.coin_id, transaction.quantity
+            ):
+                return "Order failed: insufficient available coin balance", 400
+            user_wallet.reserve_coins(transaction.coin_id, transaction.quantity)
+    return None
 
-    if trigger_side_error:
-        return jsonify({"error": trigger_side_error}), 422
+
+@core.route("/process_order", methods=["POST"])
+def process_order():
+    """
+    Processes a cryptocurrency transaction submitted via a POST request containing JSON
+    data.
+
+    The function validates the input JSON for necessary fields and constraints, such as
+    ensuring positive quantities and sufficient balances to complete buy or sell
+    orders. It handles different transaction types and order types accordingly.
+
+    The coin is validated against the cached coin list, and priced from the local
+    price cache (see core/price_cache.py) when a recent enough price is cached, so
+    most orders make no upstream call. The latency of each phase (validation, price,
+    lock, commit) is recorded in ORDER_LATENCY.
+
+    If the transaction is valid:
+    - It updates the user's wallet balance and assets based on the transaction type and
+      order type.
+    - It records the transaction in the database along with a new TransactionLikes
+      object to track likes.
+    - It invokes a background task to update the wallet value if necessary.
+
+    Returns:
+        JSON response: A JSON object indicating the success or failure of the
+                       transaction. On success, returns HTTP 201. On failure due to
+                       client errors (e.g., missing data, insufficient funds), returns
+                       HTTP 400. On failure due to server errors (e.g., database
+                       issues), returns HTTP 500.
+
+    Raises:
+        HTTPException: If the input JSON is missing or incorrectly formatted, or if any
+                       data constraints are violated, the function will raise an HTTP
+                       exception with an appropriate status code and error message.
+    """
+    phase_start = time.perf_counter()
+
+    # Ensure request contains necessary JSON data
+    data = request.get_json()
+
+    error = _validate_order_request(data)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+    ORDER_LATENCY["validation"].observe(time.perf_counter() - phase_start)
+
+    # Get the coin's current price: a recently fetched one if there is one, else
+    # live from CoinGecko
+    phase_start = time.perf_counter()
+    try:
+        raw_price = _get_current_prices([data["coin_id"]])[data["coin_id"]]
+    except (requests.RequestException, KeyError, TypeError, ValueError):
+        return (
+            jsonify({"error": "Invalid coin_id. Coin does not exist."}),
+            422,
+        )
+
+    error = _check_order_price(data, raw_price)
+    if error:
+        return jsonify({"error": error[0]}), error[1]
+    current_price = D(raw_price)
+    ORDER_LATENCY["price"].observe(time.perf_counter() - phase_start)
 
     # Get the current user
     user_id = get_jwt_identity()
@@ -579,138 +752,178 @@ def process_order():
                 400,
             )
 
-    # Get status value
-    status = "finished" if data["orderType"] == "market" else "open"
-
     # Save the transaction in the database
-    transaction = Transaction(
-        status=status,
-        transactionType=data["transactionType"],
-        orderType=data["orderType"],
-        coin_id=data["coin_id"],
-        quantity=data["quantity"],
-        price_per_unit=(
-            current_price if data["orderType"] == "market" else data["price_per_unit"]
-        ),
-        wallet_id=user.wallet.id,
-        comment=data["comment"],
-        balance_before=user.wallet.balance,
-        visibility=data["visibility"],
-    )
+    transaction = _new_transaction(data, current_price, user.wallet)
 
     try:
         # Acquire a row-level lock on the wallet so the authoritative funds/holdings
         # check and the subsequent mutation happen atomically (prevents TOCTOU races
         # against concurrent orders or the background executor). The pre-lock checks
-        # above are only a cheap fast-fail; the checks below are authoritative.
-        user_wallet = _lock_wallet(user.wallet.id)
+        # above are only a cheap fast-fail; the checks in _apply_order are
+        # authoritative.
+        with ORDER_LATENCY["lock"].timer():
+            user_wallet = _lock_wallet(user.wallet.id)
         if user_wallet is None:
             db.session.rollback()
             return jsonify({"error": "Wallet not found"}), 404
 
-        if transaction.orderType == "market" and transaction.transactionType == "buy":
-            # Re-validate against the locked wallet before mutating
-            if not user_wallet.has_enough_available_balance(
-                transaction.quantity * transaction.price_per_unit
-            ):
-                db.session.rollback()
-                return (
-                    jsonify({"error": "Order failed: insufficient USD balance"}),
-                    400,
-                )
+        error = _apply_order(user_wallet, transaction)
+        if error:
+            db.session.rollback()
+            return jsonify({"error": error[0]}), error[1]
 
-            # Record the balance as read under the lock
-            transaction.balance_before = user_wallet.balance
+        with ORDER_LATENCY["commit"].timer():
+            # Add transaction and update user_wallet, then flush to assign the
+            # transaction's primary key without committing yet.
+            db.session.add(transaction)
+            db.session.add(user_wallet)
+            db.session.flush()
 
-            # Update wallet balance
-            user_wallet.update_balance_subtract(
-                transaction.quantity * transaction.price_per_unit
-            )
+            # Create the likes row and commit everything in a single transaction, so
+            # a failure can't leave an orphan transaction with no TransactionLikes
+            # row.
+            transaction_likes = TransactionLikes(transaction_id=transaction.id)
+            db.session.add(transaction_likes)
+            open_interest.record_orders(opened=[transaction])
+            db.session.commit()
 
-            # Update wallet assets dictionary
-            user_wallet.update_assets_add(transaction.coin_id, transaction.quantity)
-        elif (
-            transaction.orderType == "market" and transaction.transactionType == "sell"
-        ):
-            # Re-validate against the locked wallet before mutating
-            if not user_wallet.has_enough_available_coins(
-                transaction.coin_id, transaction.quantity
-            ):
-                db.session.rollback()
-                return (
-                    jsonify({"error": "Order failed: insufficient coin balance"}),
-                    400,
-                )
+        update_user_wallet_value_in_background(user_wallet.id)
+
+        return jsonify({"success": "Transaction processed successfully"}), 201
+    except Exception:
+        db.session.rollback()
+        logging.exception("Order processing failed")
+        return (
+            jsonify({"error": "Internal server error"}),
+            500,
+        )
 
-            # Record the balance as read under the lock
-            transaction.balance_before = user_wallet.balance
 
-            # Update wallet balance
-            user_wallet.update_balance_add(
-                transaction.quantity * transaction.price_per_unit
-            )
+@core.route("/process_orders", methods=["POST"])
+def process_orders():
+    """
+    Processes a batch of orders (e.g. a ladder of limit orders) in one request.
 
-            # Update wallet assets dictionary
-            user_wallet.update_assets_subtract(
-                transaction.coin_id, transaction.quantity
+    Expects JSON of the form {"orders": [<order>, ...], "atomic": true}, where each
+    order has the fields of a /process_order request and there are at most
+    MAX_BATCH_ORDERS of them. All orders are validated first, the prices of all their
+    coins are looked up at once (cached prices, then one CoinGecko call for the
+    rest), and the wallet is locked once. The orders are then applied to the locked
+    wallet in the given order, so each one is checked against what the previous ones
+    spent or reserved, and all Transaction and TransactionLikes rows are inserted and
+    committed together.
+
+    - atomic (default true): if any order fails, none is placed.
+    - atomic false: the orders that pass are placed, the others are reported.
+
+    Returns:
+        JSON response: {"results": [{"index", "success"} or {"index", "error"}, ...]}
+                       in request order, with HTTP 201 if every order was placed,
+                       HTTP 207 if only some were (non-atomic), and the status of the
+                       first failure if none was placed. A malformed batch returns
+                       HTTP 422 and server errors HTTP 500.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get("orders"), list):
+        return jsonify({"error": "Invalid batch request"}), 422
+    orders = body["orders"]
+    atomic = body.get("atomic", True)
+    if not orders or len(orders) > MAX_BATCH_ORDERS or not isinstance(atomic, bool):
+        return (
+            jsonify(
+                {"error": f"A batch must contain 1 to {MAX_BATCH_ORDERS} orders"}
+            ),
+            422,
+        )
+
+    # index -> (error message, HTTP status) of every failed order
+    errors = {}
+
+    phase_start = time.perf_counter()
+    for i, data in enumerate(orders):
+        error = _validate_order_request(data)
+        if error:
+            errors[i] = error
+    ORDER_LATENCY["validation"].observe(time.perf_counter() - phase_start)
+
+    # Price every coin of the batch at once
+    phase_start = time.perf_counter()
+    coin_ids = {data["coin_id"] for i, data in enumerate(orders) if i not in errors}
+    try:
+        prices = _get_current_prices(sorted(coin_ids)) if coin_ids else {}
+    except (requests.RequestException, TypeError, ValueError):
+        logging.exception("Failed to fetch prices for an order batch")
+        return jsonify({"error": "Market prices are unavailable"}), 502
+    for i, data in enumerate(orders):
+        if i in errors:
+            continue
+        if data["coin_id"] not in prices:
+            errors[i] = ("Invalid coin_id. Coin does not exist.", 422)
+            continue
+        error = _check_order_price(data, prices[data["coin_id"]])
+        if error:
+            errors[i] = error
+    ORDER_LATENCY["price"].observe(time.perf_counter() - phase_start)
+
+    def results():
+        return [
+            (
+                {"index": i, "error": errors[i][0]}
+                if i in errors
+                else {"index": i, "success": "Transaction processed successfully"}
             )
-        elif transaction.status == "open":
-            # Placing an open limit/stop order: reserve the funds (buy) or coins
-            # (sell) against the locked wallet so they cannot be double-spent by
-            # other orders before this one fills. Reservation is computed at the
-            # TRIGGER price (transaction.price_per_unit) and validated against the
-            # AVAILABLE (unreserved) balance/holdings; the pre-lock checks above are
-            # only a looser total-funds fast-fail and do not reserve.
-            if transaction.transactionType == "buy":
-                required = transaction.quantity * transaction.price_per_unit
-                if not user_wallet.has_enough_available_balance(required):
-                    db.session.rollback()
-                    return (
-                        jsonify(
-                            {
-                                "error": "Order failed: insufficient available USD balance"
-                            }
-                        ),
-                        400,
-                    )
-                user_wallet.reserve_balance(required)
-            elif transaction.transactionType == "sell":
-                if not user_wallet.has_enough_available_coins(
-                    transaction.coin_id, transaction.quantity
-                ):
-                    db.session.rollback()
-                    return (
-                        jsonify(
-                            {
-                                "error": "Order failed: insufficient available coin balance"
-                            }
-                        ),
-                        400,
-                    )
-                user_wallet.reserve_coins(transaction.coin_id, transaction.quantity)
+            for i in range(len(orders))
+        ]
 
-        # Add transaction and update user_wallet, then flush to assign the
-        # transaction's primary key without committing yet.
-        db.session.add(transaction)
-        db.session.add(user_wallet)
-        db.session.flush()
+    if errors and (atomic or len(errors) == len(orders)):
+        return jsonify({"results": results()}), errors[min(errors)][1]
 
-        # Create the likes row and commit everything in a single transaction, so a
-        # failure can't leave an orphan transaction with no TransactionLikes row.
-        transaction_likes = TransactionLikes(transaction_id=transaction.id)
-        db.session.add(transaction_likes)
-        db.session.commit()
+    user = db.session.get(User, get_jwt_identity())
+    try:
+        with ORDER_LATENCY["lock"].timer():
+            user_wallet = _lock_wallet(user.wallet.id)
+        if user_wallet is None:
+            db.session.rollback()
+            return jsonify({"error": "Wallet not found"}), 404
+
+        transactions = []
+        for i, data in enumerate(orders):
+            if i in errors:
+                continue
+            transaction = _new_transaction(
+                data, D(prices[data["coin_id"]]), user_wallet
+            )
+            error = _apply_order(user_wallet, transaction)
+            if error:
+                errors[i] = error
+            else:
+                transactions.append(transaction)
+
+        if not transactions or (errors and atomic):
+            db.session.rollback()
+            return jsonify({"results": results()}), errors[min(errors)][1]
+
+        with ORDER_LATENCY["commit"].timer():
+            # Transaction ids are generated client-side (uuid4 defaults), so the
+            # flush inserts all transactions in one batched statement and the likes
+            # rows follow in one bulk insert; everything commits together
+            db.session.add_all(transactions)
+            db.session.add(user_wallet)
+            db.session.flush()
+            db.session.execute(
+                db.insert(TransactionLikes),
+                [{"transaction_id": transaction.id} for transaction in transactions],
+            )
+            open_interest.record_orders(opened=transactions)
+            db.session.commit()
 
         update_user_wallet_value_in_background(user_wallet.id)
 
-        return jsonify({"success": "Transaction processed successfully"}), 201
+        return jsonify({"results": results()}), 207 if errors else 201
     except Exception:
         db.session.rollback()
-        logging.exception("Order processing failed")
-        return (
-            jsonify({"error": "Internal server error"}),
-            500,
-        )
+        logging.exception("Batch order processing failed")
+        return jsonify({"error": "Internal server error"}), 500
 
 
 @core.route("/get_wallet_history", methods=["GET"])
@@ -720,6 +933,8 @@ def get_wallet_history():
 
     This function, upon a successful request, returns a JSON response containing the
     wallet value history, including balance, assets value, total value, and timestamps.
+    Clients that accept the columnar format (see columnar.py) get one frame with the
+    columns timestamp, balance, assets and totalValue instead.
 
     If the wallet value history could not be fetched from the database for any reason,
     the function returns an error JSON response.
@@ -731,23 +946,28 @@ def get_wallet_history():
         user_id = get_jwt_identity()
         user = User.query.filter_by(id=user_id).first()
         wallet_history = user.wallet.value_history
+        timestamps = wallet_history.timestamps
 
-        res = {
-            "balance": [
-                [wallet_history.timestamps[i], wallet_history.balance_history[i]]
-                for i in range(len(wallet_history.timestamps))
-            ],
-            "assets": [
-                [wallet_history.timestamps[i], wallet_history.assets_value_history[i]]
-                for i in range(len(wallet_history.timestamps))
-            ],
-            "totalValue": [
-                [wallet_history.timestamps[i], wallet_history.total_value_history[i]]
-                for i in range(len(wallet_history.timestamps))
-            ],
-        }
+        if wants_columnar():
+            return columnar_response(
+                {
+                    "timestamp": ("q", timestamps),
+                    "balance": ("d", wallet_history.balance_history),
+                    "assets": ("d", wallet_history.assets_value_history),
+                    "totalValue": ("d", wallet_history.total_value_history),
+                }
+            )
 
-        return jsonify(res), 200
+        # Streamed pair by pair, so the [timestamp, value] lists are never built
+        response = stream_json_object(
+            {
+                "balance": zip(timestamps, wallet_history.balance_history),
+                "assets": zip(timestamps, wallet_history.assets_value_history),
+                "totalValue": zip(timestamps, wallet_history.total_value_history),
+            }
+        )
+        response.vary.add("Accept")
+        return response
     except Exception as e:
         return (
             jsonify(
@@ -799,13 +1019,31 @@ def get_wallet_total_current_value():
         )
 
 
+def _news_coin_candidates(query, coin_id=None):
+    """Returns the coin ids a news query may refer to (explicit id first, then any
+    coin whose id or name matches the query case-insensitively)."""
+    candidates = [coin_id] if coin_id else []
+    coins = get_coins_list_cached()
+    if isinstance(coins, list):
+        needle = query.strip().lower()
+        candidates += [
+            coin["id"]
+            for coin in coins
+            if coin["id"] == needle or coin.get("name", "").lower() == needle
+        ]
+    return candidates
+
+
 @core.route("/get_news_articles", methods=["POST"])
 def get_news_articles():
     """
     Fetch news articles based on a user-specified query and page number.
 
-    This endpoint accepts a JSON payload with the search query and page number to fetch
-    news articles using the NewsData API.
+    This endpoint accepts a JSON payload with the search query, page cursor and an
+    optional coin_id. News for the top tracked coins is served from the local news
+    store (see core/news.py) with keyset pagination; other queries are answered by a
+    local full-text search of the store (see core/search.py) when it has enough
+    matches, and fall back to the NewsData API otherwise.
 
     Returns:
         json: A JSON object containing a success message and a list of news articles.
@@ -817,31 +1055,45 @@ def get_news_articles():
         query = data["query"]
         next_page = data["nextPage"]
 
-        params = {
-            "apikey": NEWSDATA_API_KEY,
-            "q": query,
-            "removeduplicate": 1,
-            "language": "en",
-        }
-
-        if next_page != "":
-            params["page"] = next_page
+        if next_page == "" or next_page.startswith(news.LOCAL_CURSOR_PREFIX):
+            if next_page:
+                coin_id = news.decode_cursor(next_page)[0]
+            else:
+                coin_id = news.find_stored_coin(
+                    _news_coin_candidates(query, data.get("coin_id"))
+                )
 
-        response = requests.get(
-            "https://newsdata.io/api/1/crypto", params=params, timeout=10
-        )
-        data = response.json()
+            if coin_id is not None:
+                return jsonify(news.get_coin_news_page(coin_id, next_page)), 200
+            if next_page:
+                # Stale local cursor (articles purged since): end of the feed
+                return jsonify({"results": [], "nextPage": None, "totalResults": 0}), 200
+
+        # Untracked coins/free text: full-text search the store before going upstream,
+        # as long as it can fill at least the first page
+        if next_page == "" or next_page.startswith(search.SEARCH_CURSOR_PREFIX):
+            offset = search.decode_search_cursor(next_page) if next_page else 0
+            page = search.search_news(
+                query,
+                coin_id=data.get("coin_id"),
+                offset=offset,
+                limit=news.NEWS_PAGE_SIZE,
+            )
+            if next_page or len(page["results"]) == news.NEWS_PAGE_SIZE:
+                return jsonify(page), 200
 
-        if data["status"] == "error":
-            if data["results"]["code"] == "RateLimitExceeded":
-                return (
-                    jsonify(
-                        {
-                            "error": "News service rate limit reached. Please try again in a few minutes."
-                        }
-                    ),
-                    429,
-                )
+        try:
+            data = news.fetch_news_page(query, next_page)
+        except news.NewsRateLimited:
+            return (
+                jsonify(
+                    {
+                        "error": "News service rate limit reached. Please try again in a few minutes."
+                    }
+                ),
+                429,
+            )
+        except RuntimeError:
             return (
                 jsonify(
                     {"error": "Failed to fetch news articles. Please try again later."}
@@ -850,27 +1102,62 @@ def get_news_articles():
             )
 
         return jsonify(data), 200
+    except ValueError:
+        return jsonify({"error": "Invalid nextPage cursor"}), 400
     except Exception:
         logging.exception("Failed to fetch news")
         return jsonify({"error": "Internal server error"}), 500
 
 
-# Module-level cache for the RedditScraper instance. The scraper performs a blocking
-# OAuth token POST in its constructor, and the resulting token is valid for ~1 hour, so
-# we reuse a single instance across requests and only recreate it once its token is
-# close to expiring.
-_reddit_scraper = None
+# Process-wide Reddit OAuth token, refreshed in a background thread before it expires
+# (see RedditTokenManager), so no request ever waits on Reddit's token endpoint. The
+# scraper itself is stateless apart from the manager and is shared across requests.
+_reddit_token_manager = RedditTokenManager(
+    refresh_margin=REDDIT_TOKEN_REFRESH_MARGIN_SECONDS
+)
+_reddit_scraper = RedditScraper(token_manager=_reddit_token_manager)
+
+
+def start_reddit_token_refresh():
+    """Starts the background Reddit token refresher (idempotent)."""
+    _reddit_token_manager.start()
 
 
 def get_reddit_scraper():
-    """Returns a cached RedditScraper instance, recreating it (and its OAuth token)
-    only when no valid cached token is available."""
-    global _reddit_scraper
-    if _reddit_scraper is None or not _reddit_scraper.is_token_valid():
-        _reddit_scraper = RedditScraper()
+    """Returns the shared RedditScraper, making sure its token refresher is running."""
+    start_reddit_token_refresh()
     return _reddit_scraper
 
 
+def _search_reddit_page(query, after):
+    """
+    Fetch function behind _reddit_search_cache: one page of the coin-feed search.
+
+    Fetched posts are also indexed into the local store for full-text search. This
+    runs on request and prefetch threads alike, hence its own app context.
+    """
+    posts = get_reddit_scraper().search_keyword_in_reddit(
+        sort="relevance", keyword=query, time="week", limit=10, after=after
+    )
+
+    from app import app
+
+    with app.app_context():
+        try:
+            search.index_reddit_posts(posts)
+        except Exception:
+            db.session.rollback()
+            logging.exception("Failed to index Reddit posts")
+    return posts
+
+
+# Shared, TTL-bounded cache of Reddit search pages (see RedditSearchCache). Everyone
+# viewing the same coin reuses the same pages instead of re-running the search.
+_reddit_search_cache = RedditSearchCache(
+    fetch=_search_reddit_page, ttl=REDDIT_SEARCH_CACHE_TTL_SECONDS
+)
+
+
 @core.route("/get_reddit_posts", methods=["POST"])
 def get_reddit_posts():
     """
@@ -878,7 +1165,11 @@ def get_reddit_posts():
 
     This endpoint accepts a JSON payload with the search query and pagination 'after'
     parameter to fetch posts. It uses the RedditScraper class to scrape Reddit posts
-    based on relevance within the past week.
+    based on relevance within the past week. Every fetched post is kept in a local
+    full-text index that answers later searches directly while the query's matches
+    were ingested within REDDIT_SEARCH_CACHE_TTL_SECONDS; pages that still go to
+    Reddit are cached for REDDIT_SEARCH_CACHE_TTL_SECONDS, keyed on the normalized
+    query and cursor.
 
     Returns:
         json: A JSON object containing the success message and a list of posts. Each
@@ -891,35 +1182,97 @@ def get_reddit_posts():
         query = data["query"]
         after = data["after"]
 
-        # Reuse a cached RedditScraper (and its OAuth token) until the token is
-        # close to expiring, instead of doing a fresh token POST on every request.
-        scraper = get_reddit_scraper()
+        # Answered from the local full-text index when it holds enough fresh matches;
+        # otherwise served from the shared search cache, where a miss searches Reddit
+        # (and the page after this one is prefetched in the background)
+        posts = search.search_reddit_posts(query, after)
+        if posts is None:
+            posts = _reddit_search_cache.get_page(query, after)
 
-        # Search for Reddit posts
-        posts = scraper.search_keyword_in_reddit(
-            sort="relevance", keyword=query, time="week", limit=10, after=after
-        )
+        return jsonify([post.to_json(time_ago) for post in posts]), 200
+    except Exception:
+        logging.exception("Failed to fetch Reddit posts")
+        return jsonify({"error": "Internal server error"}), 500
 
-        res = []
 
-        # Extract the necessary data from each post
-        for post in posts:
-            temp = {}
-            temp["title"] = post.title
-            temp["thumbnail"] = post.thumbnail if post.thumbnail != "self" else ""
-            temp["content"] = post.content
-            temp["subreddit"] = post.subreddit
-            temp["score"] = post.score
-            temp["comment_count"] = post.comment_count
-            temp["id"] = post.id
-            temp["url"] = post.url
-            temp["fullname"] = post.fullname
-            temp["timestamp"] = time_ago(post.timestamp)
-            res.append(temp)
+@core.route("/get_reddit_feed", methods=["POST"])
+def get_reddit_feed():
+    """
+    Fetches one merged Reddit feed from several sources at once (e.g. a coin's name,
+    its ticker and its subreddit).
 
-        return jsonify(res), 200
+    All sources are requested concurrently over a single pooled connection, so the
+    wall-clock time is roughly that of the slowest source rather than the sum. Posts
+    are merged round-robin and de-duplicated by fullname.
+
+    Expects a JSON payload with:
+        queries (list[str]): Keywords to search for across all of Reddit
+        subreddit (str, optional): A subreddit whose hot posts should be included
+        after (dict, optional): The per-source pagination cursors returned by the
+                                previous page
+
+    Returns:
+        json: {"data": [...posts...], "after": {source: cursor}}. A source with no
+              further results is omitted from "after".
+    """
+    try:
+        data = request.get_json() or {}
+        queries = data.get("queries") or []
+        subreddit = data.get("subreddit") or ""
+        after = data.get("after") or {}
+
+        if (
+            not isinstance(queries, list)
+            or not all(isinstance(q, str) and q.strip() for q in queries)
+            or not isinstance(subreddit, str)
+            or not isinstance(after, dict)
+            or not (queries or subreddit)
+        ):
+            return jsonify({"error": "Invalid Reddit feed request"}), 422
+
+        # Dedupe queries case-insensitively so "Bitcoin" and "bitcoin" cost one call
+        queries = list({q.strip().lower(): q.strip() for q in queries}.values())
+
+        async def fetch_feed(headers):
+            async with AsyncRedditScraper(headers) as reddit:
+                sources = {
+                    query: reddit.search_keyword_in_reddit(
+                        sort="relevance",
+                        keyword=query,
+                        time="week",
+                        limit=10,
+                        after=after.get(query, ""),
+                    )
+                    for query in queries
+                }
+                if subreddit:
+                    sources[f"r/{subreddit}"] = reddit.get_posts_from_subreddit(
+                        sort="hot",
+                        subreddit=subreddit,
+                        limit=10,
+                        after=after.get(f"r/{subreddit}", ""),
+                    )
+                return await reddit.fetch_sources(sources)
+
+        posts_by_source = asyncio.run(fetch_feed(get_reddit_scraper().headers))
+
+        return (
+            jsonify(
+                {
+                    "data": [
+                        post.to_json(time_ago) for post in merge_posts(posts_by_source)
+                    ],
+                    "after": {
+                        source: posts[-1].fullname
+                        for source, posts in posts_by_source.items()
+                        if posts
+                    },
+                }
+            ),
+            200,
+        )
     except Exception:
-        logging.exception("Failed to fetch Reddit posts")
+        logging.exception("Failed to fetch Reddit feed")
         return jsonify({"error": "Internal server error"}), 500
 
 
@@ -1034,6 +1387,7 @@ def update_user_wallet_value_in_background(current_wallet_id=None):
                         url, params=params, headers=COINGECKO_API_HEADERS, timeout=10
                     )
                     data = response.json()
+                    price_cache.record_prices(data)
 
                     for coin in data:
                         coin_market_prices[coin["id"]] = D(coin["current_price"])
@@ -1063,6 +1417,13 @@ def update_user_wallet_value_in_background(current_wallet_id=None):
                         for key in wallet.assets
                         if qty_get(wallet.assets, key) and key not in coin_market_prices
                     ]
+                    # Hot coins can still be valued from the last closed hourly
+                    # point of their memory-mapped price series
+                    for key in list(missing):
+                        price = price_series.latest_price(key, "1h", max_age=7_200)
+                        if price is not None:
+                            coin_market_prices[key] = D(price)
+                            missing.remove(key)
                     if missing:
                         logging.warning(
                             "Skipping value update for wallet %s: missing prices for %s",
@@ -1130,8 +1491,9 @@ def update_open_trades_in_background():
 
         This function invokes the `cancel_open_order` method of the given transaction
         object to change its status to 'cancelled', releases the funds/coins that were
-        reserved when the order was placed (back onto the row-locked wallet), and adds
-        both the transaction and wallet to the database session for persistence.
+        reserved when the order was placed (back onto the row-locked wallet), removes
+        it from the open interest, and adds both the transaction and wallet to the
+        database session for persistence.
 
         Args:
         transaction (Transaction): The transaction object representing the order to be cancelled.
@@ -1147,6 +1509,7 @@ def update_open_trades_in_background():
             wallet.release_coins(transaction.coin_id, transaction.quantity)
 
         transaction.cancel_open_order()
+        open_interest.record_orders(closed=[transaction])
         db.session.add(transaction)
         db.session.add(wallet)
 
@@ -1181,19 +1544,17 @@ def update_open_trades_in_background():
             # fill cost for a buy limit/stop, so available balance is restored.
             wallet.release_balance(transaction.quantity * transaction.price_per_unit)
             # Update wallet balance and assets for buy order
-            wallet.update_balance_subtract(
-                transaction.quantity * coin_market_prices[transaction.coin_id]
-            )
+            wallet.update_balance_subtract(transaction.filled_value)
             wallet.update_assets_add(transaction.coin_id, transaction.quantity)
         else:
             # Release the coins reserved at placement BEFORE subtracting the sold
             # quantity, keeping the reserved-coins bookkeeping consistent.
             wallet.release_coins(transaction.coin_id, transaction.quantity)
             # Update wallet balance and assets for sell order
-            wallet.update_balance_add(
-                transaction.quantity * coin_market_prices[transaction.coin_id]
-            )
+            wallet.update_balance_add(transaction.filled_value)
             wallet.update_assets_subtract(transaction.coin_id, transaction.quantity)
+        open_interest.record_orders(closed=[transaction])
+        positions.record_fill(transaction)
 
         # Update the transaction and the wallet in the database
         db.session.add(transaction)
@@ -1249,6 +1610,7 @@ def update_open_trades_in_background():
                 # A rate-limit/error body may be a dict rather than the expected list
                 if not isinstance(data, list):
                     continue
+                price_cache.record_prices(data)
 
                 for coin in data:
                     coin_market_prices[coin["id"]] = D(coin["current_price"])
@@ -1376,12 +1738,60 @@ def get_coins_data(coin_ids: str, precision: int | None = None):
         )
         data = response.json()
 
+        # Rounded (display) prices must not be used to fill orders
+        if not precision:
+            price_cache.record_prices(data)
+
     except Exception as e:
         raise e
 
     return data
 
 
+@core.route("/get_positions_pnl", methods=["GET"])
+def get_positions_pnl():
+    """
+    Retrieves the current user's position in every coin they have traded, with its
+    PnL.
+
+    Positions are read from the positions table (see core/positions.py), which is
+    kept up to date on every fill, and the coins still held are priced from the
+    local price cache (CoinGecko is only asked for the prices it lacks). The work is
+    proportional to the number of coins traded, not to the number of trades. If
+    prices are unavailable, positions are still returned, with null market values.
+
+    Returns:
+        JSON response: {"positions": [...], "totals": {...}} (see
+                       positions.positions_pnl) with HTTP 200, an error JSON
+                       response with HTTP 503 while the wallet's positions have not
+                       been replayed from its transactions yet (see
+                       replay_positions.py), or with HTTP 500.
+    """
+    try:
+        user = db.session.get(User, get_jwt_identity())
+        if not positions.positions_replayed(user.wallet):
+            # Fills from before the positions table are not in it yet
+            return (
+                jsonify(
+                    {"error": "Positions are being rebuilt. Please try again later."}
+                ),
+                503,
+            )
+        rows = positions.get_positions(user.wallet.id)
+
+        held = sorted(row.coin_id for row in rows if row.quantity > 0)
+        try:
+            prices = _get_current_prices(held) if held else {}
+        except (requests.RequestException, TypeError, ValueError):
+            logging.exception("Failed to fetch prices for positions")
+            prices = {}
+
+        return jsonify(positions.positions_pnl(rows, prices)), 200
+    except Exception:
+        logging.exception("Failed to fetch positions")
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @core.route("/get_wallet_assets", methods=["GET"])
 def get_wallet_assets():
     """
@@ -1579,6 +1989,7 @@ def cancel_open_trade():
 
         # Else cancel the order and commit to the db
         transaction.cancel_open_order()
+        open_interest.record_orders(closed=[transaction])
         db.session.add(transaction)
         db.session.add(wallet)
         db.session.commit()
@@ -1594,64 +2005,60 @@ def get_top_coins():
     Retrieve and return a list of the top coins from the CoinGecko API, sorted by a
     user-specified criterion.
 
-    The function fetches JSON data from the CoinGecko API based on the sorting
-    parameter received from the client. The response includes various details about the
-    coins such as current price, price change percentages over different time frames,
-    and sparkline data.
+    The table is a single cached CoinGecko snapshot with every sort order precomputed,
+    refreshed in the background (see core/market_cache.py), so requests never wait on
+    CoinGecko once it is warm. The response includes various details about the coins
+    such as current price, price change percentages over different time frames, and a
+    SPARKLINE_POINTS-point (min/max-preserving) 7-day sparkline.
 
     The endpoint accepts a POST request with a JSON body that specifies the sorting
-    criteria.
+    criteria ("<key>_asc" / "<key>_desc" for market_cap, volume, price,
+    price_change_1h, price_change_24h or price_change_7d) and optionally `page`
+    (default 1) and `per_page` (default 100, at most 250) to page through the top
+    TOP_COINS_SNAPSHOT_SIZE coins.
 
     Returns:
-        A JSON response containing an array of the top 100 cryptocurrencies sorted
-        according to the specified parameter. Each item in the array includes detailed
-        market data of the coin.
+        A JSON response containing an array of (one page of) the top cryptocurrencies
+        by market cap, sorted according to the specified parameter. Each item in the
+        array includes detailed market data of the coin.
     """
     try:
         data = request.get_json()
         sort_coins_by = data["sort_coins_by"]
+        page = data.get("page", 1)
+        per_page = data.get("per_page", 100)
 
         # Validate the sort_coins_by argument
-        if sort_coins_by not in {
-            "market_cap_asc",
-            "market_cap_desc",
-            "volume_asc",
-            "volume_desc",
-        }:
+        if sort_coins_by not in market_cache.TOP_COINS_SORTS:
             return (
                 jsonify(
                     {
-                        "error": "Invalid sort_coins_by value. Must be one of: market_cap_asc, market_cap_desc, volume_asc, volume_desc."
+                        "error": "Invalid sort_coins_by value. Must be one of: "
+                        + ", ".join(sorted(market_cache.TOP_COINS_SORTS))
+                        + "."
                     }
                 ),
                 400,
             )
+        if (
+            not isinstance(page, int)
+            or not isinstance(per_page, int)
+            or page < 1
+            or not 1 <= per_page <= 250
+        ):
+            return (
+                jsonify({"error": "page must be >= 1 and per_page between 1 and 250."}),
+                400,
+            )
 
-        url = "https://api.coingecko.com/api/v3/coins/markets"
-        params = {
-            "vs_currency": "usd",
-            "order": sort_coins_by,
-            "per_page": 100,
-            "page": 1,
-            "price_change_percentage": "1h,24h,7d",
-            "precision": 2,
-            "sparkline": "true",
-        }
-
-        response = requests.get(
-            url, params=params, headers=COINGECKO_API_HEADERS, timeout=10
+        snapshot, version, updated_at = market_cache.get_top_coins()
+        return cached_json_response(
+            f"top_coins:{sort_coins_by}:{page}:{per_page}",
+            version,
+            lambda: snapshot.page(sort_coins_by, page, per_page),
+            max_age=30,
+            last_modified=updated_at,
         )
-        data = response.json()
-        temp = []
-        for coin in data:
-            temp.append(
-                {
-                    **coin,
-                    "identity": {"name": coin["name"], "symbol": coin["symbol"]},
-                    "sparkline_in_7d": coin["sparkline_in_7d"]["price"],
-                }
-            )
-        return jsonify(temp)
     except Exception:
         logging.exception("get_top_coins failed")
         return jsonify({"error": "Internal server error"}), 502
@@ -1694,26 +2101,38 @@ def get_coin_data(coin_id: str):
 @core.route("/get_coin_sparkline/<coin_id>", methods=["GET"])
 def get_coin_sparkline(coin_id: str):
     try:
-        get_coins_list_cached()
-        if coin_id not in _COINS_LIST_CACHE_SET:
+        if _is_unknown_coin(coin_id):
             return jsonify({"error": f"Unknown coin id: {coin_id}"}), 404
 
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        params = {
-            "vs_currency": "usd",
-            "days": "7",
-            "interval": "hourly",
-        }
-
-        response = requests.get(
-            url, params=params, headers=COINGECKO_API_HEADERS, timeout=10
-        )
-        data = response.json()
-        data = data["prices"]
-        data = [price for tick, price in data]
-        data = jsonify(data)
+        # Precomputed by the top-coins snapshots, else the hot coins' series file
+        sparkline = market_cache.get_cached_sparkline(coin_id)
+        if sparkline is None:
+            now = int(time.time())
+            prices = price_series.read_prices(coin_id, "1h", now - 7 * 86_400, now)
+            if prices is not None:
+                sparkline = market_cache.downsample_minmax(prices)
+
+        if sparkline is None:
+            url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
+            params = {
+                "vs_currency": "usd",
+                "days": "7",
+                "interval": "hourly",
+            }
 
-        return data
+            response = requests.get(
+                url, params=params, headers=COINGECKO_API_HEADERS, timeout=10
+            )
+            data = response.json()
+            data = data["prices"]
+            data = [price for tick, price in data]
+            sparkline = market_cache.downsample_minmax(data)
+
+        if wants_columnar():
+            return columnar_response({"price": ("d", sparkline)})
+        response = jsonify(sparkline)
+        response.vary.add("Accept")
+        return response
     except Exception:
         return jsonify({"error": "Internal server error"}), 502
 
@@ -1751,6 +2170,27 @@ def get_coin_balance(coin_id: str):
     return data, 200
 
 
+@core.route("/get_open_interest/<coin_id>", methods=["GET"])
+def get_open_interest(coin_id: str):
+    """
+    Fetches the open interest of a coin across all users: the number, total quantity
+    and total notional (USD, at the trigger prices) of its open orders, per side and
+    order type. Read from the open_interest aggregates (see core/open_interest.py),
+    not from the open transactions.
+
+    Returns:
+        Flask.Response: A JSON list of {coin_id, side, orderType, count, quantity,
+                        notional} objects (empty if the coin has no open orders), with
+                        HTTP 200, or an error JSON response with HTTP 500.
+    """
+    try:
+        rows = open_interest.get_open_interest(coin_id)
+        return jsonify([row.to_json() for row in rows]), 200
+    except Exception:
+        logging.exception("Failed to fetch open interest for %s", coin_id)
+        return jsonify({"error": "Internal server error"}), 500
+
+
 @core.route("/get_all_coin_names")
 def get_all_coin_names():
     """
@@ -1765,8 +2205,16 @@ def get_all_coin_names():
         the coin's ID, symbol, and name.
     """
     try:
-        return jsonify(get_coins_list_cached())
+        coins_list, version, updated_at = market_cache.get_coins_list()
+        return cached_json_response(
+            "all_coin_names",
+            version,
+            lambda: coins_list.coins,
+            max_age=COINS_LIST_CACHE_TTL_SECONDS,
+            last_modified=updated_at,
+        )
     except Exception:
+        logging.exception("get_all_coin_names failed")
         return jsonify({"error": "Internal server error"}), 502
 
 
@@ -1775,98 +2223,238 @@ def get_trending_coins():
     """
     Fetch and return data for currently trending coins from the CoinGecko API.
 
-    This function handles a GET request and queries the CoinGecko API's trending
-    endpoint, which provides data on the most popular cryptocurrencies based on recent
-    search activities.
+    The CoinGecko trending feed (the most popular cryptocurrencies based on recent
+    search activities) is cached and parsed once per refresh (see
+    core/market_cache.py), and served with an ETag so that unchanged repeat loads get
+    a 304 Not Modified (see http_cache.py).
 
     Returns:
         Flask.Response: A JSON response containing data about trending cryptocurrency coins.
     """
-    url = "https://api.coingecko.com/api/v3/search/trending"
-
     try:
-        response = requests.get(url, headers=COINGECKO_API_HEADERS, timeout=10)
+        coins, version, updated_at = market_cache.get_trending_coins()
+        return cached_json_response(
+            "trending_coins",
+            version,
+            lambda: [coin.to_json() for coin in coins],
+            max_age=60,
+            last_modified=updated_at,
+        )
+    except Exception:
+        logging.exception("Failed to fetch trending coins data")
+        return jsonify({"error": "Internal server error"}), 500
 
-        data = response.json()
-        data = data["coins"]
-        data = [coin["item"] for coin in data]
 
-        data = [
-            {
-                "coin_id": coin["id"],
-                "name": coin["name"],
-                "thumb": coin["thumb"],
-                "symbol": coin["symbol"],
-                "market_cap_rank": coin["market_cap_rank"],
-                "price": coin["data"]["price"],
-                "total_volume": int(coin["data"]["total_volume"][1:].replace(",", "")),
-                "market_cap": int(coin["data"]["market_cap"][1:].replace(",", "")),
-                "price_change_percentage_24h": {
-                    "usd": coin["data"]["price_change_percentage_24h"]["usd"],
-                    "btc": coin["data"]["price_change_percentage_24h"]["btc"],
-                },
-            }
-            for coin in data
-        ]
+def _parse_range_args(default_interval):
+    """
+    Reads the `from` / `to` (UNIX seconds) and `interval` query parameters of the
+    candle endpoints.
 
-        return jsonify(data)
-    except Exception:
-        logging.exception("Failed to fetch top coins data")
-        return jsonify({"error": "Internal server error"}), 500
+    Returns:
+        tuple: (interval, start, end), where start and end are None if not given
+
+    Raises:
+        ValueError: If `from` or `to` is not an integer, or the range is empty.
+    """
+    start = request.args.get("from")
+    end = request.args.get("to")
+    start = int(start) if start is not None else None
+    end = int(end) if end is not None else None
+    if start is not None and end is not None and start > end:
+        raise ValueError("from must not be after to")
+    return request.args.get("interval", default_interval), start, end
+
+
+def _resolve_range(start, end, version):
+    """
+    Fills in the default range: the 365 days up to the series' last sync. Anchoring
+    it to the version instead of the current time keeps the body identical for as
+    long as the version (and so the ETag) is.
+    """
+    if start is None:
+        start = (version or 0) - 365 * 86_400
+    if end is None:
+        end = 2**31 - 1
+    return start, end
+
+
+def _ohlc_columns(ohlc: list) -> dict:
+    rows = list(zip(*ohlc)) or [()] * 5
+    return {
+        "timestamp": ("q", rows[0]),
+        "open": ("d", rows[1]),
+        "high": ("d", rows[2]),
+        "low": ("d", rows[3]),
+        "close": ("d", rows[4]),
+    }
+
+
+def _history_columns(history: dict) -> dict:
+    # The three series of a history share their timestamps
+    return {
+        "timestamp": ("q", [ts for ts, _ in history["prices"]]),
+        "price": ("d", [value for _, value in history["prices"]]),
+        "market_cap": ("d", [value for _, value in history["market_caps"]]),
+        "total_volume": ("d", [value for _, value in history["total_volumes"]]),
+    }
+
+
+def _cached_chart_response(key: str, version, build, to_columns):
+    """
+    Serves a chart series through the HTTP cache as JSON, or as a columnar frame
+    (see columnar.py) if the client asks for one.
+
+    Parameters:
+        key: Resource key of the series (see cached_json_response)
+        version: Version of the series (its last sync time)
+        build: Returns the series in its JSON shape
+        to_columns: Converts the JSON shape into encode_frame() columns
+    """
+    if wants_columnar():
+        response = cached_response(
+            f"{key}:columnar",
+            version,
+            lambda: encode_frame(to_columns(build())),
+            COLUMNAR_MIMETYPE,
+            max_age=CANDLE_LIVE_REFRESH_SECONDS,
+            last_modified=version,
+        )
+    else:
+        response = cached_json_response(
+            key,
+            version,
+            build,
+            max_age=CANDLE_LIVE_REFRESH_SECONDS,
+            last_modified=version,
+        )
+    response.vary.add("Accept")
+    return response
 
 
 @core.route("/get_coin_OHLC_data/<coin_id>", methods=["GET"])
 def get_coin_OHLC_data(coin_id: str):
     """
     Fetch and return the Open, High, Low, and Close (OHLC) market data for a specified
-    coin over the past year.
+    coin.
 
-    This function processes a POST request containing JSON data with a 'coin_id' key.
-    It uses this ID to query the CoinGecko API and retrieves OHLC data in USD for the
-    specified coin over the last 365 days.
+    Candles are served from the local candle store (see core/candles.py), which is
+    backfilled from CoinGecko once and then only synced for new candles. Accepts the
+    optional query parameters `from` and `to` (UNIX seconds, default: the 365 days
+    up to the last sync) and `interval` ("30m", "4h" or "4d", default "4d").
 
     Returns:
-        Flask.Response: A JSON response containing the OHLC data for the specified coin.
+        Flask.Response: A JSON response containing the OHLC data for the specified coin,
+                        or a columnar frame (timestamp, open, high, low, close) if the
+                        client accepts one.
     """
     try:
-        get_coins_list_cached()
-        if coin_id not in _COINS_LIST_CACHE_SET:
-            return jsonify({"error": f"Unknown coin id: {coin_id}"}), 404
-
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/ohlc?vs_currency=usd&days=365"
+        interval, start, end = _parse_range_args("4d")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 422
+    if interval not in candles.OHLC_INTERVALS:
+        return jsonify({"error": f"Unsupported interval: {interval}"}), 422
 
-        response = requests.get(url, headers=COINGECKO_API_HEADERS, timeout=10)
-        data = response.json()
-        data = jsonify(data)
+    try:
+        if _is_unknown_coin(coin_id):
+            return jsonify({"error": f"Unknown coin id: {coin_id}"}), 404
 
-        return data
+        version = candles.ohlc_version(coin_id, interval)
+        start, end = _resolve_range(start, end, version)
+        return _cached_chart_response(
+            f"ohlc:{coin_id}:{interval}:{start}:{end}",
+            version,
+            lambda: candles.get_ohlc(coin_id, interval, start, end, sync=False),
+            _ohlc_columns,
+        )
     except Exception:
+        logging.exception("get_coin_OHLC_data failed")
         return jsonify({"error": "Internal server error"}), 502
 
 
 @core.route("/get_coin_historical_data/<coin_id>", methods=["GET"])
 def get_coin_historical_data(coin_id: str):
     """
-    Fetch and return historical market data for a specified coin over the past year.
+    Fetch and return historical market data (prices, market caps and total volumes)
+    for a specified coin.
 
-    This function handles a POST request with JSON content that includes a 'coin_id'.
-    It queries the CoinGecko API to retrieve daily market chart data in USD for the
-    specified coin over the last 365 days.
+    Points are served from the memory-mapped series file of hot coins (see
+    core/price_series.py) or else from the local price history store (see
+    core/candles.py), which is backfilled from CoinGecko once and then only synced for
+    new points. Accepts the
+    optional query parameters `from` and `to` (UNIX seconds, default: the 365 days
+    up to the last sync) and `interval` ("1h" or "1d", default "1d").
 
     Returns:
-        Flask.Response: A JSON response containing the historical market data.
+        Flask.Response: A JSON response containing the historical market data, or a
+                        columnar frame (timestamp, price, market_cap, total_volume) if
+                        the client accepts one.
     """
     try:
-        get_coins_list_cached()
-        if coin_id not in _COINS_LIST_CACHE_SET:
+        interval, start, end = _parse_range_args("1d")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 422
+    if interval not in candles.HISTORY_INTERVALS:
+        return jsonify({"error": f"Unsupported interval: {interval}"}), 422
+
+    try:
+        if _is_unknown_coin(coin_id):
             return jsonify({"error": f"Unknown coin id: {coin_id}"}), 404
 
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart?vs_currency=usd&days=365&interval=daily"
+        version = candles.history_version(coin_id, interval)
+        start, end = _resolve_range(start, end, version)
 
-        response = requests.get(url, headers=COINGECKO_API_HEADERS, timeout=10)
-        data = response.json()
-        data = jsonify(data)
+        def build():
+            # Hot coins are read straight from their memory-mapped series file
+            history = price_series.read_history(coin_id, interval, start, end)
+            if history is None:
+                history = candles.get_history(
+                    coin_id, interval, start, end, sync=False
+                )
+            return history
 
-        return data
+        return _cached_chart_response(
+            f"history:{coin_id}:{interval}:{start}:{end}",
+            version,
+            build,
+            _history_columns,
+        )
     except Exception:
+        logging.exception("get_coin_historical_data failed")
         return jsonify({"error": "Internal server error"}), 502
+
+
+@core.route("/get_coin_social_metrics/<coin_id>", methods=["GET"])
+def get_coin_social_metrics(coin_id: str):
+    """
+    Fetch and return the social activity time series (news/Reddit mentions, mention
+    velocity, score-weighted volume, comment growth) of a specified coin.
+
+    Snapshots are precomputed by the social metrics pipeline (see core/social.py), so
+    this only reads stored rows. Accepts an optional `days` query parameter (1 to
+    SOCIAL_METRICS_RETENTION_DAYS, default 7).
+
+    Returns:
+        Flask.Response: A JSON list of snapshots, oldest first.
+    """
+    try:
+        days = int(request.args.get("days", 7))
+        if not 1 <= days <= SOCIAL_METRICS_RETENTION_DAYS:
+            return (
+                jsonify(
+                    {
+                        "error": f"days must be between 1 and {SOCIAL_METRICS_RETENTION_DAYS}"
+                    }
+                ),
+                422,
+            )
+    except ValueError:
+        return jsonify({"error": "days must be an integer"}), 422
+
+    try:
+        metrics = social.get_coin_social_metrics(
+            coin_id, since=int(time.time()) - days * 86_400
+        )
+        return jsonify([metric.to_json() for metric in metrics]), 200
+    except Exception:
+        logging.exception("Failed to fetch coin social metrics")
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,315 @@
+"""Local OHLC candle and price history store.
+
+Coin pages used to fetch a full year of candles (/ohlc) and price history
+(/market_chart) from CoinGecko on every view, although only the newest candle ever
+changes. Both are now kept in Postgres (coin_candles / coin_price_points), keyed by
+coin, interval and timestamp:
+
+- The first read of a (coin, interval) backfills the full range once.
+- Later reads are local range scans. Upstream is only asked again once the live
+  (newest, still-forming) candle is older than CANDLE_LIVE_REFRESH_SECONDS, and then
+  with the smallest `days` range that covers the gap since the last closed candle,
+  so upstream traffic scales with new data rather than with page views.
+
+If a sync fails, whatever is stored is served; only a coin with no data at all
+surfaces the error. A failed series is not synced again for
+CANDLE_LIVE_REFRESH_SECONDS, so an upstream outage costs one timed-out request per
+series and refresh window rather than one per page view.
+"""
+
+import logging
+import math
+import time
+
+import requests
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from constants import CANDLE_LIVE_REFRESH_SECONDS, COINGECKO_API_HEADERS
+from extensions import db
+from models import CoinCandle, CoinPricePoint
+
+# interval -> (width in seconds, `days` values of /ohlc that return that width). The
+# /ohlc granularity is implied by `days`: 1 day -> 30m, 7-30 days -> 4h, 90+ -> 4d.
+OHLC_INTERVALS = {
+    "30m": (1_800, (1,)),
+    "4h": (14_400, (7, 14, 30)),
+    "4d": (345_600, (90, 180, 365)),
+}
+
+# interval -> (spacing in seconds, min days, max days, extra /market_chart params).
+# CoinGecko returns hourly points for 2-90 days unless daily is requested.
+HISTORY_INTERVALS = {
+    "1h": (3_600, 2, 90, {}),
+    "1d": (86_400, 1, 365, {"interval": "daily"}),
+}
+
+# (table, coin_id, interval) -> UNIX time of the series' last failed sync, per process.
+# A failed sync leaves fetched_at unchanged, so this is what backs it off.
+_failed_syncs = {}
+
+
+def _coingecko_get(path: str, params: dict):
+    response = requests.get(
+        f"https://api.coingecko.com/api/v3{path}",
+        params=params,
+        headers=COINGECKO_API_HEADERS,
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def _sync_state(model, coin_id: str, interval: str):
+    """Returns (newest final timestamp, newest fetched_at) for a series, or Nones."""
+    return db.session.execute(
+        db.select(
+            func.max(model.timestamp).filter(model.final),
+            func.max(model.fetched_at),
+        ).where(model.coin_id == coin_id, model.interval == interval)
+    ).one()
+
+
+def _needs_sync(last_fetched, now: int) -> bool:
+    # Every width is longer than CANDLE_LIVE_REFRESH_SECONDS, so refreshing the live
+    # row this often also picks up each newly closed candle
+    return last_fetched is None or now - last_fetched >= CANDLE_LIVE_REFRESH_SECONDS
+
+
+def _store(model, coin_id: str, interval: str, rows: list[dict], last_final) -> None:
+    """
+    Replaces the series' live row and upserts the fetched rows newer than the last
+    final one. The newest fetched row becomes the new live row.
+
+    If upstream returned nothing newer, the live row is kept and only the newest
+    row's fetched_at is bumped, so the empty sync still counts towards
+    CANDLE_LIVE_REFRESH_SECONDS.
+    """
+    now = int(time.time())
+    if last_final is not None:
+        rows = [row for row in rows if row["timestamp"] > last_final]
+    for i, row in enumerate(rows):
+        row.update(
+            coin_id=coin_id,
+            interval=interval,
+            final=i < len(rows) - 1,
+            fetched_at=now,
+        )
+
+    series = db.and_(model.coin_id == coin_id, model.interval == interval)
+    if not rows:
+        newest = db.select(func.max(model.timestamp)).where(series).scalar_subquery()
+        db.session.execute(
+            db.update(model)
+            .where(series, model.timestamp == newest)
+            .values(fetched_at=now)
+        )
+    else:
+        db.session.execute(db.delete(model).where(series, ~model.final))
+        statement = insert(model).values(rows)
+        db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[model.coin_id, model.interval, model.timestamp],
+                set_={
+                    column: statement.excluded[column]
+                    for column in rows[0]
+                    if column not in ("coin_id", "interval", "timestamp")
+                },
+            )
+        )
+    db.session.commit()
+
+
+def _days_to_fetch(last_final, now: int, width: int, min_days: int, max_days: int):
+    """Smallest `days` range that covers everything after last_final."""
+    if last_final is None:
+        return max_days
+    gap_days = math.ceil((now - last_final + width) / 86_400)
+    return min(max(gap_days, min_days), max_days)
+
+
+def sync_ohlc(coin_id: str, interval: str) -> None:
+    """Fetches the candles of a series newer than the stored ones."""
+    width, days_options = OHLC_INTERVALS[interval]
+    last_final, last_fetched = _sync_state(CoinCandle, coin_id, interval)
+    now = int(time.time())
+    if not _needs_sync(last_fetched, now):
+        return
+
+    needed = _days_to_fetch(last_final, now, width, 1, days_options[-1])
+    days = next(option for option in days_options if option >= needed)
+    data = _coingecko_get(
+        f"/coins/{coin_id}/ohlc", {"vs_currency": "usd", "days": days}
+    )
+    rows = [
+        {"timestamp": int(ts // 1000), "open": o, "high": h, "low": l, "close": c}
+        for ts, o, h, l, c in data
+    ]
+    _store(CoinCandle, coin_id, interval, rows, last_final)
+
+
+def sync_history(coin_id: str, interval: str) -> None:
+    """Fetches the price history points of a series newer than the stored ones."""
+    width, min_days, max_days, extra_params = HISTORY_INTERVALS[interval]
+    last_final, last_fetched = _sync_state(CoinPricePoint, coin_id, interval)
+    now = int(time.time())
+    if not _needs_sync(last_fetched, now):
+        return
+
+    days = _days_to_fetch(last_final, now, width, min_days, max_days)
+    data = _coingecko_get(
+        f"/coins/{coin_id}/market_chart",
+        {"vs_currency": "usd", "days": days, **extra_params},
+    )
+    market_caps = dict((int(ts), value) for ts, value in data["market_caps"])
+    total_volumes = dict((int(ts), value) for ts, value in data["total_volumes"])
+
+    # Keyed by timestamp so CoinGecko's occasional duplicate points collapse
+    rows = {
+        int(ts // 1000): {
+            "timestamp": int(ts // 1000),
+            "price": price,
+            "market_cap": market_caps.get(int(ts)),
+            "total_volume": total_volumes.get(int(ts)),
+        }
+        for ts, price in data["prices"]
+    }
+    _store(CoinPricePoint, coin_id, interval, list(rows.values()), last_final)
+
+
+def _has_data(model, coin_id: str, interval: str) -> bool:
+    return (
+        db.session.scalar(
+            db.select(model.timestamp)
+            .where(model.coin_id == coin_id, model.interval == interval)
+            .limit(1)
+        )
+        is not None
+    )
+
+
+def _sync_quietly(sync, model, coin_id: str, interval: str) -> None:
+    """
+    Runs a sync, falling back to the stored data if there is any. After a failure the
+    series is not synced again until CANDLE_LIVE_REFRESH_SECONDS have passed.
+
+    Raises:
+        Whatever the sync raised, or RuntimeError while backing off from a failure,
+        if nothing is stored for the series
+    """
+    key = (model.__tablename__, coin_id, interval)
+    failed_at = _failed_syncs.get(key)
+    if failed_at is not None and time.time() - failed_at < CANDLE_LIVE_REFRESH_SECONDS:
+        if not _has_data(model, coin_id, interval):
+            raise RuntimeError(f"Candle sync for {coin_id}/{interval} failed recently")
+        return
+
+    try:
+        sync(coin_id, interval)
+    except Exception:
+        db.session.rollback()
+        _failed_syncs[key] = time.time()
+        if not _has_data(model, coin_id, interval):
+            raise
+        logging.exception(
+            "Candle sync failed for %s/%s; serving stored data", coin_id, interval
+        )
+    else:
+        _failed_syncs.pop(key, None)
+
+
+def ohlc_version(coin_id: str, interval: str) -> int:
+    """
+    Syncs a candle series if due and returns its version: the fetched_at of its
+    newest sync, which changes whenever the stored series does.
+
+    Raises:
+        KeyError: If interval is not one of OHLC_INTERVALS
+        Whatever the upstream request raises when nothing is stored yet
+    """
+    if interval not in OHLC_INTERVALS:
+        raise KeyError(interval)
+    _sync_quietly(sync_ohlc, CoinCandle, coin_id, interval)
+    return _sync_state(CoinCandle, coin_id, interval)[1]
+
+
+def history_version(coin_id: str, interval: str) -> int:
+    """Like ohlc_version(), for a price history series."""
+    if interval not in HISTORY_INTERVALS:
+        raise KeyError(interval)
+    _sync_quietly(sync_history, CoinPricePoint, coin_id, interval)
+    return _sync_state(CoinPricePoint, coin_id, interval)[1]
+
+
+def get_ohlc(
+    coin_id: str, interval: str, start: int, end: int, sync: bool = True
+) -> list:
+    """
+    Returns a coin's candles with start <= timestamp <= end (UNIX seconds), oldest
+    first, in CoinGecko's [[timestamp_ms, open, high, low, close], ...] shape.
+
+    Parameters:
+        sync: Whether to sync the series first (pass False right after
+              ohlc_version())
+
+    Raises:
+        KeyError: If interval is not one of OHLC_INTERVALS
+        Whatever the upstream request raises when nothing is stored yet
+    """
+    if interval not in OHLC_INTERVALS:
+        raise KeyError(interval)
+    if sync:
+        _sync_quietly(sync_ohlc, CoinCandle, coin_id, interval)
+
+    candles = db.session.scalars(
+        db.select(CoinCandle)
+        .where(
+            CoinCandle.coin_id == coin_id,
+            CoinCandle.interval == interval,
+            CoinCandle.timestamp.between(start, end),
+        )
+        .order_by(CoinCandle.timestamp)
+    )
+    return [candle.to_json() for candle in candles]
+
+
+def get_history(
+    coin_id: str, interval: str, start: int, end: int, sync: bool = True
+) -> dict:
+    """
+    Returns a coin's price history with start <= timestamp <= end (UNIX seconds),
+    oldest first, in CoinGecko's /market_chart shape ({"prices", "market_caps",
+    "total_volumes"}, each a list of [timestamp_ms, value]).
+
+    Parameters:
+        sync: Whether to sync the series first (pass False right after
+              history_version())
+
+    Raises:
+        KeyError: If interval is not one of HISTORY_INTERVALS
+        Whatever the upstream request raises when nothing is stored yet
+    """
+    if interval not in HISTORY_INTERVALS:
+        raise KeyError(interval)
+    if sync:
+        _sync_quietly(sync_history, CoinPricePoint, coin_id, interval)
+
+    points = db.session.execute(
+        db.select(
+            CoinPricePoint.timestamp,
+            CoinPricePoint.price,
+            CoinPricePoint.market_cap,
+            CoinPricePoint.total_volume,
+        )
+        .where(
+            CoinPricePoint.coin_id == coin_id,
+            CoinPricePoint.interval == interval,
+            CoinPricePoint.timestamp.between(start, end),
+        )
+        .order_by(CoinPricePoint.timestamp)
+    ).all()
+    return {
+        "prices": [[ts * 1000, price] for ts, price, _, _ in points],
+        "market_caps": [[ts * 1000, cap] for ts, _, cap, _ in points],
+        "total_volumes": [[ts * 1000, volume] for ts, _, _, volume in points],
+    }
@@ -0,0 +1,452 @@
+"""Cached market snapshots for the top-coins table.
+
+get_top_coins used to call CoinGecko's /coins/markets (with 168-point sparklines for
+100 coins) on every request, once per sort order. The top TOP_COINS_SNAPSHOT_SIZE
+coins by market cap are now one CachedSnapshot: fetched once, with sparklines
+downsampled to SPARKLINE_POINTS and every sort order precomputed as an index
+permutation, so any order and page is served from memory. Once the snapshot is older
+than its TTL the next request still gets it immediately while a background thread
+refreshes it (stale-while-revalidate), so after warm-up no request waits on CoinGecko.
+
+The trending coins feed is cached the same way, parsed once into TrendingCoin records,
+and so is the full coin list (CoinsList), which order validation reads without ever
+waiting on CoinGecko (see CachedSnapshot.get_nowait). Every snapshot carries a
+version, which http_cache turns into ETags.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import orjson
+import requests
+
+from constants import (
+    COINGECKO_API_HEADERS,
+    COINS_LIST_CACHE_MAX_STALE_SECONDS,
+    COINS_LIST_CACHE_TTL_SECONDS,
+    SPARKLINE_POINTS,
+    TOP_COINS_CACHE_MAX_STALE_SECONDS,
+    TOP_COINS_CACHE_TTL_SECONDS,
+    TOP_COINS_SNAPSHOT_SIZE,
+    TRENDING_CACHE_MAX_STALE_SECONDS,
+    TRENDING_CACHE_TTL_SECONDS,
+)
+
+
+class CachedSnapshot:
+    """A value that is fetched once and refreshed in the background when stale
+
+    - Younger than ``ttl``: served as is.
+    - Older than ``ttl`` but younger than ``max_stale``: served as is, and one
+      background refresh is started (concurrent callers never start a second one).
+    - Missing or older than ``max_stale``: fetched synchronously, once: concurrent
+      callers wait on the in-flight fetch instead of sending their own.
+
+    A failed background refresh keeps the current value until ``max_stale``.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], object],
+        ttl: float,
+        max_stale: float,
+        version_of: Callable[[object], str] = None,
+        wait_timeout: float = 30,
+    ):
+        """
+        Parameters:
+        fetch: Function that returns a fresh value
+        ttl: Seconds a fetched value is considered fresh
+        max_stale: Seconds after which a value is too old to be served at all
+        version_of: Function that derives the version of a fetched value. Defaults to
+                    a per-process fetch counter; pass a content digest when versions
+                    must agree across processes (e.g. for ETags)
+        wait_timeout: Seconds a coalesced caller waits for the in-flight fetch
+        """
+        self._fetch = fetch
+        self._version_of = version_of
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.wait_timeout = wait_timeout
+        self._value = None
+        self._fetched_at = None
+        self.version = 0
+        self.updated_at = None
+        self._refreshing = False
+        self._in_flight = None  # Future of the synchronous fetch, if one is running
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Returns the snapshot, refreshing it as described above.
+
+        Raises:
+            Whatever the fetch function raises on a synchronous fetch.
+        """
+        return self.get_versioned()[0]
+
+    def get_versioned(self) -> tuple:
+        """
+        Like get(), but returns (value, version, updated_at): version changes with
+        every fetch that changes the value and updated_at is the UNIX time of that
+        fetch, for use as HTTP cache validators.
+        """
+        with self._lock:
+            if self._fetched_at is not None:
+                age = time.monotonic() - self._fetched_at
+            else:
+                age = self.max_stale
+            if age < self.ttl:
+                return self._value, self.version, self.updated_at
+            if age < self.max_stale:
+                self._start_refresh()
+                return self._value, self.version, self.updated_at
+            future = self._in_flight
+            is_owner = future is None
+            if is_owner:
+                future = self._in_flight = Future()
+
+        if not is_owner:
+            return future.result(timeout=self.wait_timeout)
+
+        try:
+            result = self._store(self._fetch())
+        except BaseException as exc:
+            with self._lock:
+                self._in_flight = None
+            future.set_exception(exc)
+            raise
+
+        with self._lock:
+            self._in_flight = None
+        future.set_result(result)
+        return result
+
+    def get_nowait(self):
+        """
+        Like get(), but never fetches synchronously: when the value is missing or
+        older than max_stale, a background refresh is started and None is returned.
+        """
+        with self._lock:
+            if self._fetched_at is not None:
+                age = time.monotonic() - self._fetched_at
+            else:
+                age = self.max_stale
+            if age >= self.ttl:
+                self._start_refresh()
+            return self._value if age < self.max_stale else None
+
+    def peek(self):
+        """Returns the current value if it is not older than max_stale, else None.
+        Never fetches or starts a refresh."""
+        with self._lock:
+            if (
+                self._fetched_at is None
+                or time.monotonic() - self._fetched_at >= self.max_stale
+            ):
+                return None
+            return self._value
+
+    def _store(self, value) -> tuple:
+        with self._lock:
+            self._value = value
+            self._fetched_at = time.monotonic()
+            if self._version_of is not None:
+                self.version = self._version_of(value)
+            else:
+                self.version += 1
+            self.updated_at = time.time()
+            return self._value, self.version, self.updated_at
+
+    def _start_refresh(self) -> None:
+        # Called with the lock held; concurrent callers never start a second refresh
+        if not self._refreshing:
+            self._refreshing = True
+            threading.Thread(
+                target=self._refresh, name="snapshot-refresh", daemon=True
+            ).start()
+
+    def _refresh(self) -> None:
+        try:
+            self._store(self._fetch())
+        except Exception:
+            logging.exception("Background snapshot refresh failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+def downsample_minmax(values: list, points: int = SPARKLINE_POINTS) -> list:
+    """
+    Downsamples a series to at most `points` values, keeping its shape.
+
+    The series is split into points // 2 equal buckets and each bucket contributes its
+    minimum and maximum in the order they occur, so peaks and troughs survive (plain
+    striding would drop them).
+    """
+    values = [value for value in values if value is not None]
+    if len(values) <= points:
+        return values
+
+    buckets = points // 2
+    downsampled = []
+    for i in range(buckets):
+        bucket = values[i * len(values) // buckets : (i + 1) * len(values) // buckets]
+        low = min(range(len(bucket)), key=bucket.__getitem__)
+        high = max(range(len(bucket)), key=bucket.__getitem__)
+        downsampled.extend(bucket[j] for j in sorted((low, high)))
+    return downsampled
+
+
+# sort key -> field of a /coins/markets record. Every key can be sorted "_asc" or
+# "_desc" (e.g. "market_cap_desc", "price_change_24h_asc").
+TOP_COINS_SORT_FIELDS = {
+    "market_cap": "market_cap",
+    "volume": "total_volume",
+    "price": "current_price",
+    "price_change_1h": "price_change_percentage_1h_in_currency",
+    "price_change_24h": "price_change_percentage_24h_in_currency",
+    "price_change_7d": "price_change_percentage_7d_in_currency",
+}
+TOP_COINS_SORTS = frozenset(
+    f"{key}_{direction}"
+    for key in TOP_COINS_SORT_FIELDS
+    for direction in ("asc", "desc")
+)
+
+
+class TopCoinsSnapshot:
+    """The top coins by market cap, with every sort order precomputed
+
+    ``orders`` maps each of TOP_COINS_SORTS to a permutation of indices into
+    ``coins`` (an argsort), so serving any order is a slice plus a lookup. Coins
+    missing the sorted field are placed last in both directions; ties keep market cap
+    order.
+    """
+
+    __slots__ = ("coins", "orders", "by_id")
+
+    def __init__(self, coins: list):
+        self.coins = coins
+        self.by_id = {coin["id"]: coin for coin in coins}
+        self.orders = {}
+        for key, field in TOP_COINS_SORT_FIELDS.items():
+            values = [coin.get(field) for coin in coins]
+            ascending = sorted(
+                range(len(coins)),
+                key=lambda i: (values[i] is None, values[i] or 0),
+            )
+            descending = sorted(
+                range(len(coins)),
+                key=lambda i: (values[i] is None, -(values[i] or 0)),
+            )
+            self.orders[f"{key}_asc"] = ascending
+            self.orders[f"{key}_desc"] = descending
+
+    def page(self, sort_by: str, page: int, per_page: int) -> list:
+        """Returns page `page` (1-based) of the coins in the `sort_by` order."""
+        start = (page - 1) * per_page
+        return [self.coins[i] for i in self.orders[sort_by][start : start + per_page]]
+
+
+def content_digest(value) -> str:
+    """Digest of a JSON-serializable value (dataclasses included)."""
+    return hashlib.sha256(orjson.dumps(value)).hexdigest()
+
+
+def _fetch_top_coins() -> TopCoinsSnapshot:
+    """Fetches the top TOP_COINS_SNAPSHOT_SIZE coins by market cap from CoinGecko."""
+    coins = []
+    for page in range(1, math.ceil(TOP_COINS_SNAPSHOT_SIZE / 250) + 1):
+        response = requests.get(
+            "https://api.coingecko.com/api/v3/coins/markets",
+            params={
+                "vs_currency": "usd",
+                "order": "market_cap_desc",
+                "per_page": 250,
+                "page": page,
+                "price_change_percentage": "1h,24h,7d",
+                "precision": 2,
+                "sparkline": "true",
+            },
+            headers=COINGECKO_API_HEADERS,
+            timeout=10,
+        )
+        response.raise_for_status()
+        coins.extend(
+            {
+                **coin,
+                "identity": {"name": coin["name"], "symbol": coin["symbol"]},
+                "sparkline_in_7d": downsample_minmax(coin["sparkline_in_7d"]["price"]),
+            }
+            for coin in response.json()
+        )
+    return TopCoinsSnapshot(coins[:TOP_COINS_SNAPSHOT_SIZE])
+
+
+_top_coins = CachedSnapshot(
+    _fetch_top_coins,
+    ttl=TOP_COINS_CACHE_TTL_SECONDS,
+    max_stale=TOP_COINS_CACHE_MAX_STALE_SECONDS,
+    version_of=lambda snapshot: content_digest(snapshot.coins),
+)
+
+
+def get_top_coins() -> tuple:
+    """Returns (TopCoinsSnapshot, version, updated_at) of the cached top-coins table
+    (see CachedSnapshot.get_versioned)."""
+    return _top_coins.get_versioned()
+
+
+def get_cached_sparkline(coin_id: str):
+    """
+    Returns a coin's precomputed sparkline if it is in the current top-coins snapshot
+    (the top coins are also the most viewed), or None. Never fetches.
+    """
+    snapshot = _top_coins.peek()
+    coin = snapshot.by_id.get(coin_id) if snapshot is not None else None
+    return coin["sparkline_in_7d"] if coin is not None else None
+
+
+@dataclass(slots=True)
+class TrendingCoin:
+    """A coin from CoinGecko's /search/trending feed, with its numeric fields parsed
+
+    Attributes:
+    coin_id: CoinGecko identifier of the coin
+    name: Coin name
+    thumb: URL of the coin's thumbnail image
+    symbol: Ticker symbol
+    market_cap_rank: Rank by market cap (None if unranked)
+    price: Price in USD
+    total_volume: 24h trading volume in USD
+    market_cap: Market capitalization in USD
+    price_change_percentage_24h: 24h price change, keyed by quote currency
+    """
+
+    coin_id: str
+    name: str
+    thumb: str
+    symbol: str
+    market_cap_rank: Optional[int]
+    price: float
+    total_volume: int
+    market_cap: int
+    price_change_percentage_24h: dict
+
+    @classmethod
+    def from_api(cls, item: dict) -> "TrendingCoin":
+        data = item["data"]
+        return cls(
+            coin_id=item["id"],
+            name=item["name"],
+            thumb=item["thumb"],
+            symbol=item["symbol"],
+            market_cap_rank=item["market_cap_rank"],
+            price=data["price"],
+            total_volume=_parse_usd(data["total_volume"]),
+            market_cap=_parse_usd(data["market_cap"]),
+            price_change_percentage_24h={
+                "usd": data["price_change_percentage_24h"]["usd"],
+                "btc": data["price_change_percentage_24h"]["btc"],
+            },
+        )
+
+    def to_json(self) -> dict:
+        return {
+            "coin_id": self.coin_id,
+            "name": self.name,
+            "thumb": self.thumb,
+            "symbol": self.symbol,
+            "market_cap_rank": self.market_cap_rank,
+            "price": self.price,
+            "total_volume": self.total_volume,
+            "market_cap": self.market_cap,
+            "price_change_percentage_24h": self.price_change_percentage_24h,
+        }
+
+
+def _parse_usd(text) -> int:
+    """Parses CoinGecko's formatted dollar amounts ("$1,234,567.89") to whole USD."""
+    if isinstance(text, (int, float)):
+        return round(text)
+    return round(float(text.lstrip("$").replace(",", "")))
+
+
+def _fetch_trending_coins() -> list:
+    """Fetches and normalizes CoinGecko's trending coins."""
+    response = requests.get(
+        "https://api.coingecko.com/api/v3/search/trending",
+        headers=COINGECKO_API_HEADERS,
+        timeout=10,
+    )
+    response.raise_for_status()
+    return [TrendingCoin.from_api(coin["item"]) for coin in response.json()["coins"]]
+
+
+_trending_coins = CachedSnapshot(
+    _fetch_trending_coins,
+    ttl=TRENDING_CACHE_TTL_SECONDS,
+    max_stale=TRENDING_CACHE_MAX_STALE_SECONDS,
+    version_of=content_digest,
+)
+
+
+def get_trending_coins() -> tuple:
+    """Returns (list of TrendingCoin, version, updated_at) of the cached trending
+    coins (see CachedSnapshot.get_versioned)."""
+    return _trending_coins.get_versioned()
+
+
+@dataclass(slots=True)
+class CoinsList:
+    """CoinGecko's /coins/list, with its ids indexed for membership checks
+
+    Attributes:
+    coins: Every coin as returned by CoinGecko ({"id", "symbol", "name"})
+    ids: The id of every coin
+    """
+
+    coins: list
+    ids: frozenset
+
+
+def _fetch_coins_list() -> CoinsList:
+    """Fetches CoinGecko's full coin list."""
+    response = requests.get(
+        "https://api.coingecko.com/api/v3/coins/list",
+        headers=COINGECKO_API_HEADERS,
+        timeout=10,
+    )
+    response.raise_for_status()
+    coins = orjson.loads(response.content)
+    return CoinsList(coins=coins, ids=frozenset(coin["id"] for coin in coins))
+
+
+_coins_list = CachedSnapshot(
+    _fetch_coins_list,
+    ttl=COINS_LIST_CACHE_TTL_SECONDS,
+    max_stale=COINS_LIST_CACHE_MAX_STALE_SECONDS,
+    version_of=lambda coins_list: content_digest(coins_list.coins),
+)
+
+
+def get_coins_list() -> tuple:
+    """Returns (CoinsList, version, updated_at) of the cached coin list (see
+    CachedSnapshot.get_versioned)."""
+    return _coins_list.get_versioned()
+
+
+def peek_coins_list():
+    """
+    Returns the cached CoinsList, or None while it has not been fetched yet (or is
+    older than COINS_LIST_CACHE_MAX_STALE_SECONDS). Never waits on CoinGecko; a
+    missing or stale list is refreshed in the background.
+    """
+    return _coins_list.get_nowait()
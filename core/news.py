@@ -0,0 +1,306 @@
+"""Local crypto news store.
+
+A background task pulls news for the top NEWS_TRACKED_COINS_COUNT coins (by market
+cap) from NewsData.io into the news_articles table, de-duplicating syndicated copies
+by URL/title hash and indexing each article by coin in news_article_coins. The
+/get_news_articles endpoint then serves those coins from the store with keyset
+pagination, so user traffic for them never touches the NewsData quota.
+"""
+
+import hashlib
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from sqlalchemy import or_, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from constants import (
+    COINGECKO_API_HEADERS,
+    NEWS_RETENTION_DAYS,
+    NEWS_TRACKED_COINS_COUNT,
+    NEWS_UPDATE_INTERVAL_SECONDS,
+    NEWSDATA_API_KEY,
+)
+from extensions import db
+from models import NewsArticle, NewsArticleCoin
+
+NEWS_PAGE_SIZE = 10
+
+# Prefix of the pagination cursors handed out for the local store. NewsData's own
+# cursors never start with it, so the endpoint can tell the two apart.
+LOCAL_CURSOR_PREFIX = "local:"
+
+
+class NewsRateLimited(Exception):
+    """Raised when NewsData.io reports that the API quota has been exhausted."""
+
+
+def fetch_news_page(query: str, next_page: str = "") -> dict:
+    """
+    Fetches one page of crypto news for a query from the NewsData.io API.
+
+    Returns:
+        dict: The raw NewsData response ("results", "nextPage", "totalResults", ...)
+
+    Raises:
+        NewsRateLimited: If NewsData reports RateLimitExceeded
+        RuntimeError: On any other NewsData error response
+    """
+    params = {
+        "apikey": NEWSDATA_API_KEY,
+        "q": query,
+        "removeduplicate": 1,
+        "language": "en",
+    }
+    if next_page:
+        params["page"] = next_page
+
+    response = requests.get(
+        "https://newsdata.io/api/1/crypto", params=params, timeout=10
+    )
+    data = response.json()
+
+    if data["status"] == "error":
+        if data["results"]["code"] == "RateLimitExceeded":
+            raise NewsRateLimited()
+        raise RuntimeError(f"NewsData error: {data['results']}")
+
+    return data
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _url_hash(url: str) -> str:
+    """Hash of a URL with case, query string, fragment and trailing slash ignored."""
+    parts = urlsplit(url.strip())
+    normalized = urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), "", "")
+    )
+    return _sha256(normalized)
+
+
+def _title_hash(title: str) -> str:
+    """Hash of a title with case and whitespace ignored."""
+    return _sha256(" ".join(title.lower().split()))
+
+
+def _parse_pub_date(pub_date) -> int:
+    """Converts NewsData's "YYYY-MM-DD HH:MM:SS" (UTC) into a UNIX timestamp."""
+    try:
+        return int(
+            datetime.strptime(pub_date, "%Y-%m-%d %H:%M:%S")
+            .replace(tzinfo=timezone.utc)
+            .timestamp()
+        )
+    except (TypeError, ValueError):
+        return int(time.time())
+
+
+def store_articles(coin_id: str, results: list) -> int:
+    """
+    Upserts NewsData results into the store and indexes them under coin_id.
+
+    Articles whose URL or title hash is already stored are not inserted again, but
+    are still linked to coin_id (the same story often covers several coins).
+
+    Returns:
+        int: The number of articles linked to the coin by this call.
+    """
+    now = int(time.time())
+    rows = {}
+    seen_titles = set()
+    for result in results:
+        title, link = result.get("title"), result.get("link")
+        if not title or not link:
+            continue
+        url_hash, title_hash = _url_hash(link), _title_hash(title)
+        if url_hash in rows or title_hash in seen_titles:
+            continue
+        seen_titles.add(title_hash)
+        rows[url_hash] = {
+            "id": uuid.uuid4(),
+            "url_hash": url_hash,
+            "title_hash": title_hash,
+            "article_id": result.get("article_id"),
+            "title": title,
+            "link": link,
+            "description": result.get("description"),
+            "image_url": result.get("image_url"),
+            "source_name": result.get("source_name"),
+            "source_url": result.get("source_url"),
+            "pub_date": result.get("pubDate"),
+            "pub_date_tz": result.get("pubDateTZ"),
+            "published_at": _parse_pub_date(result.get("pubDate")),
+            "fetched_at": now,
+        }
+
+    if not rows:
+        return 0
+
+    # Duplicates (on either hash) are skipped by the unique constraints
+    db.session.execute(
+        insert(NewsArticle).values(list(rows.values())).on_conflict_do_nothing()
+    )
+
+    # Resolve the stored row for every result, whether it was just inserted or
+    # already existed, and link them all to this coin
+    stored = db.session.execute(
+        db.select(NewsArticle.id, NewsArticle.published_at).where(
+            or_(
+                NewsArticle.url_hash.in_([r["url_hash"] for r in rows.values()]),
+                NewsArticle.title_hash.in_([r["title_hash"] for r in rows.values()]),
+            )
+        )
+    ).all()
+    db.session.execute(
+        insert(NewsArticleCoin)
+        .values(
+            [
+                {
+                    "coin_id": coin_id,
+                    "published_at": article.published_at,
+                    "article_id": article.id,
+                }
+                for article in stored
+            ]
+        )
+        .on_conflict_do_nothing()
+    )
+    db.session.commit()
+    return len(stored)
+
+
+def purge_old_articles(retention_days: int = NEWS_RETENTION_DAYS) -> None:
+    """Deletes articles published more than retention_days ago (and their links)."""
+    cutoff = int(time.time()) - retention_days * 86_400
+    db.session.execute(db.delete(NewsArticle).where(NewsArticle.published_at < cutoff))
+    db.session.commit()
+
+
+def get_tracked_coins(count: int = NEWS_TRACKED_COINS_COUNT) -> list[tuple[str, str]]:
+    """Returns (coin_id, name) for the top `count` coins by market cap."""
+    response = requests.get(
+        "https://api.coingecko.com/api/v3/coins/markets",
+        params={"vs_currency": "usd", "order": "market_cap_desc", "per_page": count},
+        headers=COINGECKO_API_HEADERS,
+        timeout=10,
+    )
+    response.raise_for_status()
+    return [(coin["id"], coin["name"]) for coin in response.json()]
+
+
+def find_stored_coin(candidate_ids: list[str]) -> str | None:
+    """Returns the first of candidate_ids that has stored news, or None."""
+    if not candidate_ids:
+        return None
+    return db.session.scalar(
+        db.select(NewsArticleCoin.coin_id)
+        .where(NewsArticleCoin.coin_id.in_(candidate_ids))
+        .limit(1)
+    )
+
+
+def get_coin_news_page(coin_id: str, cursor: str = "", page_size: int = NEWS_PAGE_SIZE):
+    """
+    Returns one page of a coin's stored news, newest first, in the same shape as a
+    NewsData response ({"results", "nextPage", "totalResults"}).
+
+    Pagination is keyset-based on (published_at, article_id): the cursor encodes the
+    last row of the previous page, so every page is a single range scan of the
+    news_article_coins primary key regardless of how deep the user has scrolled.
+    """
+    query = (
+        db.select(NewsArticle, NewsArticleCoin.published_at)
+        .join(NewsArticleCoin, NewsArticleCoin.article_id == NewsArticle.id)
+        .where(NewsArticleCoin.coin_id == coin_id)
+        .order_by(
+            NewsArticleCoin.published_at.desc(), NewsArticleCoin.article_id.desc()
+        )
+        .limit(page_size + 1)
+    )
+    if cursor:
+        _, published_at, article_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(NewsArticleCoin.published_at, NewsArticleCoin.article_id)
+            < (published_at, article_id)
+        )
+
+    rows = db.session.execute(query).all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    total = db.session.scalar(
+        db.select(db.func.count()).where(NewsArticleCoin.coin_id == coin_id)
+    )
+
+    return {
+        "results": [article.to_json() for article, _ in rows],
+        "nextPage": (
+            encode_cursor(coin_id, rows[-1][1], rows[-1][0].id) if has_more else None
+        ),
+        "totalResults": total,
+    }
+
+
+def encode_cursor(coin_id: str, published_at: int, article_id) -> str:
+    return f"{LOCAL_CURSOR_PREFIX}{coin_id}:{published_at}:{article_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, int, uuid.UUID]:
+    """
+    Splits a local cursor into (coin_id, published_at, article_id).
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    coin_id, published_at, article_id = cursor[len(LOCAL_CURSOR_PREFIX) :].split(":")
+    return coin_id, int(published_at), uuid.UUID(article_id)
+
+
+def update_news_articles_in_background():
+    """
+    Periodically ingests crypto news for the top coins into the local store.
+
+    Every NEWS_UPDATE_INTERVAL_SECONDS this fetches the current top
+    NEWS_TRACKED_COINS_COUNT coins by market cap, pulls the latest page of NewsData
+    results for each coin's name, stores/links them (see store_articles) and purges
+    articles older than NEWS_RETENTION_DAYS. A NewsData rate-limit response ends the
+    cycle early; the remaining coins are picked up on the next one.
+    """
+    while True:
+        from app import app
+
+        start = time.monotonic()
+
+        with app.app_context():
+            try:
+                coins = get_tracked_coins()
+            except Exception:
+                logging.exception("Failed to fetch coins for news ingestion")
+                coins = []
+
+            for coin_id, name in coins:
+                try:
+                    page = fetch_news_page(name)
+                    store_articles(coin_id, page.get("results") or [])
+                except NewsRateLimited:
+                    logging.warning("NewsData rate limit reached; ending news cycle")
+                    break
+                except Exception:
+                    db.session.rollback()
+                    logging.exception("Failed to ingest news for %s", coin_id)
+
+            try:
+                purge_old_articles()
+            except Exception:
+                db.session.rollback()
+                logging.exception("Failed to purge old news articles")
+
+        elapsed = time.monotonic() - start
+        time.sleep(max(0, NEWS_UPDATE_INTERVAL_SECONDS - elapsed))
@@ -0,0 +1,233 @@
+"""Materialized open interest per coin.
+
+Open (limit and stop) orders reserve funds or coins on their wallet, but totals per
+coin (e.g. how much USD open buy orders reserve for ETH) used to need a scan of
+every open transaction. The open_interest table keeps one row per
+(coin_id, side, order_type) with the count, quantity and notional of the open
+orders, so reading a coin's open interest is a primary-key lookup.
+
+The rows are maintained incrementally: every code path that opens, fills or cancels
+an order calls record_orders() in the same database transaction, so the aggregates
+commit or roll back together with the orders. check_open_interest() recounts them
+from the transactions table every OPEN_INTEREST_CHECK_INTERVAL_SECONDS, logs any
+drift and repairs it.
+"""
+
+import logging
+import time
+from collections import defaultdict
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+
+from constants import OPEN_INTEREST_CHECK_INTERVAL_SECONDS
+from extensions import db
+from models import OpenInterest, Transaction
+from money import qty_from_units, qty_units, usd_from_units, usd_units
+
+OPEN_ORDER_TYPES = ("limit", "stop")
+
+# How long the consistency check waits for in-flight orders before skipping a run
+CHECK_LOCK_TIMEOUT = "5s"
+
+
+def _upsert(rows: list, set_) -> None:
+    statement = insert(OpenInterest).values(rows)
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[
+                OpenInterest.coin_id,
+                OpenInterest.side,
+                OpenInterest.order_type,
+            ],
+            set_=set_(statement.excluded),
+        )
+    )
+
+
+def record_orders(opened=(), closed=()) -> None:
+    """
+    Applies opened and closed (filled or cancelled) orders to the open interest, in
+    the caller's database transaction. Market orders are ignored.
+
+    The deltas are summed per row and the rows are updated in key order, so
+    concurrent requests touching several of the same rows always lock them in the
+    same order and cannot deadlock.
+
+    Parameters:
+        opened: Transactions that were just placed as open orders
+        closed: Open transactions that were just filled or cancelled
+    """
+    # key -> [count, quantity units, USD units]
+    deltas = defaultdict(lambda: [0, 0, 0])
+    for sign, transactions in ((1, opened), (-1, closed)):
+        for transaction in transactions:
+            if transaction.orderType not in OPEN_ORDER_TYPES:
+                continue
+            delta = deltas[
+                (
+                    transaction.coin_id,
+                    transaction.transactionType,
+                    transaction.orderType,
+                )
+            ]
+            delta[0] += sign
+            delta[1] += sign * qty_units(transaction.quantity)
+            delta[2] += sign * usd_units(transaction.total_value)
+
+    now = int(time.time())
+    for (coin_id, side, order_type), (count, quantity, notional) in sorted(
+        deltas.items()
+    ):
+        _upsert(
+            [
+                {
+                    "coin_id": coin_id,
+                    "side": side,
+                    "order_type": order_type,
+                    "order_count": count,
+                    "quantity": qty_from_units(quantity),
+                    "notional": usd_from_units(notional),
+                    "updated_at": now,
+                }
+            ],
+            lambda excluded: {
+                "order_count": OpenInterest.order_count + excluded.order_count,
+                "quantity": OpenInterest.quantity + excluded.quantity,
+                "notional": OpenInterest.notional + excluded.notional,
+                "updated_at": excluded.updated_at,
+            },
+        )
+
+
+def get_open_interest(coin_id: str) -> list:
+    """Returns the OpenInterest rows of a coin that have open orders."""
+    return db.session.scalars(
+        db.select(OpenInterest)
+        .where(OpenInterest.coin_id == coin_id, OpenInterest.order_count > 0)
+        .order_by(OpenInterest.side, OpenInterest.order_type)
+    ).all()
+
+
+def check_open_interest() -> int:
+    """
+    Recounts the open interest from the open transactions and repairs every row that
+    differs from it (rows left without open orders are deleted).
+
+    The table is locked in EXCLUSIVE mode for the duration: reads go on, but orders
+    that open, fill or cancel wait, so the recount and the stored rows describe the
+    same orders. If the lock is not granted within CHECK_LOCK_TIMEOUT the check
+    fails and is retried on the next run.
+
+    Returns:
+        int: The number of rows that had drifted
+    """
+    db.session.execute(text(f"SET LOCAL lock_timeout = '{CHECK_LOCK_TIMEOUT}'"))
+    db.session.execute(text("LOCK TABLE open_interest IN EXCLUSIVE MODE"))
+
+    key = (Transaction.coin_id, Transaction.transactionType, Transaction.orderType)
+    expected = {
+        (coin_id, side, order_type): (count, quantity, notional)
+        for coin_id, side, order_type, count, quantity, notional in db.session.execute(
+            db.select(
+                *key,
+                func.count(),
+                func.sum(Transaction.quantity),
+                func.sum(Transaction.total_value),
+            )
+            .where(
+                Transaction.status == "open",
+                Transaction.orderType.in_(OPEN_ORDER_TYPES),
+            )
+            .group_by(*key)
+        )
+    }
+    stored = {
+        (row.coin_id, row.side, row.order_type): (
+            row.order_count,
+            row.quantity,
+            row.notional,
+        )
+        for row in db.session.scalars(db.select(OpenInterest))
+    }
+
+    drifted = []
+    for row_key, values in expected.items():
+        if stored.get(row_key) != values:
+            logging.warning(
+                "Open interest drift for %s: stored %s, expected %s",
+                row_key,
+                stored.get(row_key),
+                values,
+            )
+            drifted.append(row_key)
+    empty = []
+    for row_key, values in stored.items():
+        if row_key not in expected:
+            if values != (0, 0, 0):
+                logging.warning(
+                    "Open interest drift for %s: stored %s, expected no orders",
+                    row_key,
+                    values,
+                )
+                drifted.append(row_key)
+            empty.append(row_key)
+
+    repairs = [row_key for row_key in drifted if row_key in expected]
+    if repairs:
+        now = int(time.time())
+        _upsert(
+            [
+                {
+                    "coin_id": coin_id,
+                    "side": side,
+                    "order_type": order_type,
+                    "order_count": expected[(coin_id, side, order_type)][0],
+                    "quantity": expected[(coin_id, side, order_type)][1],
+                    "notional": expected[(coin_id, side, order_type)][2],
+                    "updated_at": now,
+                }
+                for coin_id, side, order_type in repairs
+            ],
+            lambda excluded: {
+                "order_count": excluded.order_count,
+                "quantity": excluded.quantity,
+                "notional": excluded.notional,
+                "updated_at": excluded.updated_at,
+            },
+        )
+    for coin_id, side, order_type in empty:
+        db.session.execute(
+            db.delete(OpenInterest).where(
+                OpenInterest.coin_id == coin_id,
+                OpenInterest.side == side,
+                OpenInterest.order_type == order_type,
+            )
+        )
+    db.session.commit()
+    return len(drifted)
+
+
+def check_open_interest_in_background():
+    """
+    Runs check_open_interest every OPEN_INTEREST_CHECK_INTERVAL_SECONDS.
+
+    Drift means an order path changed orders without calling record_orders, so it is
+    logged as a warning before being repaired.
+    """
+    while True:
+        from app import app
+
+        start = time.monotonic()
+
+        with app.app_context():
+            try:
+                drifted = check_open_interest()
+                if drifted:
+                    logging.warning("Repaired %d open interest rows", drifted)
+            except Exception:
+                db.session.rollback()
+                logging.exception("Open interest consistency check failed")
+
+        elapsed = time.monotonic() - start
+        time.sleep(max(0, OPEN_INTEREST_CHECK_INTERVAL_SECONDS - elapsed))
@@ -0,0 +1,194 @@
+"""Per-coin positions and PnL.
+
+Portfolio PnL used to be available only as the total value series of ValueHistory;
+per-coin PnL would have meant replaying every transaction of a wallet on each
+request. The positions table keeps each wallet's position per coin at average cost
+(see Position.apply_fill), so PnL is computed from one row per coin the wallet ever
+traded, whatever the number of trades:
+
+- record_fill() applies every fill (market orders in process_order /
+  process_orders, open orders in the executor) in the database transaction that
+  fills it.
+- replay_positions() rebuilds a wallet's positions from its filled transactions,
+  for the backfill (replay_positions.py, run in the release step) and to repair a
+  wallet. Wallets that predate the positions table are not served (see
+  positions_replayed) until it has run for them.
+- positions_pnl() adds market value and unrealized PnL at current prices.
+"""
+
+import math
+import time
+
+from sqlalchemy import func
+
+from extensions import db
+from models import Position, Transaction, Wallet
+from money import (
+    QTY_UNITS,
+    price_units,
+    pro_rata_units,
+    qty_units,
+    usd_from_units,
+    usd_units,
+    value_units,
+)
+
+
+def record_fill(transaction) -> None:
+    """
+    Applies a filled transaction to its wallet's position in the coin, in the
+    caller's database transaction.
+
+    The caller must hold the row lock of the wallet (as every fill path does), which
+    serializes all updates to the wallet's positions.
+    """
+    position = db.session.get(
+        Position, (transaction.wallet_id, transaction.coin_id), populate_existing=True
+    )
+    if position is None:
+        position = Position(
+            wallet_id=transaction.wallet_id, coin_id=transaction.coin_id
+        )
+        db.session.add(position)
+    position.apply_fill(
+        transaction.transactionType,
+        transaction.quantity,
+        transaction.filled_value,
+        transaction.executed_at or int(time.time()),
+    )
+
+
+def replay_positions(wallet_id) -> int:
+    """
+    Rebuilds a wallet's positions from scratch by replaying its filled transactions
+    in fill order (placement order for fills that predate executed_at), and marks
+    the wallet as replayed, in the caller's database transaction. The caller must
+    hold the row lock of the wallet.
+
+    Returns:
+        int: The number of fills replayed
+    """
+    db.session.execute(db.delete(Position).where(Position.wallet_id == wallet_id))
+
+    positions = {}
+    fills = db.session.scalars(
+        db.select(Transaction)
+        .where(Transaction.wallet_id == wallet_id, Transaction.status == "finished")
+        .order_by(
+            func.coalesce(Transaction.executed_at, Transaction.timestamp),
+            Transaction.timestamp,
+        )
+        .execution_options(yield_per=1_000)
+    )
+    count = 0
+    for transaction in fills:
+        position = positions.get(transaction.coin_id)
+        if position is None:
+            position = Position(wallet_id=wallet_id, coin_id=transaction.coin_id)
+            positions[transaction.coin_id] = position
+        position.apply_fill(
+            transaction.transactionType,
+            transaction.quantity,
+            transaction.filled_value,
+            transaction.executed_at or transaction.timestamp,
+        )
+        count += 1
+
+    db.session.add_all(positions.values())
+    db.session.execute(
+        db.update(Wallet)
+        .where(Wallet.id == wallet_id)
+        .values(positions_replayed_at=int(time.time()))
+    )
+    return count
+
+
+def positions_replayed(wallet) -> bool:
+    """Whether a wallet's positions reflect its whole trade history (it was created
+    after the positions table, or has been replayed since)."""
+    return wallet.positions_replayed_at is not None
+
+
+def get_positions(wallet_id) -> list:
+    """Returns every Position of a wallet, open or closed, ordered by coin."""
+    return db.session.scalars(
+        db.select(Position)
+        .where(Position.wallet_id == wallet_id)
+        .order_by(Position.coin_id)
+    ).all()
+
+
+def _is_price(value) -> bool:
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+        and value > 0
+    )
+
+
+def positions_pnl(positions, prices: dict) -> dict:
+    """
+    Values positions at market prices.
+
+    Parameters:
+        positions: Position rows (see get_positions)
+        prices: {coin_id: price} of the coins held; open positions without a valid
+                price get a null market value and unrealized PnL and are left out of
+                those totals
+
+    Returns:
+        dict: {"positions": [...], "totals": {...}} with per-coin quantity,
+              averageCost, costBasis, realizedPnl, price, marketValue,
+              unrealizedPnl, openedAt, lastFillAt and fillCount, and the summed
+              costBasis, marketValue, realizedPnl and unrealizedPnl (USD)
+    """
+    entries = []
+    totals = {"costBasis": 0, "marketValue": 0, "realizedPnl": 0, "unrealizedPnl": 0}
+    for position in positions:
+        quantity = qty_units(position.quantity)
+        cost = usd_units(position.cost_basis)
+        realized = usd_units(position.realized_pnl)
+        price = prices.get(position.coin_id)
+
+        market_value = unrealized = None
+        if quantity == 0:
+            market_value = unrealized = 0
+        elif _is_price(price):
+            market_value = value_units(quantity, price_units(price))
+            unrealized = market_value - cost
+
+        totals["costBasis"] += cost
+        totals["realizedPnl"] += realized
+        if market_value is not None:
+            totals["marketValue"] += market_value
+            totals["unrealizedPnl"] += unrealized
+
+        entries.append(
+            {
+                "coin_id": position.coin_id,
+                "quantity": position.quantity,
+                "averageCost": (
+                    usd_from_units(pro_rata_units(cost, QTY_UNITS, quantity))
+                    if quantity
+                    else None
+                ),
+                "costBasis": position.cost_basis,
+                "realizedPnl": position.realized_pnl,
+                "price": price if _is_price(price) else None,
+                "marketValue": (
+                    usd_from_units(market_value) if market_value is not None else None
+                ),
+                "unrealizedPnl": (
+                    usd_from_units(unrealized) if unrealized is not None else None
+                ),
+                "openedAt": position.opened_at,
+                "lastFillAt": position.last_fill_at,
+                "fillCount": position.fill_count,
+            }
+        )
+
+    return {
+        "positions": entries,
+        "totals": {key: usd_from_units(units) for key, units in totals.items()},
+    }
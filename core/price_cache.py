@@ -0,0 +1,62 @@
+"""In-process cache of recent full-precision coin prices.
+
+Every /coins/markets response this process fetches anyway (order placement, the
+open-trade executor, the wallet value updater, ...) is recorded here with the time it
+was fetched. Order placement then reads the price from this cache if it is at most
+ORDER_PRICE_MAX_AGE_SECONDS old and only calls CoinGecko on a miss, so repeated
+orders on the same coin skip the upstream round-trip (and survive short CoinGecko
+rate limits).
+
+Only full-precision prices may be recorded: responses fetched with a `precision`
+parameter are rounded for display and must not be used to fill orders.
+"""
+
+import math
+import threading
+import time
+
+from constants import ORDER_PRICE_MAX_AGE_SECONDS
+
+# Coins kept at most; the oldest entries are dropped first when it is exceeded
+MAX_ENTRIES = 5_000
+
+_prices = {}  # coin_id -> (price, fetched_at)
+_lock = threading.Lock()
+
+
+def record_prices(coins_data, fetched_at: float = None) -> None:
+    """
+    Records the prices of a /coins/markets response.
+
+    Parameters:
+        coins_data: The parsed response (records without a valid price are ignored)
+        fetched_at: UNIX time of the fetch (default: now)
+    """
+    if not isinstance(coins_data, list):
+        return
+    fetched_at = time.time() if fetched_at is None else fetched_at
+
+    with _lock:
+        for coin in coins_data:
+            price = coin.get("current_price") if isinstance(coin, dict) else None
+            if (
+                isinstance(price, (int, float))
+                and not isinstance(price, bool)
+                and math.isfinite(price)
+                and price > 0
+            ):
+                # Re-insert so the dict stays ordered oldest to newest
+                _prices.pop(coin["id"], None)
+                _prices[coin["id"]] = (price, fetched_at)
+        while len(_prices) > MAX_ENTRIES:
+            del _prices[next(iter(_prices))]
+
+
+def get_price(coin_id: str, max_age: float = ORDER_PRICE_MAX_AGE_SECONDS):
+    """Returns the cached price of a coin if it was fetched at most max_age seconds
+    ago, else None."""
+    with _lock:
+        entry = _prices.get(coin_id)
+    if entry is None or time.time() - entry[1] > max_age:
+        return None
+    return entry[0]
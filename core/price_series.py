@@ -0,0 +1,418 @@
+"""Memory-mapped columnar price series for the hot coins.
+
+For the top PRICE_SERIES_HOT_COINS_COUNT coins, the closed points of the local price
+history store (see core/candles.py) are mirrored into one fixed-width binary file per
+(coin, interval) under PRICE_SERIES_DIR:
+
+    header   <4s I Q Q   magic b"CPS1", version, capacity, count       (24 bytes)
+    column   int64[capacity]     timestamp (UNIX seconds, ascending)
+    column   float64[capacity]   price
+    column   float64[capacity]   market_cap   (NaN if unknown)
+    column   float64[capacity]   total_volume (NaN if unknown)
+
+All values are little-endian (readers cast the columns in native byte order, which
+is little-endian on every x86/ARM host this runs on). Readers mmap the file once per
+process and slice the columns as memoryviews (zero-copy, no JSON parsing); a range
+lookup is a binary search over the timestamp column. Appends write into the spare capacity first and
+bump `count` last, so concurrent readers never see a half-written point. When the
+capacity runs out the file is compacted into a new one (twice the size) that
+atomically replaces the old, and readers pick it up on their next access.
+
+The worker syncs the hot coins' history into Postgres (and exports it to its own
+files). Dynos do not share a filesystem, so every web process also runs a mirror
+thread (start_price_series_mirror, started by create_app) that copies new closed
+points from Postgres into the files of its host; writers on one host take a per-file
+lock. Until a process's first mirror pass has run, reads fall back to the Postgres
+store.
+"""
+
+import bisect
+import fcntl
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+from constants import (
+    PRICE_SERIES_DIR,
+    PRICE_SERIES_HOT_COINS_COUNT,
+    PRICE_SERIES_MIRROR_INTERVAL_SECONDS,
+    PRICE_SERIES_UPDATE_INTERVAL_SECONDS,
+)
+from extensions import db
+from models import CoinPricePoint
+
+HEADER = struct.Struct("<4sIQQ")
+MAGIC = b"CPS1"
+VERSION = 1
+COLUMNS = (
+    ("timestamp", "q"),
+    ("price", "d"),
+    ("market_cap", "d"),
+    ("total_volume", "d"),
+)
+MIN_CAPACITY = 1_024
+
+
+def series_path(coin_id: str, interval: str) -> str:
+    return os.path.join(PRICE_SERIES_DIR, f"{coin_id}.{interval}.bin")
+
+
+class PriceSeries:
+    """Read-only, memory-mapped view of one price series file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.inode = os.fstat(file.fileno()).st_ino
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.capacity, _ = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a price series file: {path}")
+
+        view = memoryview(self._mmap)
+        self._columns = {}
+        for i, (name, fmt) in enumerate(COLUMNS):
+            offset = HEADER.size + i * 8 * self.capacity
+            self._columns[name] = view[offset : offset + 8 * self.capacity].cast(fmt)
+
+    def __len__(self) -> int:
+        # Re-read on every access: appends bump the count in place
+        return HEADER.unpack_from(self._mmap)[3]
+
+    def column(self, name: str) -> memoryview:
+        """Returns the populated part of a column as a zero-copy memoryview."""
+        return self._columns[name][: len(self)]
+
+    def range(self, start: int, end: int) -> dict:
+        """
+        Returns zero-copy memoryviews of every column for the points with
+        start <= timestamp <= end.
+        """
+        timestamps = self.column("timestamp")
+        lo = bisect.bisect_left(timestamps, start)
+        hi = bisect.bisect_right(timestamps, end)
+        return {name: self._columns[name][lo:hi] for name, _ in COLUMNS}
+
+
+_open_series = {}
+_open_series_lock = threading.Lock()
+
+
+def open_series(coin_id: str, interval: str):
+    """
+    Returns the PriceSeries of a coin, or None if it has no series file.
+
+    Mappings are cached per process and re-opened when compaction has replaced the
+    file (detected by its inode).
+    """
+    path = series_path(coin_id, interval)
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+    with _open_series_lock:
+        series = _open_series.get(path)
+        if series is None or series.inode != inode:
+            series = PriceSeries(path)
+            _open_series[path] = series
+        return series
+
+
+def _nan_to_none(values) -> list:
+    return [None if math.isnan(value) else value for value in values]
+
+
+def read_history(coin_id: str, interval: str, start: int, end: int):
+    """
+    Returns a coin's history in the /market_chart shape from its series file, plus
+    the newer points (including the live, not yet closed one) from the Postgres
+    store, or None if the file does not cover `start`.
+    """
+    series = open_series(coin_id, interval)
+    if series is None or len(series) == 0 or series.column("timestamp")[0] > start:
+        return None
+
+    columns = series.range(start, end)
+    timestamps_ms = [ts * 1000 for ts in columns["timestamp"].tolist()]
+    history = {
+        "prices": list(map(list, zip(timestamps_ms, columns["price"].tolist()))),
+        "market_caps": list(
+            map(list, zip(timestamps_ms, _nan_to_none(columns["market_cap"])))
+        ),
+        "total_volumes": list(
+            map(list, zip(timestamps_ms, _nan_to_none(columns["total_volume"])))
+        ),
+    }
+
+    # Points the file does not have yet (it is appended hourly, the store is synced
+    # on demand) and the live point come from the Postgres store
+    last = series.column("timestamp")[len(series) - 1]
+    tail = db.session.execute(
+        db.select(
+            CoinPricePoint.timestamp,
+            CoinPricePoint.price,
+            CoinPricePoint.market_cap,
+            CoinPricePoint.total_volume,
+        )
+        .where(
+            CoinPricePoint.coin_id == coin_id,
+            CoinPricePoint.interval == interval,
+            CoinPricePoint.timestamp > max(last, start - 1),
+            CoinPricePoint.timestamp <= end,
+        )
+        .order_by(CoinPricePoint.timestamp)
+    ).all()
+    for ts, price, market_cap, total_volume in tail:
+        history["prices"].append([ts * 1000, price])
+        history["market_caps"].append([ts * 1000, market_cap])
+        history["total_volumes"].append([ts * 1000, total_volume])
+    return history
+
+
+def read_prices(coin_id: str, interval: str, start: int, end: int):
+    """Returns the prices with start <= timestamp <= end, or None if the series
+    file does not cover `start`."""
+    series = open_series(coin_id, interval)
+    if series is None or len(series) == 0 or series.column("timestamp")[0] > start:
+        return None
+    return series.range(start, end)["price"].tolist()
+
+
+def latest_price(coin_id: str, interval: str, max_age: int):
+    """Returns the newest closed price of a series if it is at most max_age seconds
+    old, else None."""
+    series = open_series(coin_id, interval)
+    if series is None or len(series) == 0:
+        return None
+    count = len(series)
+    if time.time() - series.column("timestamp")[count - 1] > max_age:
+        return None
+    return series.column("price")[count - 1]
+
+
+def _write_file(path: str, rows: list, capacity: int) -> None:
+    """Writes rows into a new file of the given capacity and atomically swaps it in."""
+    buffer = bytearray(HEADER.size + len(COLUMNS) * 8 * capacity)
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION, capacity, len(rows))
+    for i, (_, fmt) in enumerate(COLUMNS):
+        offset = HEADER.size + i * 8 * capacity
+        struct.pack_into(
+            f"<{len(rows)}{fmt}", buffer, offset, *(row[i] for row in rows)
+        )
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(buffer)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+def append_points(coin_id: str, interval: str, rows: list) -> int:
+    """
+    Appends (timestamp, price, market_cap, total_volume) rows newer than the
+    series' last point, compacting into a larger file when capacity runs out.
+    Safe to call from several processes on the same host.
+
+    Returns:
+        int: The number of rows appended.
+    """
+    rows = [
+        (
+            int(ts),
+            float(price),
+            math.nan if market_cap is None else float(market_cap),
+            math.nan if total_volume is None else float(total_volume),
+        )
+        for ts, price, market_cap, total_volume in rows
+    ]
+    path = series_path(coin_id, interval)
+    os.makedirs(PRICE_SERIES_DIR, exist_ok=True)
+
+    with _write_lock(path):
+        return _append_rows(path, rows)
+
+
+@contextmanager
+def _write_lock(path: str):
+    """Serializes the writers of a series file on this host (the worker's updater
+    and the web processes' mirrors may append to the same file)."""
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _append_rows(path: str, rows: list) -> int:
+    """append_points for already converted rows. Caller holds the write lock."""
+    if not os.path.exists(path):
+        _write_file(path, rows, max(MIN_CAPACITY, 2 * len(rows)))
+        return len(rows)
+
+    with open(path, "r+b") as file, mmap.mmap(file.fileno(), 0) as mapped:
+        _, _, capacity, count = HEADER.unpack_from(mapped)
+        view = memoryview(mapped)
+        timestamps = view[HEADER.size : HEADER.size + 8 * capacity].cast("q")
+        last = timestamps[count - 1] if count else None
+        timestamps.release()
+        view.release()
+
+        rows = [row for row in rows if last is None or row[0] > last]
+        if not rows:
+            return 0
+
+        if count + len(rows) > capacity:
+            existing = [
+                struct.unpack_from(
+                    f"<{count}{fmt}", mapped, HEADER.size + i * 8 * capacity
+                )
+                for i, (_, fmt) in enumerate(COLUMNS)
+            ]
+            rows = list(zip(*existing)) + rows
+            compact = True
+        else:
+            for i, (_, fmt) in enumerate(COLUMNS):
+                offset = HEADER.size + i * 8 * capacity + 8 * count
+                struct.pack_into(
+                    f"<{len(rows)}{fmt}", mapped, offset, *(row[i] for row in rows)
+                )
+            mapped.flush()
+            # Publish the new points only after they are fully written
+            HEADER.pack_into(mapped, 0, MAGIC, VERSION, capacity, count + len(rows))
+            mapped.flush()
+            compact = False
+
+    if compact:
+        _write_file(path, rows, max(MIN_CAPACITY, 2 * len(rows)))
+        return len(rows) - count
+    return len(rows)
+
+
+def export_series(coin_id: str, interval: str) -> int:
+    """Appends the closed points of the Postgres store that the file lacks."""
+    series = open_series(coin_id, interval)
+    last = (
+        series.column("timestamp")[len(series) - 1]
+        if series is not None and len(series)
+        else -1
+    )
+    rows = db.session.execute(
+        db.select(
+            CoinPricePoint.timestamp,
+            CoinPricePoint.price,
+            CoinPricePoint.market_cap,
+            CoinPricePoint.total_volume,
+        )
+        .where(
+            CoinPricePoint.coin_id == coin_id,
+            CoinPricePoint.interval == interval,
+            CoinPricePoint.final,
+            CoinPricePoint.timestamp > last,
+        )
+        .order_by(CoinPricePoint.timestamp)
+    ).all()
+    return append_points(coin_id, interval, rows) if rows else 0
+
+
+def update_price_series_in_background():
+    """
+    Periodically syncs the hot coins' price history into the Postgres store and
+    mirrors the new closed points into their series files.
+
+    Every PRICE_SERIES_UPDATE_INTERVAL_SECONDS this takes the top
+    PRICE_SERIES_HOT_COINS_COUNT coins by market cap (the most-viewed coin pages),
+    syncs their "1h" and "1d" history (see core/candles.py) and appends whatever the
+    files are missing.
+    """
+    while True:
+        from app import app
+        from core.candles import HISTORY_INTERVALS, sync_history
+        from core.news import get_tracked_coins
+
+        start = time.monotonic()
+
+        with app.app_context():
+            try:
+                coins = get_tracked_coins(PRICE_SERIES_HOT_COINS_COUNT)
+            except Exception:
+                logging.exception("Failed to fetch hot coins for price series")
+                coins = []
+
+            for coin_id, _ in coins:
+                for interval in HISTORY_INTERVALS:
+                    try:
+                        sync_history(coin_id, interval)
+                        export_series(coin_id, interval)
+                    except Exception:
+                        db.session.rollback()
+                        logging.exception(
+                            "Failed to update price series %s/%s", coin_id, interval
+                        )
+
+        elapsed = time.monotonic() - start
+        time.sleep(max(0, PRICE_SERIES_UPDATE_INTERVAL_SECONDS - elapsed))
+
+
+_mirror_pid = None
+_mirror_lock = threading.Lock()
+
+
+def _mirror_forever(app) -> None:
+    from core.candles import HISTORY_INTERVALS
+    from core.news import get_tracked_coins
+
+    coins, coins_fetched_at = [], None
+    while True:
+        start = time.monotonic()
+
+        with app.app_context():
+            if (
+                coins_fetched_at is None
+                or start - coins_fetched_at >= PRICE_SERIES_UPDATE_INTERVAL_SECONDS
+            ):
+                try:
+                    coins = get_tracked_coins(PRICE_SERIES_HOT_COINS_COUNT)
+                    coins_fetched_at = start
+                except Exception:
+                    logging.exception("Failed to fetch hot coins for price series")
+
+            for coin_id, _ in coins:
+                for interval in HISTORY_INTERVALS:
+                    try:
+                        export_series(coin_id, interval)
+                    except Exception:
+                        db.session.rollback()
+                        logging.exception(
+                            "Failed to mirror price series %s/%s", coin_id, interval
+                        )
+
+        elapsed = time.monotonic() - start
+        time.sleep(max(0, PRICE_SERIES_MIRROR_INTERVAL_SECONDS - elapsed))
+
+
+def start_price_series_mirror(app) -> None:
+    """
+    Starts this process's mirror thread (idempotent, and restarted in a forked
+    child, which does not inherit the parent's threads).
+
+    Every PRICE_SERIES_MIRROR_INTERVAL_SECONDS the thread appends the hot coins'
+    closed points that the worker has synced into Postgres to the series files of
+    this host. It never calls CoinGecko for prices, only for the hot coin list
+    (at most every PRICE_SERIES_UPDATE_INTERVAL_SECONDS).
+    """
+    global _mirror_pid
+    with _mirror_lock:
+        if _mirror_pid == os.getpid():
+            return
+        _mirror_pid = os.getpid()
+    threading.Thread(
+        target=_mirror_forever, args=(app,), name="price-series-mirror", daemon=True
+    ).start()
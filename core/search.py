@@ -0,0 +1,225 @@
+"""Local full-text search over stored news articles and Reddit posts.
+
+Both news_articles and reddit_posts carry a generated tsvector column covered by a
+GIN index, so a search is an index lookup rather than a round trip to NewsData or
+Reddit. Matches are ranked by ts_rank_cd multiplied by an exponential time decay
+(relevance halves every SEARCH_DECAY_HALF_LIFE_SECONDS), so a fresh, moderately
+relevant story beats a week-old perfect match.
+
+The decay factor is 0.5 ** ((now - t) / half_life) = 0.5 ** (now / half_life) *
+2 ** (t / half_life): "now" scales every score by the same constant, so the ranking
+order does not change between requests and offset/after pagination stays stable.
+"""
+
+import time
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from constants import (
+    REDDIT_POST_RETENTION_DAYS,
+    REDDIT_SEARCH_CACHE_TTL_SECONDS,
+    SEARCH_DECAY_HALF_LIFE_SECONDS,
+    SEARCH_MAX_RESULTS,
+)
+from extensions import db
+from models import NewsArticle, NewsArticleCoin, StoredRedditPost
+from RedditScraper.RedditPost import RedditPost
+
+# Prefix of the pagination cursors handed out for local news searches (NewsData's own
+# cursors never contain a colon)
+SEARCH_CURSOR_PREFIX = "search:"
+
+
+def web_tsquery(query: str):
+    """Parses free text the way a web search box would (quoted phrases, -exclusions)."""
+    return func.websearch_to_tsquery("english", query)
+
+
+def _ranked(search_vector, tsquery, created_at, now: int):
+    """Relevance of a row: ts_rank_cd scaled by the exponential time decay."""
+    return func.ts_rank_cd(search_vector, tsquery) * func.power(
+        0.5, (now - created_at) / float(SEARCH_DECAY_HALF_LIFE_SECONDS)
+    )
+
+
+def search_news(query: str, coin_id: str = None, offset: int = 0, limit: int = 10):
+    """
+    Full-text searches the stored news articles.
+
+    Parameters:
+        query: Free-text search query
+        coin_id: If given, only articles ingested for this coin are ranked
+        offset: Number of ranked results to skip (from the previous page's cursor)
+        limit: Page size
+
+    Returns:
+        dict: A page in the NewsData response shape ({"results", "nextPage",
+              "totalResults"}), where nextPage is a SEARCH_CURSOR_PREFIX cursor or
+              None on the last page.
+    """
+    tsquery = web_tsquery(query)
+    matches = NewsArticle.search_vector.op("@@")(tsquery)
+
+    base = db.select(NewsArticle).where(matches)
+    if coin_id is not None:
+        base = base.join(
+            NewsArticleCoin, NewsArticleCoin.article_id == NewsArticle.id
+        ).where(NewsArticleCoin.coin_id == coin_id)
+
+    rank = _ranked(
+        NewsArticle.search_vector, tsquery, NewsArticle.published_at, int(time.time())
+    )
+    articles = db.session.scalars(
+        base.order_by(rank.desc(), NewsArticle.id.desc())
+        .offset(offset)
+        .limit(limit + 1)
+    ).all()
+
+    total = db.session.scalar(
+        db.select(func.count()).select_from(base.limit(SEARCH_MAX_RESULTS).subquery())
+    )
+
+    has_more = len(articles) > limit and offset + limit < SEARCH_MAX_RESULTS
+    return {
+        "results": [article.to_json() for article in articles[:limit]],
+        "nextPage": f"{SEARCH_CURSOR_PREFIX}{offset + limit}" if has_more else None,
+        "totalResults": total,
+    }
+
+
+def decode_search_cursor(cursor: str) -> int:
+    """
+    Returns the offset encoded in a local search cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    offset = int(cursor[len(SEARCH_CURSOR_PREFIX) :])
+    if offset < 0:
+        raise ValueError("Negative search offset")
+    return offset
+
+
+def index_reddit_posts(posts: list[RedditPost]) -> None:
+    """
+    Upserts fetched Reddit posts into the local store (refreshing their score and
+    comment count) and drops posts older than REDDIT_POST_RETENTION_DAYS.
+    """
+    now = int(time.time())
+    if posts:
+        # The same post can appear twice in one listing when Reddit reshuffles pages
+        rows = {
+            post.fullname: {
+                "fullname": post.fullname,
+                "post_id": post.id,
+                "title": post.title,
+                "content": post.content or "",
+                "thumbnail": post.thumbnail or "",
+                "subreddit": post.subreddit,
+                "url": post.url,
+                "score": post.score,
+                "comment_count": post.comment_count,
+                "created_at": int(post.timestamp),
+                "fetched_at": now,
+            }
+            for post in posts
+        }
+        statement = insert(StoredRedditPost).values(list(rows.values()))
+        db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[StoredRedditPost.fullname],
+                set_={
+                    "score": statement.excluded.score,
+                    "comment_count": statement.excluded.comment_count,
+                    "thumbnail": statement.excluded.thumbnail,
+                    "fetched_at": statement.excluded.fetched_at,
+                },
+            )
+        )
+
+    db.session.execute(
+        db.delete(StoredRedditPost).where(
+            StoredRedditPost.created_at < now - REDDIT_POST_RETENTION_DAYS * 86_400
+        )
+    )
+    db.session.commit()
+
+
+def search_reddit_posts(query: str, after: str = "", limit: int = 10):
+    """
+    Full-text searches the stored Reddit posts from the past
+    REDDIT_POST_RETENTION_DAYS.
+
+    Pagination mirrors Reddit's own: ``after`` is the fullname of the last post of the
+    previous page.
+
+    The store only answers while its matches are fresh, i.e. one of them was
+    (re)ingested within REDDIT_SEARCH_CACHE_TTL_SECONDS. Once they age out the caller
+    goes back to Reddit, whose results are indexed again (refreshing fetched_at), so
+    new posts for the query keep reaching the store.
+
+    Returns:
+        list[RedditPost] | None: The page of posts, or None if the store cannot answer
+        the request (stale matches, fewer than a full first page of them, an ``after``
+        that is not among them, or no matches left after it), in which case the caller
+        should ask Reddit.
+    """
+    now = int(time.time())
+    tsquery = web_tsquery(query)
+    rank = _ranked(
+        StoredRedditPost.search_vector, tsquery, StoredRedditPost.created_at, now
+    )
+
+    ranked = db.session.execute(
+        db.select(StoredRedditPost.fullname, StoredRedditPost.fetched_at)
+        .where(
+            StoredRedditPost.search_vector.op("@@")(tsquery),
+            StoredRedditPost.created_at >= now - REDDIT_POST_RETENTION_DAYS * 86_400,
+        )
+        .order_by(rank.desc(), StoredRedditPost.fullname.desc())
+        .limit(SEARCH_MAX_RESULTS)
+    ).all()
+    if (
+        not ranked
+        or max(fetched_at for _, fetched_at in ranked)
+        < now - REDDIT_SEARCH_CACHE_TTL_SECONDS
+    ):
+        return None
+    ranked = [fullname for fullname, _ in ranked]
+
+    if after:
+        try:
+            start = ranked.index(after) + 1
+        except ValueError:
+            return None
+    elif len(ranked) < limit:
+        return None
+    else:
+        start = 0
+
+    page = ranked[start : start + limit]
+    if not page:
+        return None
+
+    rows = {
+        row.fullname: row
+        for row in db.session.scalars(
+            db.select(StoredRedditPost).where(StoredRedditPost.fullname.in_(page))
+        )
+    }
+    return [
+        RedditPost(
+            title=row.title,
+            thumbnail=row.thumbnail,
+            content=row.content,
+            subreddit=row.subreddit,
+            score=row.score,
+            comment_count=row.comment_count,
+            id=row.post_id,
+            url=row.url,
+            fullname=row.fullname,
+            timestamp=row.created_at,
+        )
+        for row in (rows[fullname] for fullname in page if fullname in rows)
+    ]
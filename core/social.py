@@ -0,0 +1,180 @@
+"""Per-coin social activity metrics.
+
+A background pipeline ingests Reddit posts for the tracked coins into the local post
+store (news is already ingested by core/news.py), then rolls both stores up into one
+CoinSocialMetric snapshot per coin per cycle. Each rollup is a single aggregate query
+per source (counts, sums and the previous-window comparison are computed by Postgres
+with FILTER clauses in one scan), so /get_coin_social_metrics/<coin_id> only ever reads
+precomputed rows.
+"""
+
+import logging
+import time
+
+from sqlalchemy import func
+
+from constants import (
+    SOCIAL_METRICS_RETENTION_DAYS,
+    SOCIAL_METRICS_UPDATE_INTERVAL_SECONDS,
+    SOCIAL_METRICS_WINDOW_SECONDS,
+)
+from core.news import get_tracked_coins
+from core.search import index_reddit_posts, web_tsquery
+from extensions import db
+from models import CoinSocialMetric, NewsArticleCoin, StoredRedditPost
+
+# Newest Reddit posts fetched per coin and cycle (Reddit's maximum page size)
+REDDIT_POSTS_PER_COIN = 100
+
+
+def compute_coin_metrics(coin_id: str, name: str, now: int) -> CoinSocialMetric:
+    """
+    Computes a coin's social metrics over the window ending at `now`.
+
+    News articles are matched through the news_article_coins index; Reddit posts by
+    full-text matching the coin's name.
+
+    Returns:
+        CoinSocialMetric: The (unsaved) snapshot.
+    """
+    window_start = now - SOCIAL_METRICS_WINDOW_SECONDS
+    previous_start = window_start - SOCIAL_METRICS_WINDOW_SECONDS
+
+    in_news_window = NewsArticleCoin.published_at >= window_start
+    news_current, news_previous = db.session.execute(
+        db.select(
+            func.count().filter(in_news_window),
+            func.count().filter(~in_news_window),
+        ).where(
+            NewsArticleCoin.coin_id == coin_id,
+            NewsArticleCoin.published_at >= previous_start,
+            NewsArticleCoin.published_at <= now,
+        )
+    ).one()
+
+    in_reddit_window = StoredRedditPost.created_at >= window_start
+    reddit_current, reddit_previous, weighted_volume, comment_count = db.session.execute(
+        db.select(
+            func.count().filter(in_reddit_window),
+            func.count().filter(~in_reddit_window),
+            func.coalesce(
+                func.sum(
+                    1 + func.ln(1 + func.greatest(StoredRedditPost.score, 0))
+                ).filter(in_reddit_window),
+                0,
+            ),
+            func.coalesce(
+                func.sum(StoredRedditPost.comment_count).filter(in_reddit_window), 0
+            ),
+        ).where(
+            StoredRedditPost.search_vector.op("@@")(web_tsquery(name)),
+            StoredRedditPost.created_at >= previous_start,
+            StoredRedditPost.created_at <= now,
+        )
+    ).one()
+
+    previous_comment_count = db.session.scalar(
+        db.select(CoinSocialMetric.comment_count)
+        .where(CoinSocialMetric.coin_id == coin_id)
+        .order_by(CoinSocialMetric.computed_at.desc())
+        .limit(1)
+    )
+
+    window_hours = SOCIAL_METRICS_WINDOW_SECONDS / 3600
+    velocity = (news_current + reddit_current) / window_hours
+    previous_velocity = (news_previous + reddit_previous) / window_hours
+
+    return CoinSocialMetric(
+        coin_id=coin_id,
+        computed_at=now,
+        news_mentions=news_current,
+        reddit_mentions=reddit_current,
+        mention_velocity=velocity,
+        mention_velocity_change=(
+            (velocity - previous_velocity) / previous_velocity
+            if previous_velocity
+            else None
+        ),
+        score_weighted_volume=float(weighted_volume),
+        comment_count=int(comment_count),
+        comment_growth=(
+            int(comment_count) - previous_comment_count
+            if previous_comment_count is not None
+            else None
+        ),
+    )
+
+
+def purge_old_metrics(retention_days: int = SOCIAL_METRICS_RETENTION_DAYS) -> None:
+    """Deletes metric snapshots older than retention_days."""
+    cutoff = int(time.time()) - retention_days * 86_400
+    db.session.execute(
+        db.delete(CoinSocialMetric).where(CoinSocialMetric.computed_at < cutoff)
+    )
+    db.session.commit()
+
+
+def get_coin_social_metrics(coin_id: str, since: int) -> list[CoinSocialMetric]:
+    """Returns a coin's snapshots computed at or after `since`, oldest first."""
+    return db.session.scalars(
+        db.select(CoinSocialMetric)
+        .where(
+            CoinSocialMetric.coin_id == coin_id,
+            CoinSocialMetric.computed_at >= since,
+        )
+        .order_by(CoinSocialMetric.computed_at)
+    ).all()
+
+
+def update_social_metrics_in_background():
+    """
+    Periodically ingests Reddit posts for the tracked coins and stores a social
+    metrics snapshot for each of them.
+
+    Every SOCIAL_METRICS_UPDATE_INTERVAL_SECONDS this fetches the newest
+    REDDIT_POSTS_PER_COIN posts mentioning each of the top coins (refreshing the
+    score/comment counts of posts already stored), computes every coin's snapshot at
+    a common timestamp and purges snapshots older than SOCIAL_METRICS_RETENTION_DAYS.
+    A coin whose Reddit fetch fails still gets a snapshot from the stored data.
+    """
+    while True:
+        from app import app
+        from core.app import get_reddit_scraper
+
+        start = time.monotonic()
+
+        with app.app_context():
+            try:
+                coins = get_tracked_coins()
+            except Exception:
+                logging.exception("Failed to fetch coins for social metrics")
+                coins = []
+
+            for coin_id, name in coins:
+                try:
+                    index_reddit_posts(
+                        get_reddit_scraper().search_keyword_in_reddit(
+                            sort="new", keyword=name, limit=REDDIT_POSTS_PER_COIN
+                        )
+                    )
+                except Exception:
+                    db.session.rollback()
+                    logging.exception("Failed to ingest Reddit posts for %s", coin_id)
+
+            now = int(time.time())
+            for coin_id, name in coins:
+                try:
+                    db.session.add(compute_coin_metrics(coin_id, name, now))
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    logging.exception("Failed to compute social metrics for %s", coin_id)
+
+            try:
+                purge_old_metrics()
+            except Exception:
+                db.session.rollback()
+                logging.exception("Failed to purge old social metrics")
+
+        elapsed = time.monotonic() - start
+        time.sleep(max(0, SOCIAL_METRICS_UPDATE_INTERVAL_SECONDS - elapsed))
@@ -0,0 +1,192 @@
+"""Conditional responses (ETag / Last-Modified / 304) for shared market data.
+
+Market endpoints serve data that only changes when its upstream snapshot or store
+is refreshed. Each response is therefore identified by a resource key (endpoint +
+arguments) and a version that changes whenever the data behind the key does:
+
+- The strong ETag is derived from (key, version) alone, so a revalidating client is
+  answered with a body-less 304 before the payload is even built, let alone
+  serialized or compressed.
+- Otherwise the serialized body is cached per key and reused for as long as the
+  version stays the same, together with its brotli and gzip compressed variants
+  (each compressed once, on first request). The variant matching Accept-Encoding is
+  sent with Content-Encoding already set, which makes Flask-Compress pass it through,
+  so a cache hit costs no serialization and no compression.
+
+Because the ETag does not hash the body, callers must guarantee that one version
+always produces the same bytes.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import brotli
+from flask import Response, current_app, request
+
+# Serialized bodies kept per resource key (least recently used are evicted)
+MAX_ENTRIES = 256
+
+# Variants are compressed harder than Flask-Compress's per-request defaults, since
+# each one is compressed once per version instead of once per response
+BROTLI_QUALITY = 9
+GZIP_LEVEL = 9
+# Bodies smaller than this are sent uncompressed (same threshold as Flask-Compress)
+MIN_COMPRESS_SIZE = 500
+
+ENCODINGS = ("br", "gzip", "identity")
+
+_bodies = OrderedDict()  # key -> (version, {encoding: body})
+_lock = threading.Lock()
+
+
+def etag_for(key: str, version: Hashable) -> str:
+    return hashlib.sha256(f"{key}\0{version}".encode()).hexdigest()[:32]
+
+
+def _not_modified(etags: tuple, last_modified) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if request.if_none_match:
+        return any(request.if_none_match.contains(etag) for etag in etags)
+    if last_modified is not None and request.if_modified_since is not None:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def _get_variant(
+    key: str, version: Hashable, build_body: Callable[[], bytes], encoding: str
+) -> bytes:
+    """Returns the body of (key, version) in the given encoding, building and
+    compressing it only if that variant is not cached yet."""
+    with _lock:
+        entry = _bodies.get(key)
+        if entry is not None and entry[0] == version:
+            _bodies.move_to_end(key)
+            variant = entry[1].get(encoding)
+            if variant is not None:
+                return variant
+            identity = entry[1]["identity"]
+        else:
+            identity = None
+
+    if identity is None:
+        identity = build_body()
+    variant = _compress(identity, encoding)
+
+    with _lock:
+        entry = _bodies.get(key)
+        if entry is None or entry[0] != version:
+            entry = (version, {"identity": identity})
+            _bodies[key] = entry
+        entry[1][encoding] = variant
+        _bodies.move_to_end(key)
+        while len(_bodies) > MAX_ENTRIES:
+            _bodies.popitem(last=False)
+    return variant
+
+
+def _negotiate_encoding() -> str:
+    return request.accept_encodings.best_match(ENCODINGS, default="identity")
+
+
+def _dump_json(payload) -> bytes:
+    if hasattr(current_app.json, "dumpb"):
+        return current_app.json.dumpb(payload)
+    return current_app.json.dumps(payload).encode()
+
+
+def cached_json_response(
+    key: str,
+    version: Hashable,
+    build: Callable[[], object],
+    max_age: int = 0,
+    last_modified: float = None,
+) -> Response:
+    """
+    Returns a JSON response for a versioned resource, or a 304 Not Modified if the
+    client already holds this version (see cached_response).
+
+    Parameters:
+        build: Returns the JSON-serializable payload; only called when the body for
+               this version is not cached yet
+    """
+    return cached_response(
+        key,
+        version,
+        lambda: _dump_json(build()),
+        "application/json",
+        max_age=max_age,
+        last_modified=last_modified,
+    )
+
+
+def cached_response(
+    key: str,
+    version: Hashable,
+    build_body: Callable[[], bytes],
+    mimetype: str,
+    max_age: int = 0,
+    last_modified: float = None,
+) -> Response:
+    """
+    Returns a response for a versioned resource, or a 304 Not Modified if the
+    client already holds this version.
+
+    Parameters:
+        key: Identifies the resource, including every argument that shapes the body
+             (and its format, if the endpoint serves several)
+        version: Changes whenever the data behind key changes (same version => same
+                 body)
+        build_body: Returns the serialized body; only called when the body for this
+                    version is not cached yet
+        mimetype: Content type of the body
+        max_age: Seconds the client may reuse the response without revalidating
+        last_modified: UNIX time at which this version was produced, if known
+
+    Returns:
+        Response: In the best encoding the client accepts (br, gzip or identity),
+                  with ETag, Last-Modified (if given) and
+                  "Cache-Control: private, max-age=..." set. Market endpoints sit
+                  behind authentication, so shared caches must not store them.
+    """
+    encoding = _negotiate_encoding()
+    identity_etag = etag = etag_for(key, version)
+    if encoding != "identity":
+        # Each encoding is a different representation and needs its own strong ETag
+        etag = f"{identity_etag}-{encoding}"
+
+    # Small bodies are always sent (and tagged) as identity, so that tag matches too
+    if _not_modified((etag, identity_etag), last_modified):
+        response = Response(status=304)
+    else:
+        body = _get_variant(key, version, build_body, "identity")
+        if encoding != "identity":
+            if len(body) < MIN_COMPRESS_SIZE:
+                # Too small to be worth it: send (and describe) the plain body
+                encoding = "identity"
+                etag = identity_etag
+            else:
+                body = _get_variant(key, version, build_body, encoding)
+        response = Response(body, mimetype=mimetype)
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+
+    response.vary.add("Accept-Encoding")
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = int(last_modified)
+    response.cache_control.private = True
+    response.cache_control.max_age = max_age
+    if max_age == 0:
+        response.cache_control.no_cache = True
+    return response
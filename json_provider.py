@@ -0,0 +1,106 @@
+"""JSON providers for the Flask app.
+
+Both serialize ``Decimal`` (our exact-money type) as a float on the wire, so existing
+frontend code (parseFloat, numeric sorting) keeps working unchanged. Money stays exact
+in the database and in every server-side calculation; only the final serialized
+representation is a float.
+
+- ``OrjsonJSONProvider`` (default) serializes with orjson: UUIDs, dataclasses and
+  containers are handled in C, and Decimals take a one-line callback. It produces the
+  same documents as the stdlib provider (sorted keys, datetimes as HTTP dates).
+- ``DecimalJSONProvider`` is the stdlib ``json`` provider, kept as a fallback.
+
+The provider is selected with the JSON_PROVIDER setting (see get_json_provider_class).
+"""
+
+import logging
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+class DecimalJSONProvider(DefaultJSONProvider):
+    """Stdlib JSON provider that serializes ``Decimal`` as a float."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Decimal):
+            return float(o)
+        return DefaultJSONProvider.default(o)
+
+
+def _orjson_default(o):
+    # Called by orjson only for types it does not serialize natively
+    if type(o) is Decimal:
+        return float(o)
+    return DecimalJSONProvider.default(o)
+
+
+class OrjsonJSONProvider(DecimalJSONProvider):
+    """orjson-backed JSON provider that serializes ``Decimal`` as a float.
+
+    Datetimes are passed through to Flask's default (HTTP date strings) rather than
+    orjson's RFC 3339 output, and keys are sorted like the stdlib provider's, so
+    switching providers does not change any response. Calls with stdlib-only keyword
+    arguments (e.g. ``indent``) fall back to the stdlib serializer.
+    """
+
+    def _options(self, indent: bool = False) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumpb(obj).decode()
+
+    def dumpb(self, obj) -> bytes:
+        """Like dumps(), but returns the UTF-8 bytes without decoding them."""
+        return orjson.dumps(obj, default=_orjson_default, option=self._options())
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        # Mirror DefaultJSONProvider: pretty-print only in debug unless compact is set
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_orjson_default, option=self._options(indent)),
+            mimetype=self.mimetype,
+        )
+
+
+def get_json_provider_class(name: str):
+    """
+    Returns the JSON provider class for a JSON_PROVIDER setting.
+
+    Parameters:
+        name: "orjson" or "stdlib"
+
+    Returns:
+        type: OrjsonJSONProvider, or DecimalJSONProvider for "stdlib" and whenever
+              orjson is not installed
+
+    Raises:
+        ValueError: If name is not a known provider
+    """
+    if name == "stdlib":
+        return DecimalJSONProvider
+    if name != "orjson":
+        raise ValueError(f"Unknown JSON_PROVIDER: {name!r}")
+    if orjson is None:
+        logging.warning("orjson is not installed; using the stdlib JSON provider")
+        return DecimalJSONProvider
+    return OrjsonJSONProvider
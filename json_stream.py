@@ -0,0 +1,68 @@
+"""Streaming JSON responses for large lists.
+
+jsonify() serializes the whole payload into one string before the first byte is
+sent, so a response's peak memory grows with its size. stream_json_object serializes
+its arrays element by element from iterables instead, and sends them in batches of
+STREAM_BATCH_SIZE elements: memory per request stays bounded by one batch, and the
+client starts receiving data as soon as the first batch is ready.
+
+Elements are serialized with the app's JSON provider (so Decimals become floats as
+everywhere else). Because the status line and headers are sent before the body is
+produced, an error while streaming cannot turn into an error response: load and
+validate everything that can fail before calling stream_json_object.
+"""
+
+from typing import Iterable
+
+from flask import Response, current_app
+
+# Array elements serialized and sent per chunk
+STREAM_BATCH_SIZE = 500
+
+
+def _bytes_dumper(provider):
+    if hasattr(provider, "dumpb"):
+        return provider.dumpb
+    return lambda obj: provider.dumps(obj).encode()
+
+
+def iter_json_array(items: Iterable, dumps, batch_size: int = STREAM_BATCH_SIZE):
+    """Yields the JSON encoding of an array of items in chunks of batch_size
+    elements, serializing each element with `dumps` (object -> bytes)."""
+    yield b"["
+    separator = b""
+    batch = []
+    for item in items:
+        batch.append(dumps(item))
+        if len(batch) >= batch_size:
+            yield separator + b",".join(batch)
+            separator = b","
+            batch = []
+    if batch:
+        yield separator + b",".join(batch)
+    yield b"]"
+
+
+def stream_json_object(fields: dict) -> Response:
+    """
+    Returns a response that streams a JSON object whose values are arrays, e.g.
+    {"prices": [...], "volumes": [...]}.
+
+    Parameters:
+        fields: Maps each key to an iterable of JSON-serializable elements; the
+                iterables are consumed one after the other while streaming
+
+    Returns:
+        Response: A streamed application/json response
+    """
+    dumps = _bytes_dumper(current_app.json)
+
+    def generate():
+        separator = b"{"
+        for key, items in fields.items():
+            yield separator + dumps(key) + b":"
+            yield from iter_json_array(items, dumps)
+            separator = b","
+        yield b"}" if separator == b"," else b"{}"
+
+    return Response(generate(), mimetype="application/json")
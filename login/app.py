@@ -1,4 +1,3 @@
-from werkzeug.security import check_password_hash
 from extensions import limiter
 import hashlib
 import hmac
@@ -57,9 +56,20 @@ from constants import (
 )
 from extensions import db
 from models import TokenBlocklist, User, ValueHistory, Wallet
+from password_hashing import PasswordHashingUnavailable, verify_password
 
 user_authentication = Blueprint("user_authentication", __name__)
 
+# Returned (with Retry-After) when the password hashing pool is saturated
+_HASHING_BUSY_RESPONSE = (
+    {
+        "error": "Service busy",
+        "description": "Too many sign-in requests right now. Please try again in a few seconds.",
+    },
+    503,
+    {"Retry-After": "2"},
+)
+
 _DUMMY_HASH = "scrypt:32768:8:1$T1JkgtzXajcfhA6j$fe2b30a72d13a57a8fe93c8d83671e43b9a98372c3281e2a03b581c1a96c6bad2f6431c018c990b5a0805267dc3f6e9ab82555bcfb2c329689ef04d1e3652091"
 
 
@@ -278,15 +288,20 @@ def login():
 
     user = User.query.filter_by(email=email).first()
 
-    if not user:
-        # Constant-time dummy to prevent timing-based enumeration
-        check_password_hash(_DUMMY_HASH, password)
-        return {
-            "error": "Invalid email or password",
-            "description": "Please check your credentials and try again",
-        }, 401
+    try:
+        if not user:
+            # Constant-time dummy to prevent timing-based enumeration
+            verify_password(_DUMMY_HASH, password)
+            return {
+                "error": "Invalid email or password",
+                "description": "Please check your credentials and try again",
+            }, 401
 
-    if not user.check_password(password):
+        password_ok = user.check_password(password)
+    except PasswordHashingUnavailable:
+        return _HASHING_BUSY_RESPONSE
+
+    if not password_ok:
         return {
             "error": "Invalid email or password",
             "description": "Please check your credentials and try again",
@@ -418,7 +433,10 @@ def create_account():
         }, 400
 
     # Save user information to database, create a wallet for them, and log them in
-    user = User(email=email, username=username, password=password)
+    try:
+        user = User(email=email, username=username, password=password)
+    except PasswordHashingUnavailable:
+        return _HASHING_BUSY_RESPONSE
     db.session.add(user)
     db.session.commit()
 
@@ -860,7 +878,10 @@ def reset_password():
         }, 400
 
     # Update user password in the database
-    user.update_password(password)
+    try:
+        user.update_password(password)
+    except PasswordHashingUnavailable:
+        return _HASHING_BUSY_RESPONSE
     user.update_last_password_reset_token(token)
     db.session.add(user)
     db.session.commit()
@@ -0,0 +1,165 @@
+"""In-process latency metrics.
+
+A small, dependency-free histogram used to time hot paths (password hashing, order
+placement phases, ...). Each gunicorn worker keeps its own counters; snapshots are
+meant for logging and ad-hoc inspection rather than long-term storage.
+
+Modules register their stats with register_stats(); start_stats_logging() then logs
+every registered source as one JSON line per interval in each process (only when it
+changed since the last line).
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+# Upper bounds (in milliseconds) of the histogram buckets. Anything slower than the
+# last bound lands in the overflow bucket.
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Thread-safe, fixed-bucket latency histogram."""
+
+    def __init__(self, name: str, buckets_ms=DEFAULT_BUCKETS_MS):
+        """
+        Parameters:
+            name: Label used when the histogram is logged or snapshotted
+            buckets_ms: Ascending bucket upper bounds, in milliseconds
+        """
+        self.name = name
+        self.buckets_ms = tuple(buckets_ms)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears every counter."""
+        with self._lock:
+            self._counts = [0] * (len(self.buckets_ms) + 1)
+            self._count = 0
+            self._total_ms = 0.0
+            self._max_ms = 0.0
+            self._rejected = 0
+            self._timed_out = 0
+
+    def observe(self, seconds: float) -> None:
+        """Records one completed call that took ``seconds``."""
+        ms = seconds * 1000
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets_ms, ms)] += 1
+            self._count += 1
+            self._total_ms += ms
+            self._max_ms = max(self._max_ms, ms)
+
+    @contextmanager
+    def timer(self):
+        """Context manager that observes the duration of its block (even if the
+        block returns or raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def record_rejection(self) -> None:
+        """Counts a call that was refused before it started (e.g. pool saturated)."""
+        with self._lock:
+            self._rejected += 1
+
+    def record_timeout(self) -> None:
+        """Counts a call that exceeded its latency budget."""
+        with self._lock:
+            self._timed_out += 1
+
+    def percentile(self, p: float) -> float | None:
+        """
+        Returns the bucket upper bound (ms) below which ``p`` percent of the observed
+        calls fall, or None if nothing has been observed. Calls in the overflow bucket
+        are reported as the largest latency seen.
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            target = self._count * p / 100
+            running = 0
+            for i, count in enumerate(self._counts):
+                running += count
+                if running >= target:
+                    if i < len(self.buckets_ms):
+                        return float(self.buckets_ms[i])
+                    return self._max_ms
+            return self._max_ms
+
+    def snapshot(self) -> dict:
+        """Returns the current counters as a JSON-serializable dict."""
+        p50, p95, p99 = self.percentile(50), self.percentile(95), self.percentile(99)
+        with self._lock:
+            labels = [f"<={b}ms" for b in self.buckets_ms] + [
+                f">{self.buckets_ms[-1]}ms"
+            ]
+            return {
+                "name": self.name,
+                "count": self._count,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "mean_ms": self._total_ms / self._count if self._count else None,
+                "max_ms": self._max_ms,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "buckets": dict(zip(labels, self._counts)),
+            }
+
+
+_stats_sources = {}  # label -> function returning a JSON-serializable dict
+
+# The app does not configure logging (so the root logger only passes warnings on);
+# stats lines are INFO and go to stderr through their own handler
+_stats_log = logging.getLogger("metrics.stats")
+_stats_log.setLevel(logging.INFO)
+_stats_log.addHandler(logging.StreamHandler())
+_stats_log.propagate = False
+_stats_logger_pid = None
+_stats_lock = threading.Lock()
+
+
+def register_stats(label: str, get_stats: Callable[[], dict]) -> None:
+    """Registers a stats source (e.g. a function returning histogram snapshots) to
+    be logged by start_stats_logging under `label`."""
+    with _stats_lock:
+        _stats_sources[label] = get_stats
+
+
+def _log_stats_forever(interval: float) -> None:
+    last = {}
+    while True:
+        time.sleep(interval)
+        with _stats_lock:
+            sources = list(_stats_sources.items())
+        for label, get_stats in sources:
+            try:
+                line = json.dumps(get_stats(), sort_keys=True)
+            except Exception:
+                logging.exception("Failed to collect %s stats", label)
+                continue
+            if line != last.get(label):
+                _stats_log.info("stats %s pid=%d %s", label, os.getpid(), line)
+                last[label] = line
+
+
+def start_stats_logging(interval: float) -> None:
+    """Starts this process's stats logger thread (idempotent, and restarted in a
+    forked child, which does not inherit the parent's threads)."""
+    global _stats_logger_pid
+    with _stats_lock:
+        if _stats_logger_pid == os.getpid():
+            return
+        _stats_logger_pid = os.getpid()
+    threading.Thread(
+        target=_log_stats_forever, args=(interval,), name="stats-logger", daemon=True
+    ).start()
@@ -0,0 +1,73 @@
+"""create news_articles / news_article_coins tables for the local news store
+
+Crypto news is now ingested periodically by a background task instead of being
+proxied to NewsData.io on every request. news_articles holds each story once
+(unique hashes of the normalized URL and title de-duplicate syndicated copies);
+news_article_coins indexes articles by coin, with published_at copied into its
+(coin_id, published_at, article_id) primary key so a coin's feed is served by a
+single keyset range scan.
+
+Revision ID: 0007_news_articles
+Revises: 0006_money_to_numeric
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_news_articles"
+down_revision = "0006_money_to_numeric"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "news_articles",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("url_hash", sa.String(length=64), nullable=False),
+        sa.Column("title_hash", sa.String(length=64), nullable=False),
+        sa.Column("article_id", sa.Text(), nullable=True),
+        sa.Column("title", sa.Text(), nullable=False),
+        sa.Column("link", sa.Text(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("image_url", sa.Text(), nullable=True),
+        sa.Column("source_name", sa.Text(), nullable=True),
+        sa.Column("source_url", sa.Text(), nullable=True),
+        sa.Column("pub_date", sa.Text(), nullable=True),
+        sa.Column("pub_date_tz", sa.Text(), nullable=True),
+        sa.Column("published_at", sa.Integer(), nullable=False),
+        sa.Column("fetched_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("url_hash"),
+        sa.UniqueConstraint("title_hash"),
+    )
+
+    op.create_table(
+        "news_article_coins",
+        sa.Column("coin_id", sa.Text(), nullable=False),
+        sa.Column("published_at", sa.Integer(), nullable=False),
+        sa.Column("article_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["article_id"], ["news_articles.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("coin_id", "published_at", "article_id"),
+    )
+    # Supports the ON DELETE CASCADE from news_articles (retention cleanup)
+    op.create_index(
+        op.f("ix_news_article_coins_article_id"),
+        "news_article_coins",
+        ["article_id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        op.f("ix_news_article_coins_article_id"), table_name="news_article_coins"
+    )
+    op.drop_table("news_article_coins")
+    op.drop_table("news_articles")
@@ -0,0 +1,84 @@
+"""add full-text search over stored news and Reddit posts
+
+news_articles gains a generated tsvector column (title + description) and
+reddit_posts is created to keep every post fetched from Reddit's search, with its
+own generated tsvector (title + body). Both vectors are covered by GIN indexes so
+searches are answered locally (see core/search.py).
+
+Revision ID: 0008_full_text_search
+Revises: 0007_news_articles
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_full_text_search"
+down_revision = "0007_news_articles"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "news_articles",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('english', title || ' ' || coalesce(description, ''))",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_news_articles_search_vector",
+        "news_articles",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    op.create_table(
+        "reddit_posts",
+        sa.Column("fullname", sa.Text(), nullable=False),
+        sa.Column("post_id", sa.Text(), nullable=False),
+        sa.Column("title", sa.Text(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("thumbnail", sa.Text(), nullable=False),
+        sa.Column("subreddit", sa.Text(), nullable=False),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("comment_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.Integer(), nullable=False),
+        sa.Column("fetched_at", sa.Integer(), nullable=False),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', title || ' ' || content)", persisted=True),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("fullname"),
+    )
+    op.create_index(
+        op.f("ix_reddit_posts_created_at"), "reddit_posts", ["created_at"], unique=False
+    )
+    op.create_index(
+        "ix_reddit_posts_search_vector",
+        "reddit_posts",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade():
+    op.drop_index("ix_reddit_posts_search_vector", table_name="reddit_posts")
+    op.drop_index(op.f("ix_reddit_posts_created_at"), table_name="reddit_posts")
+    op.drop_table("reddit_posts")
+    op.drop_index("ix_news_articles_search_vector", table_name="news_articles")
+    op.drop_column("news_articles", "search_vector")
@@ -0,0 +1,39 @@
+"""create coin_social_metrics table for precomputed social activity rollups
+
+One row per coin per pipeline cycle (see core/social.py), keyed on
+(coin_id, computed_at) so a coin's time series is a single primary key range scan.
+
+Revision ID: 0009_coin_social_metrics
+Revises: 0008_full_text_search
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_coin_social_metrics"
+down_revision = "0008_full_text_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "coin_social_metrics",
+        sa.Column("coin_id", sa.Text(), nullable=False),
+        sa.Column("computed_at", sa.Integer(), nullable=False),
+        sa.Column("news_mentions", sa.Integer(), nullable=False),
+        sa.Column("reddit_mentions", sa.Integer(), nullable=False),
+        sa.Column("mention_velocity", sa.Float(), nullable=False),
+        sa.Column("mention_velocity_change", sa.Float(), nullable=True),
+        sa.Column("score_weighted_volume", sa.Float(), nullable=False),
+        sa.Column("comment_count", sa.Integer(), nullable=False),
+        sa.Column("comment_growth", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("coin_id", "computed_at"),
+    )
+
+
+def downgrade():
+    op.drop_table("coin_social_metrics")
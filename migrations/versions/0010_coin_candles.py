@@ -0,0 +1,55 @@
+"""create coin_candles / coin_price_points tables for the local candle store
+
+OHLC candles and market_chart price history used to be fetched from CoinGecko on
+every coin-page view. They are now stored per (coin_id, interval, timestamp) and
+synced incrementally (see core/candles.py); `final` marks closed candles, the single
+non-final row per series is the live one replaced on each sync.
+
+Revision ID: 0010_coin_candles
+Revises: 0009_coin_social_metrics
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0010_coin_candles"
+down_revision = "0009_coin_social_metrics"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "coin_candles",
+        sa.Column("coin_id", sa.Text(), nullable=False),
+        sa.Column("interval", sa.Text(), nullable=False),
+        sa.Column("timestamp", sa.Integer(), nullable=False),
+        sa.Column("open", sa.Float(), nullable=False),
+        sa.Column("high", sa.Float(), nullable=False),
+        sa.Column("low", sa.Float(), nullable=False),
+        sa.Column("close", sa.Float(), nullable=False),
+        sa.Column("final", sa.Boolean(), nullable=False),
+        sa.Column("fetched_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("coin_id", "interval", "timestamp"),
+    )
+
+    op.create_table(
+        "coin_price_points",
+        sa.Column("coin_id", sa.Text(), nullable=False),
+        sa.Column("interval", sa.Text(), nullable=False),
+        sa.Column("timestamp", sa.Integer(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        sa.Column("market_cap", sa.Float(), nullable=True),
+        sa.Column("total_volume", sa.Float(), nullable=True),
+        sa.Column("final", sa.Boolean(), nullable=False),
+        sa.Column("fetched_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("coin_id", "interval", "timestamp"),
+    )
+
+
+def downgrade():
+    op.drop_table("coin_price_points")
+    op.drop_table("coin_candles")
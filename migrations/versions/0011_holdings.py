@@ -0,0 +1,102 @@
+"""move wallet holdings from JSONB dicts into a holdings table
+
+wallets.assets / reserved_assets were JSONB dicts of decimal strings, rewritten as a
+whole on every trade and opaque to SQL aggregation. Each (wallet, coin) is now one
+holdings row with NUMERIC quantity and reserved columns, updated in place, with an
+index on coin_id for cross-wallet queries (e.g. all holders of a coin).
+
+Revision ID: 0011_holdings
+Revises: 0010_coin_candles
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0011_holdings"
+down_revision = "0010_coin_candles"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "holdings",
+        sa.Column("wallet_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("coin_id", sa.Text(), nullable=False),
+        sa.Column(
+            "quantity", sa.Numeric(38, 18), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "reserved", sa.Numeric(38, 18), server_default="0", nullable=False
+        ),
+        sa.CheckConstraint("quantity >= 0", name="ck_holdings_quantity_nonneg"),
+        sa.CheckConstraint("reserved >= 0", name="ck_holdings_reserved_nonneg"),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("wallet_id", "coin_id"),
+    )
+    op.create_index("ix_holdings_coin_id", "holdings", ["coin_id"])
+
+    # One row per coin that appears in either dict of a wallet
+    op.execute(
+        """
+        INSERT INTO holdings (wallet_id, coin_id, quantity, reserved)
+        SELECT
+            w.id,
+            k.coin_id,
+            COALESCE((w.assets ->> k.coin_id)::numeric, 0),
+            COALESCE((w.reserved_assets ->> k.coin_id)::numeric, 0)
+        FROM wallets AS w
+        CROSS JOIN LATERAL (
+            SELECT jsonb_object_keys(w.assets) AS coin_id
+            UNION
+            SELECT jsonb_object_keys(w.reserved_assets)
+        ) AS k;
+        """
+    )
+
+    op.drop_column("wallets", "reserved_assets")
+    op.drop_column("wallets", "assets")
+
+
+def downgrade():
+    op.add_column(
+        "wallets",
+        sa.Column(
+            "assets",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "wallets",
+        sa.Column(
+            "reserved_assets",
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default="{}",
+            nullable=False,
+        ),
+    )
+
+    # Quantities go back as decimal strings (see 0006_money_to_numeric)
+    for col, value in (("assets", "quantity"), ("reserved_assets", "reserved")):
+        op.execute(
+            f"""
+            UPDATE wallets AS w
+            SET {col} = h.quantities
+            FROM (
+                SELECT wallet_id, jsonb_object_agg(coin_id, {value}::text) AS quantities
+                FROM holdings
+                WHERE {value} > 0
+                GROUP BY wallet_id
+            ) AS h
+            WHERE h.wallet_id = w.id;
+            """
+        )
+
+    op.drop_index("ix_holdings_coin_id", table_name="holdings")
+    op.drop_table("holdings")
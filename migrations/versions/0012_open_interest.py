@@ -0,0 +1,60 @@
+"""create the open_interest aggregate table
+
+Open interest per coin (e.g. how much USD open buy orders reserve for ETH) could only
+be computed by scanning every open transaction. open_interest keeps one row per
+(coin_id, side, order_type) with the count, quantity and notional of the open orders,
+updated incrementally whenever an order opens, fills or is cancelled (see
+core/open_interest.py). It is backfilled here from the open transactions.
+
+Revision ID: 0012_open_interest
+Revises: 0011_holdings
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_open_interest"
+down_revision = "0011_holdings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "open_interest",
+        sa.Column("coin_id", sa.Text(), nullable=False),
+        sa.Column("side", sa.Text(), nullable=False),
+        sa.Column("order_type", sa.Text(), nullable=False),
+        sa.Column("order_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "quantity", sa.Numeric(38, 18), server_default="0", nullable=False
+        ),
+        sa.Column("notional", sa.Numeric(38, 8), server_default="0", nullable=False),
+        sa.Column("updated_at", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("coin_id", "side", "order_type"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO open_interest
+            (coin_id, side, order_type, order_count, quantity, notional, updated_at)
+        SELECT
+            coin_id,
+            "transactionType",
+            "orderType",
+            COUNT(*),
+            SUM(quantity),
+            SUM(total_value),
+            EXTRACT(EPOCH FROM now())::integer
+        FROM transactions
+        WHERE status = 'open'
+        GROUP BY coin_id, "transactionType", "orderType";
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("open_interest")
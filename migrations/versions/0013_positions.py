@@ -0,0 +1,65 @@
+"""create the positions table and record when orders fill
+
+Per-coin PnL could only be computed by replaying a wallet's whole trade history.
+positions keeps one row per (wallet, coin) with its quantity, average-cost basis and
+realized PnL, updated on every fill (see core/positions.py).
+
+transactions.executed_at records when an order filled, so replays apply fills in
+the order they happened (open orders fill after orders placed later). It is
+backfilled for market orders, which fill when placed; it stays NULL for open orders
+filled before this revision, which replays order by placement time.
+
+This revision leaves positions empty: fill it with `python replay_positions.py`
+after upgrading.
+
+Revision ID: 0013_positions
+Revises: 0012_open_interest
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0013_positions"
+down_revision = "0012_open_interest"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("transactions", sa.Column("executed_at", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE transactions
+        SET executed_at = timestamp
+        WHERE "orderType" = 'market' AND status = 'finished';
+        """
+    )
+
+    op.create_table(
+        "positions",
+        sa.Column("wallet_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("coin_id", sa.Text(), nullable=False),
+        sa.Column(
+            "quantity", sa.Numeric(38, 18), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "cost_basis", sa.Numeric(38, 8), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "realized_pnl", sa.Numeric(38, 8), server_default="0", nullable=False
+        ),
+        sa.Column("opened_at", sa.Integer(), nullable=True),
+        sa.Column("last_fill_at", sa.Integer(), nullable=True),
+        sa.Column("fill_count", sa.Integer(), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallets.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("wallet_id", "coin_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("positions")
+    op.drop_column("transactions", "executed_at")
@@ -0,0 +1,34 @@
+"""record when a wallet's positions were rebuilt from its transactions
+
+0013_positions creates the positions table empty. Until a wallet's fills are
+replayed into it, its positions are wrong (a sell from a holding bought before
+0013 would book the whole proceeds as realized PnL). wallets.positions_replayed_at
+is set by replay_positions.py when it rebuilds a wallet; it stays NULL for every
+existing wallet here, so /get_positions_pnl refuses them until the release step
+(`python replay_positions.py`, see the Procfile) has replayed them. Wallets created
+later have no fills to replay and are marked on creation.
+
+Revision ID: 0014_positions_replayed_at
+Revises: 0013_positions
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_positions_replayed_at"
+down_revision = "0013_positions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "wallets", sa.Column("positions_replayed_at", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column("wallets", "positions_replayed_at")
@@ -4,12 +4,25 @@ from decimal import Decimal
 
 from flask_login import UserMixin
 from sqlalchemy import ARRAY, Boolean
-from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.ext.mutable import MutableDict, MutableList
-from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.ext.mutable import MutableList
+from sqlalchemy.orm import attribute_keyed_dict
 
 from extensions import db
-from money import D, DUST_QTY, qty_get, qty_set, quantize_qty, quantize_usd
+from money import (
+    D,
+    DUST_QTY,
+    DUST_UNITS,
+    pro_rata_units,
+    qty_from_units,
+    qty_units,
+    quantize_qty,
+    quantize_usd,
+    usd_from_units,
+    usd_product,
+    usd_units,
+)
+from password_hashing import hash_password, verify_password
 
 
 class User(db.Model, UserMixin):
@@ -56,7 +69,7 @@ class User(db.Model, UserMixin):
         if username:
             self.username = username
         if password:
-            self.password_hash = generate_password_hash(password)
+            self.password_hash = hash_password(password)
         if provider and provider_id:
             self.provider = provider
             self.provider_id = provider_id
@@ -80,7 +93,7 @@ class User(db.Model, UserMixin):
             password (str): The new password to be hashed and stored.
         """
         if not self.provider and not self.provider_id:
-            self.password_hash = generate_password_hash(password)
+            self.password_hash = hash_password(password)
 
     def update_last_password_reset_token(self, token: str) -> None:
         self.last_password_reset_token = token
@@ -94,9 +107,13 @@ class User(db.Model, UserMixin):
 
         Returns:
             bool: True if password matches hash, else false
+
+        Raises:
+            PasswordHashingUnavailable: If the hashing pool is saturated or the check
+                                        exceeds its latency budget
         """
         if self.password_hash:
-            return check_password_hash(self.password_hash, password)
+            return verify_password(self.password_hash, password)
         return False
 
 
@@ -108,8 +125,11 @@ class Wallet(db.Model):
     Attributes:
         id: Unique identifier for the wallet, serves as the primary key
         balance: The user's balance in USD
+        reserved_balance: The part of the balance reserved by open buy orders
+        holdings: The wallet's Holding rows, keyed by coin ID
         assets: A dictionary of the user's assets, where the key is the coin ID and the
-                value is the quantity of that coin
+                value is the quantity of that coin (read-only, derived from holdings)
+        reserved_assets: Like assets, for the quantities reserved by open sell orders
         time_created: The time the wallet was created, in UNIX time (in seconds)
         status: The status of the wallet, e.g., "active" or "inactive"
         total_current_value: The total value of the user's assets in USD
@@ -118,6 +138,10 @@ class Wallet(db.Model):
                       transaction history
         value_history: A relationship to the ValueHistory model, storing the history of
                        the wallet's value
+        positions_replayed_at: When the wallet's positions were last rebuilt from its
+                               transactions (see replay_positions.py), in UNIX time
+                               (in seconds); NULL until then for wallets that
+                               predate the positions table
     """
 
     __tablename__ = "wallets"
@@ -138,12 +162,14 @@ class Wallet(db.Model):
         server_default="1000000",
         nullable=False,
     )
-    assets = db.Column(MutableDict.as_mutable(JSONB), default={}, nullable=False)
     reserved_balance = db.Column(
         db.Numeric(20, 8), default=Decimal("0"), nullable=False
     )
-    reserved_assets = db.Column(
-        MutableDict.as_mutable(JSONB), default=dict, nullable=False
+    holdings = db.relationship(
+        "Holding",
+        collection_class=attribute_keyed_dict("coin_id"),
+        cascade="all, delete-orphan",
+        lazy="selectin",
     )
     time_created = db.Column(
         db.Integer, default=lambda: int(time.time()), nullable=False
@@ -152,6 +178,8 @@ class Wallet(db.Model):
     total_current_value = db.Column(
         db.Numeric(20, 8), default=Decimal("0"), nullable=False
     )
+    # New wallets have no fills to replay
+    positions_replayed_at = db.Column(db.Integer, default=lambda: int(time.time()))
     owner_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"), unique=True)
     transactions = db.relationship("Transaction", backref="wallet", lazy="dynamic")
     value_history = db.relationship("ValueHistory", backref="wallet", uselist=False)
@@ -167,36 +195,77 @@ class Wallet(db.Model):
 
     def update_balance_add(self, amount):
         """Adds a specified amount (USD) to the wallet's balance."""
-        self.balance = D(self.balance) + D(amount)
+        self.balance = D(self.balance) + quantize_usd(amount)
 
     def update_balance_subtract(self, amount):
         """Subtracts a specified amount (USD) from the wallet's balance."""
-        self.balance = D(self.balance) - D(amount)
+        self.balance = D(self.balance) - quantize_usd(amount)
+
+    @property
+    def assets(self) -> dict:
+        """{coin_id: quantity} of every coin the wallet holds."""
+        return {
+            coin_id: D(holding.quantity)
+            for coin_id, holding in self.holdings.items()
+            if holding.quantity > 0
+        }
+
+    @property
+    def reserved_assets(self) -> dict:
+        """{coin_id: quantity} of every coin reserved by open sell orders."""
+        return {
+            coin_id: D(holding.reserved)
+            for coin_id, holding in self.holdings.items()
+            if holding.reserved > 0
+        }
+
+    def _quantity(self, coin_id: str) -> Decimal:
+        holding = self.holdings.get(coin_id)
+        return D(holding.quantity) if holding is not None else D(0)
+
+    def _reserved(self, coin_id: str) -> Decimal:
+        holding = self.holdings.get(coin_id)
+        return D(holding.reserved) if holding is not None else D(0)
+
+    def _holding(self, coin_id: str) -> "Holding":
+        """Returns the wallet's Holding row of a coin, adding an empty one if needed."""
+        holding = self.holdings.get(coin_id)
+        if holding is None:
+            holding = Holding(coin_id=coin_id, quantity=D(0), reserved=D(0))
+            self.holdings[coin_id] = holding
+        return holding
+
+    def _drop_if_empty(self, coin_id: str) -> None:
+        """Deletes a coin's Holding row once neither quantity nor reservation is left."""
+        holding = self.holdings.get(coin_id)
+        if holding is not None and holding.quantity == 0 and holding.reserved == 0:
+            del self.holdings[coin_id]
 
     def update_assets_add(self, coin_id: str, quantity):
         """Adds a specified quantity of a coin to the wallet's assets."""
-        qty_set(self.assets, coin_id, qty_get(self.assets, coin_id) + D(quantity))
+        holding = self._holding(coin_id)
+        holding.quantity = D(holding.quantity) + quantize_qty(quantity)
 
     def update_assets_subtract(self, coin_id: str, quantity):
         """
         Subtracts a specified quantity of a coin from the wallet's assets.
 
-        If the resulting holding is dust-or-below, the coin is removed from the
-        dictionary so a sell-to-zero doesn't leave a stray key behind.
+        If the resulting holding is dust-or-below it is zeroed (and the row deleted
+        once nothing is reserved either), so a sell-to-zero doesn't leave a stray
+        holding behind.
         """
-        remaining = qty_get(self.assets, coin_id) - D(quantity)
-        if remaining <= DUST_QTY:
-            self.assets.pop(coin_id, None)
-        else:
-            qty_set(self.assets, coin_id, remaining)
+        holding = self._holding(coin_id)
+        remaining = D(holding.quantity) - quantize_qty(quantity)
+        holding.quantity = remaining if remaining > DUST_QTY else D(0)
+        self._drop_if_empty(coin_id)
 
     def has_enough_balance(self, amount):
         """True if the wallet's balance covers the amount (USD)."""
-        return D(self.balance) >= D(amount)
+        return D(self.balance) >= quantize_usd(amount)
 
     def has_enough_coins(self, coin_id: str, coin_quantity):
         """True if the wallet holds at least coin_quantity of the coin."""
-        return qty_get(self.assets, coin_id) >= D(coin_quantity)
+        return self._quantity(coin_id) >= quantize_qty(coin_quantity)
 
     def available_balance(self):
         """Returns the spendable USD balance (total balance minus reserved funds)."""
@@ -204,39 +273,173 @@ class Wallet(db.Model):
 
     def available_coins(self, coin_id):
         """Returns the spendable quantity of a coin (holdings minus reserved coins)."""
-        return qty_get(self.assets, coin_id) - qty_get(self.reserved_assets, coin_id)
+        return self._quantity(coin_id) - self._reserved(coin_id)
 
     def has_enough_available_balance(self, amount):
         """Returns True if available (unreserved) USD balance covers the amount."""
-        return self.available_balance() >= D(amount)
+        return self.available_balance() >= quantize_usd(amount)
 
     def has_enough_available_coins(self, coin_id, quantity):
         """Returns True if available (unreserved) holdings cover the quantity."""
-        return self.available_coins(coin_id) >= D(quantity)
+        return self.available_coins(coin_id) >= quantize_qty(quantity)
 
     def reserve_balance(self, amount):
         """Reserves USD against the wallet for an open buy order."""
-        self.reserved_balance = D(self.reserved_balance) + D(amount)
+        self.reserved_balance = D(self.reserved_balance) + quantize_usd(amount)
 
     def release_balance(self, amount):
         """Releases previously reserved USD (clamped at zero)."""
-        self.reserved_balance = max(D(0), D(self.reserved_balance) - D(amount))
+        self.reserved_balance = max(
+            D(0), D(self.reserved_balance) - quantize_usd(amount)
+        )
 
     def reserve_coins(self, coin_id, quantity):
         """Reserves a quantity of a coin against the wallet for an open sell order."""
-        qty_set(
-            self.reserved_assets,
-            coin_id,
-            qty_get(self.reserved_assets, coin_id) + D(quantity),
-        )
+        holding = self._holding(coin_id)
+        holding.reserved = D(holding.reserved) + quantize_qty(quantity)
 
     def release_coins(self, coin_id, quantity):
-        """Releases previously reserved coins, removing the key when it reaches ~0."""
-        remaining = qty_get(self.reserved_assets, coin_id) - D(quantity)
-        if remaining <= DUST_QTY:
-            self.reserved_assets.pop(coin_id, None)
+        """Releases previously reserved coins, zeroing the reservation at ~0."""
+        holding = self.holdings.get(coin_id)
+        if holding is None:
+            return
+        remaining = D(holding.reserved) - quantize_qty(quantity)
+        holding.reserved = remaining if remaining > DUST_QTY else D(0)
+        self._drop_if_empty(coin_id)
+
+
+class Holding(db.Model):
+    """
+    Holding model class (for the database) that stores how much of one coin a wallet
+    holds. Each buy, sell and reservation updates a single row, and holdings can be
+    aggregated in SQL (e.g. every holder of a coin, via the coin_id index).
+
+    Attributes:
+        wallet_id: The ID of the wallet holding the coin
+        coin_id: CoinGecko identifier of the coin
+        quantity: The quantity of the coin held
+        reserved: The part of the quantity reserved by open sell orders
+    """
+
+    __tablename__ = "holdings"
+    __table_args__ = (
+        db.CheckConstraint("quantity >= 0", name="ck_holdings_quantity_nonneg"),
+        db.CheckConstraint("reserved >= 0", name="ck_holdings_reserved_nonneg"),
+        db.Index("ix_holdings_coin_id", "coin_id"),
+    )
+
+    wallet_id = db.Column(
+        UUID(as_uuid=True),
+        db.ForeignKey("wallets.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    coin_id = db.Column(db.Text, primary_key=True)
+    quantity = db.Column(
+        db.Numeric(38, 18),
+        default=Decimal("0"),
+        server_default="0",
+        nullable=False,
+    )
+    reserved = db.Column(
+        db.Numeric(38, 18),
+        default=Decimal("0"),
+        server_default="0",
+        nullable=False,
+    )
+
+
+class Position(db.Model):
+    """
+    Position model class (for the database) that stores a wallet's position in one
+    coin for PnL reporting, valued at average cost: every buy adds its cost to the
+    cost basis, and every sell removes the sold share of the cost basis and realizes
+    the difference to its proceeds. Rows are kept once the position is closed, so
+    the realized PnL of a coin survives selling all of it.
+
+    Attributes:
+        wallet_id: The ID of the wallet holding the position
+        coin_id: CoinGecko identifier of the coin
+        quantity: The quantity of the coin currently held
+        cost_basis: What the quantity held cost, at average cost (USD)
+        realized_pnl: Proceeds of all sells minus the cost basis they removed (USD)
+        opened_at: Time of the first buy of the current (still open) position, in
+                   UNIX time (in seconds); None while the position is closed
+        last_fill_at: Time of the latest fill, in UNIX time (in seconds)
+        fill_count: Number of fills applied to the position
+    """
+
+    __tablename__ = "positions"
+
+    wallet_id = db.Column(
+        UUID(as_uuid=True),
+        db.ForeignKey("wallets.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    coin_id = db.Column(db.Text, primary_key=True)
+    quantity = db.Column(
+        db.Numeric(38, 18),
+        default=Decimal("0"),
+        server_default="0",
+        nullable=False,
+    )
+    cost_basis = db.Column(
+        db.Numeric(38, 8),
+        default=Decimal("0"),
+        server_default="0",
+        nullable=False,
+    )
+    realized_pnl = db.Column(
+        db.Numeric(38, 8),
+        default=Decimal("0"),
+        server_default="0",
+        nullable=False,
+    )
+    opened_at = db.Column(db.Integer)
+    last_fill_at = db.Column(db.Integer)
+    fill_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+
+    def apply_fill(self, side: str, quantity, value, filled_at: int) -> None:
+        """
+        Applies a fill to the position.
+
+        Selling more than the position holds only removes what it holds (the rest
+        of the proceeds is realized with no cost), and a remainder of dust or less
+        closes the position, realizing its leftover cost basis as a loss.
+
+        Parameters:
+            side (str): The transactionType of the fill ("buy" or "sell")
+            quantity: The quantity of the coin filled
+            value: The USD paid (buy) or received (sell)
+            filled_at (int): Time of the fill, in UNIX time (in seconds)
+        """
+        held = qty_units(self.quantity or 0)
+        cost = usd_units(self.cost_basis or 0)
+        realized = usd_units(self.realized_pnl or 0)
+        quantity = qty_units(quantity)
+        value = usd_units(value)
+
+        if side == "buy":
+            if held == 0:
+                self.opened_at = filled_at
+            held += quantity
+            cost += value
         else:
-            qty_set(self.reserved_assets, coin_id, remaining)
+            sold = min(quantity, held)
+            removed = cost if sold == held else pro_rata_units(cost, sold, held)
+            held -= sold
+            cost -= removed
+            realized += value - removed
+            if held <= DUST_UNITS:
+                held = 0
+                realized -= cost
+                cost = 0
+                self.opened_at = None
+
+        self.quantity = qty_from_units(held)
+        self.cost_basis = usd_from_units(cost)
+        self.realized_pnl = usd_from_units(realized)
+        self.last_fill_at = filled_at
+        self.fill_count = (self.fill_count or 0) + 1
 
 
 class ValueHistory(db.Model):
@@ -328,6 +531,9 @@ class Transaction(db.Model):
         balance_before: The user's balance before the transaction
         balance_after: The user's balance after the transaction
         total_value: The total value of the transaction
+        executed_at: Time the order was filled, in UNIX time (in seconds); None while
+                     it is open, if it was cancelled, or if it was filled before this
+                     was recorded
         likes: A relationship to the TransactionLikes model, representing the likes
                associated with the transaction
         visibility: A boolean flag indicating whether the transaction is visible to
@@ -350,6 +556,7 @@ class Transaction(db.Model):
     balance_before = db.Column(db.Numeric(20, 8), nullable=False)
     balance_after = db.Column(db.Numeric(20, 8))
     total_value = db.Column(db.Numeric(20, 8), nullable=False)
+    executed_at = db.Column(db.Integer)
     likes = db.relationship("TransactionLikes", backref="transaction", uselist=False)
     visibility = db.Column(db.Boolean, nullable=False)
     wallet_id = db.Column(UUID(as_uuid=True), db.ForeignKey("wallets.id"))
@@ -373,23 +580,23 @@ class Transaction(db.Model):
         self.transactionType = transactionType
         self.orderType = orderType
         self.coin_id = coin_id
-        self.quantity = quantize_qty(D(quantity))
         self.comment = comment
-        self.price_per_unit = quantize_usd(D(price_per_unit))
         self.wallet_id = wallet_id
-        self.total_value = quantize_usd(D(quantity) * D(price_per_unit))
-        self.balance_before = quantize_usd(D(balance_before))
+
+        # Amounts are derived from the stored (quantized) quantity and price, so
+        # balance_after is exactly balance_before -/+ total_value
+        self.quantity = quantize_qty(quantity)
+        self.price_per_unit = quantize_usd(price_per_unit)
+        self.total_value = usd_product(self.quantity, self.price_per_unit)
+        self.balance_before = quantize_usd(balance_before)
 
         if orderType == "market":
-            self.price_per_unit_at_execution = quantize_usd(D(price_per_unit))
+            self.price_per_unit_at_execution = self.price_per_unit
+            self.executed_at = int(time.time())
             if transactionType == "buy":
-                self.balance_after = quantize_usd(
-                    D(balance_before) - D(quantity) * D(price_per_unit)
-                )
+                self.balance_after = self.balance_before - self.total_value
             elif transactionType == "sell":
-                self.balance_after = quantize_usd(
-                    D(balance_before) + D(quantity) * D(price_per_unit)
-                )
+                self.balance_after = self.balance_before + self.total_value
         elif orderType == "limit" or orderType == "stop":
             self.price_per_unit_at_execution = None
             self.balance_after = None
@@ -430,18 +637,26 @@ class Transaction(db.Model):
             price_per_unit_at_execution (float): The price per unit at which the order
                                                  is executed.
         """
-        self.price_per_unit_at_execution = quantize_usd(D(price_per_unit_at_execution))
+        self.price_per_unit_at_execution = quantize_usd(price_per_unit_at_execution)
 
+        # The fill is charged at the full-precision market price (see filled_value)
+        total = usd_product(self.quantity, price_per_unit_at_execution)
         if self.transactionType == "buy":
-            self.balance_after = quantize_usd(
-                D(self.balance_before) - D(self.quantity) * D(price_per_unit_at_execution)
-            )
+            self.balance_after = quantize_usd(self.balance_before) - total
         elif self.transactionType == "sell":
-            self.balance_after = quantize_usd(
-                D(self.balance_before) + D(self.quantity) * D(price_per_unit_at_execution)
-            )
+            self.balance_after = quantize_usd(self.balance_before) + total
+        self.executed_at = int(time.time())
         self.status = "finished"
 
+    @property
+    def filled_value(self) -> Decimal:
+        """USD paid (buy) or received (sell) when the order was filled."""
+        if self.orderType == "market":
+            return D(self.total_value)
+        # Open orders fill at the market price, while total_value is computed at the
+        # trigger price
+        return abs(D(self.balance_after) - D(self.balance_before))
+
     def cancel_open_order(self):
         """
         Cancels an open order and sets the user's balance_after to "N/A". Also updates
@@ -545,3 +760,324 @@ class TokenBlocklist(db.Model):
         self.user_id = user_id
         self.created_at = int(time.time())
         self.expires_at = expires_at
+
+
+class NewsArticle(db.Model):
+    """
+    NewsArticle model class (for the database) that stores a crypto news article
+    ingested from the NewsData.io API by the background news updater.
+
+    Articles are de-duplicated on ingestion: NewsData frequently returns the same story
+    under several URLs (syndication) or the same URL with a new title, so both a hash of
+    the normalized URL and a hash of the normalized title must be unique.
+
+    Attributes:
+        id: Unique identifier for the article, serves as the primary key
+        url_hash: SHA-256 of the normalized article URL (unique)
+        title_hash: SHA-256 of the normalized article title (unique)
+        article_id: NewsData's own identifier for the article
+        title: Headline of the article
+        link: URL of the article
+        description: Short summary of the article
+        image_url: URL of the article's lead image, if any
+        source_name: Name of the publisher
+        source_url: Homepage of the publisher
+        pub_date: Publication date string as returned by NewsData
+        pub_date_tz: Timezone of pub_date as returned by NewsData
+        published_at: Publication time, in UNIX time (in seconds)
+        fetched_at: Time the article was ingested, in UNIX time (in seconds)
+        search_vector: Full-text search vector of the title and description, generated
+                       by Postgres and covered by a GIN index
+        coins: A relationship to the NewsArticleCoin model, the coins this article
+               was ingested for
+    """
+
+    __tablename__ = "news_articles"
+    __table_args__ = (
+        db.Index(
+            "ix_news_articles_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    url_hash = db.Column(db.String(64), nullable=False, unique=True)
+    title_hash = db.Column(db.String(64), nullable=False, unique=True)
+    article_id = db.Column(db.Text)
+    title = db.Column(db.Text, nullable=False)
+    link = db.Column(db.Text, nullable=False)
+    description = db.Column(db.Text)
+    image_url = db.Column(db.Text)
+    source_name = db.Column(db.Text)
+    source_url = db.Column(db.Text)
+    pub_date = db.Column(db.Text)
+    pub_date_tz = db.Column(db.Text)
+    published_at = db.Column(db.Integer, nullable=False)
+    fetched_at = db.Column(db.Integer, default=lambda: int(time.time()), nullable=False)
+    search_vector = db.Column(
+        TSVECTOR,
+        db.Computed(
+            "to_tsvector('english', title || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+    )
+    coins = db.relationship(
+        "NewsArticleCoin", backref="article", cascade="all, delete-orphan"
+    )
+
+    def to_json(self):
+        """
+        Returns the article in the same shape as a NewsData.io result, so the
+        frontend's news feed renders stored and upstream articles identically.
+        """
+        return {
+            "article_id": self.article_id,
+            "title": self.title,
+            "link": self.link,
+            "description": self.description,
+            "image_url": self.image_url,
+            "source_name": self.source_name,
+            "source_url": self.source_url,
+            "pubDate": self.pub_date,
+            "pubDateTZ": self.pub_date_tz,
+        }
+
+
+class NewsArticleCoin(db.Model):
+    """
+    NewsArticleCoin model class (for the database) that indexes news articles by coin.
+
+    One row per (coin, article) pair. published_at is copied from the article so that
+    a coin's feed page is a single range scan of the (coin_id, published_at, article_id)
+    primary key, with no join needed to order or paginate it.
+
+    Attributes:
+        coin_id: The CoinGecko identifier of the coin
+        published_at: Publication time of the article, in UNIX time (in seconds)
+        article_id: The ID of the indexed NewsArticle
+    """
+
+    __tablename__ = "news_article_coins"
+
+    coin_id = db.Column(db.Text, primary_key=True)
+    published_at = db.Column(db.Integer, primary_key=True)
+    article_id = db.Column(
+        UUID(as_uuid=True),
+        db.ForeignKey("news_articles.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+
+
+class StoredRedditPost(db.Model):
+    """
+    StoredRedditPost model class (for the database) that keeps every Reddit post the
+    app has fetched from Reddit's search, so later searches can be answered locally.
+
+    Attributes:
+        fullname: Reddit's full name of the post (e.g. "t3_abc123"), serves as the
+                  primary key
+        post_id: Unique id Reddit associates with the post
+        title: Post title
+        content: Body text of the post
+        thumbnail: Thumbnail image URL ("" for text posts)
+        subreddit: Name of the subreddit the post was made in
+        url: Reddit URL for the post
+        score: Net number of upvotes minus number of downvotes, as last fetched
+        comment_count: Number of comments under the post, as last fetched
+        created_at: Time the post was created, in UNIX time (in seconds)
+        fetched_at: Time the post was last fetched, in UNIX time (in seconds)
+        search_vector: Full-text search vector of the title and body, generated by
+                       Postgres and covered by a GIN index
+    """
+
+    __tablename__ = "reddit_posts"
+    __table_args__ = (
+        db.Index(
+            "ix_reddit_posts_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
+
+    fullname = db.Column(db.Text, primary_key=True)
+    post_id = db.Column(db.Text, nullable=False)
+    title = db.Column(db.Text, nullable=False)
+    content = db.Column(db.Text, nullable=False, default="")
+    thumbnail = db.Column(db.Text, nullable=False, default="")
+    subreddit = db.Column(db.Text, nullable=False)
+    url = db.Column(db.Text, nullable=False)
+    score = db.Column(db.Integer, nullable=False, default=0)
+    comment_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.Integer, nullable=False, index=True)
+    fetched_at = db.Column(db.Integer, default=lambda: int(time.time()), nullable=False)
+    search_vector = db.Column(
+        TSVECTOR,
+        db.Computed(
+            "to_tsvector('english', title || ' ' || content)", persisted=True
+        ),
+    )
+
+
+class CoinSocialMetric(db.Model):
+    """
+    CoinSocialMetric model class (for the database) that stores one snapshot of a
+    coin's social activity, computed periodically by the social metrics pipeline
+    from the stored news articles and Reddit posts.
+
+    All counts cover the SOCIAL_METRICS_WINDOW_SECONDS (rolling) window ending at
+    computed_at.
+
+    Attributes:
+        coin_id: The CoinGecko identifier of the coin
+        computed_at: Time the snapshot was computed, in UNIX time (in seconds)
+        news_mentions: Number of news articles about the coin in the window
+        reddit_mentions: Number of Reddit posts mentioning the coin in the window
+        mention_velocity: Mentions (news + Reddit) per hour over the window
+        mention_velocity_change: Relative change of mention_velocity against the
+                                 preceding window (None if that window was empty)
+        score_weighted_volume: Reddit posts in the window weighted by their score
+                               (each post counts 1 + ln(1 + score))
+        comment_count: Total comments on the Reddit posts in the window
+        comment_growth: Change in comment_count since the coin's previous snapshot
+                        (None for the first snapshot)
+    """
+
+    __tablename__ = "coin_social_metrics"
+
+    coin_id = db.Column(db.Text, primary_key=True)
+    computed_at = db.Column(db.Integer, primary_key=True)
+    news_mentions = db.Column(db.Integer, nullable=False)
+    reddit_mentions = db.Column(db.Integer, nullable=False)
+    mention_velocity = db.Column(db.Float, nullable=False)
+    mention_velocity_change = db.Column(db.Float)
+    score_weighted_volume = db.Column(db.Float, nullable=False)
+    comment_count = db.Column(db.Integer, nullable=False)
+    comment_growth = db.Column(db.Integer)
+
+    def to_json(self):
+        return {
+            "timestamp": self.computed_at,
+            "news_mentions": self.news_mentions,
+            "reddit_mentions": self.reddit_mentions,
+            "mention_velocity": self.mention_velocity,
+            "mention_velocity_change": self.mention_velocity_change,
+            "score_weighted_volume": self.score_weighted_volume,
+            "comment_count": self.comment_count,
+            "comment_growth": self.comment_growth,
+        }
+
+
+class CoinCandle(db.Model):
+    """
+    CoinCandle model class (for the database) that stores a coin's OHLC candles as
+    returned by CoinGecko's /coins/{id}/ohlc endpoint, synced incrementally by
+    core/candles.py.
+
+    Attributes:
+        coin_id: The CoinGecko identifier of the coin
+        interval: Candle width ("30m", "4h" or "4d")
+        timestamp: Candle time as reported by CoinGecko, in UNIX time (in seconds)
+        open: Opening price (USD)
+        high: Highest price (USD)
+        low: Lowest price (USD)
+        close: Closing price (USD)
+        final: False for the newest, still-forming candle, which is replaced on the
+               next sync
+        fetched_at: Time the candle was fetched, in UNIX time (in seconds)
+    """
+
+    __tablename__ = "coin_candles"
+
+    coin_id = db.Column(db.Text, primary_key=True)
+    interval = db.Column(db.Text, primary_key=True)
+    timestamp = db.Column(db.Integer, primary_key=True)
+    open = db.Column(db.Float, nullable=False)
+    high = db.Column(db.Float, nullable=False)
+    low = db.Column(db.Float, nullable=False)
+    close = db.Column(db.Float, nullable=False)
+    final = db.Column(db.Boolean, nullable=False, default=True)
+    fetched_at = db.Column(db.Integer, default=lambda: int(time.time()), nullable=False)
+
+    def to_json(self):
+        """Returns the candle in CoinGecko's [timestamp_ms, o, h, l, c] shape."""
+        return [self.timestamp * 1000, self.open, self.high, self.low, self.close]
+
+
+class CoinPricePoint(db.Model):
+    """
+    CoinPricePoint model class (for the database) that stores one point of a coin's
+    price / market cap / volume history as returned by CoinGecko's
+    /coins/{id}/market_chart endpoint, synced incrementally by core/candles.py.
+
+    Attributes:
+        coin_id: The CoinGecko identifier of the coin
+        interval: Point spacing ("1h" or "1d")
+        timestamp: Point time as reported by CoinGecko, in UNIX time (in seconds)
+        price: Price (USD)
+        market_cap: Market capitalization (USD)
+        total_volume: 24h trading volume (USD)
+        final: False for the newest (live) point, which is replaced on the next sync
+        fetched_at: Time the point was fetched, in UNIX time (in seconds)
+    """
+
+    __tablename__ = "coin_price_points"
+
+    coin_id = db.Column(db.Text, primary_key=True)
+    interval = db.Column(db.Text, primary_key=True)
+    timestamp = db.Column(db.Integer, primary_key=True)
+    price = db.Column(db.Float, nullable=False)
+    market_cap = db.Column(db.Float)
+    total_volume = db.Column(db.Float)
+    final = db.Column(db.Boolean, nullable=False, default=True)
+    fetched_at = db.Column(db.Integer, default=lambda: int(time.time()), nullable=False)
+
+
+class OpenInterest(db.Model):
+    """
+    OpenInterest model class (for the database) that stores the open (limit and
+    stop) orders of one coin, side and order type across all wallets, so open
+    interest is read from a single row instead of scanning the open transactions.
+
+    Rows are updated incrementally in the same database transaction that opens,
+    fills or cancels an order (see core/open_interest.py), and periodically checked
+    against the transactions table.
+
+    Attributes:
+        coin_id: The CoinGecko identifier of the coin
+        side: The transactionType of the orders ("buy" or "sell")
+        order_type: The orderType of the orders ("limit" or "stop")
+        order_count: Number of open orders
+        quantity: Total quantity of the coin in the open orders
+        notional: Total value of the open orders at their trigger prices (USD), i.e.
+                  what open buy orders reserve from wallet balances
+        updated_at: Time the row last changed, in UNIX time (in seconds)
+    """
+
+    __tablename__ = "open_interest"
+
+    coin_id = db.Column(db.Text, primary_key=True)
+    side = db.Column(db.Text, primary_key=True)
+    order_type = db.Column(db.Text, primary_key=True)
+    order_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    quantity = db.Column(
+        db.Numeric(38, 18),
+        default=Decimal("0"),
+        server_default="0",
+        nullable=False,
+    )
+    notional = db.Column(
+        db.Numeric(38, 8),
+        default=Decimal("0"),
+        server_default="0",
+        nullable=False,
+    )
+    updated_at = db.Column(db.Integer, default=lambda: int(time.time()), nullable=False)
+
+    def to_json(self):
+        """Returns the aggregate as a JSON-serializable dict."""
+        return {
+            "coin_id": self.coin_id,
+            "side": self.side,
+            "orderType": self.order_type,
+            "count": self.order_count,
+            "quantity": self.quantity,
+            "notional": self.notional,
+        }
@@ -9,12 +9,15 @@ This module is intentionally dependency-free (no Flask/SQLAlchemy imports) so it
 can be used from ``models.py`` and the request handlers without circular imports.
 """
 
-from decimal import Decimal, ROUND_HALF_UP, ROUND_DOWN
+from decimal import Context, Decimal, ROUND_HALF_UP, ROUND_DOWN
 
 # Smallest representable units, matching the NUMERIC scales in the schema.
 USD_SCALE = Decimal("1E-8")  # NUMERIC(20, 8)
 QTY_SCALE = Decimal("1E-18")  # NUMERIC(38, 18)
 
+# Wide enough to scale or multiply NUMERIC(38, 18) values without rounding
+_EXACT = Context(prec=80)
+
 # A coin position at or below this is treated as fully closed and removed, so a
 # sell-to-zero doesn't leave a dust key behind. Replaces the old 1e-8 float epsilon.
 DUST_QTY = QTY_SCALE
@@ -46,17 +49,92 @@ def quantize_qty(d: Decimal) -> Decimal:
     return D(d).quantize(QTY_SCALE, rounding=ROUND_DOWN)
 
 
-# ----- JSONB quantity dict helpers -------------------------------------------
-# Wallet.assets / reserved_assets are JSONB dicts {coin_id: quantity}. JSON has
-# no decimal type, so quantities are stored as decimal STRINGS and converted at
-# the boundary with these helpers.
+def usd_product(quantity, price) -> Decimal:
+    """quantity x price rounded to the stored USD scale (half-up, as quantize_usd).
+
+    The product is computed exactly before rounding: in the default 28-digit context
+    a NUMERIC(38, 18) quantity times a price can be rounded twice.
+    """
+    return _EXACT.multiply(D(quantity), D(price)).quantize(
+        USD_SCALE, rounding=ROUND_HALF_UP, context=_EXACT
+    )
+
+
+# ----- Quantity dict helpers -------------------------------------------------
+# Wallet.assets / reserved_assets are {coin_id: quantity} dicts derived from the
+# holdings table.
 
 
 def qty_get(d: dict, coin_id: str) -> Decimal:
-    """Read a coin quantity from a JSONB dict as ``Decimal`` (0 if absent)."""
+    """Read a coin quantity from a quantity dict as ``Decimal`` (0 if absent)."""
     return D(d.get(coin_id, "0"))
 
 
-def qty_set(d: dict, coin_id: str, quantity: Decimal) -> None:
-    """Write a coin quantity into a JSONB dict as a decimal string."""
-    d[coin_id] = str(quantize_qty(quantity))
+# ----- Fixed-point integer kernel ---------------------------------------------
+# Aggregates that sum many amounts (open interest, positions and their PnL) run on
+# plain ints counting the smallest stored unit: USD in 1e-8 units, quantities in
+# 1e-18 units. Conversions round exactly like quantize_usd (half-up) and
+# quantize_qty (down), so usd_units(x) == quantize_usd(x) * 10**8 for every x, and
+# products are exact. The wallet and transaction hot paths stay on Decimal, which is
+# C (libmpdec) in CPython and faster there than converting to and from ints (see
+# bench/bench_money.py; tests/test_money.py checks the parity).
+
+USD_UNITS = 10**8
+QTY_UNITS = 10**18
+DUST_UNITS = 1  # DUST_QTY in quantity units
+# Market prices (valuation, fills) keep 18 decimals: 8 would lose most of the
+# precision of sub-cent coins, whose holdings can run into the billions.
+PRICE_UNITS = 10**18
+
+
+
+def _div_half_up(n: int, d: int) -> int:
+    q, r = divmod(abs(n), d)
+    if 2 * r >= d:
+        q += 1
+    return q if n >= 0 else -q
+
+
+def _to_units(x, places: int, rounding: str) -> int:
+    if type(x) is int:
+        return x * 10**places
+    # scaleb under _EXACT never rounds; to_integral_value then rounds exactly like
+    # quantize() does at the same scale
+    return int(D(x).scaleb(places, _EXACT).to_integral_value(rounding))
+
+
+def usd_units(x) -> int:
+    """USD amount -> int count of 1e-8 USD, rounded half-up (see quantize_usd)."""
+    return _to_units(x, 8, ROUND_HALF_UP)
+
+
+def qty_units(x) -> int:
+    """Coin quantity -> int count of 1e-18 coins, rounded down (see quantize_qty)."""
+    return _to_units(x, 18, ROUND_DOWN)
+
+
+def price_units(x) -> int:
+    """Market price -> int count of 1e-18 USD, rounded half-up."""
+    return _to_units(x, 18, ROUND_HALF_UP)
+
+
+def usd_from_units(units: int) -> Decimal:
+    """int count of 1e-8 USD -> ``Decimal`` at the stored scale."""
+    return Decimal(units).scaleb(-8, _EXACT)
+
+
+def qty_from_units(units: int) -> Decimal:
+    """int count of 1e-18 coins -> ``Decimal`` at the stored scale."""
+    return Decimal(units).scaleb(-18, _EXACT)
+
+
+def value_units(quantity: int, price: int) -> int:
+    """USD units of quantity x market price (quantity and price units), rounded
+    half-up."""
+    return _div_half_up(quantity * price, QTY_UNITS * PRICE_UNITS // USD_UNITS)
+
+
+def pro_rata_units(total: int, part: int, whole: int) -> int:
+    """The share part / whole of an amount in units (e.g. the cost basis of part of
+    a position), rounded half-up."""
+    return _div_half_up(total * part, whole)
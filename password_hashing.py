@@ -0,0 +1,131 @@
+"""Password hashing offloaded to a bounded process pool.
+
+werkzeug's scrypt KDF is deliberately expensive (tens of milliseconds of pure CPU
+per call). Running it on the request thread pins a sync gunicorn worker for the
+whole hash, so a login burst starves every other endpoint. Hashes run in a small
+``ProcessPoolExecutor`` instead (separate processes, so they also escape the GIL),
+behind a bounded number of in-flight slots:
+
+- If every slot is taken the call is rejected immediately rather than queueing
+  behind the burst (``PasswordHashingUnavailable``), so the caller can answer 503.
+- A call that exceeds PASSWORD_HASH_TIMEOUT_SECONDS is abandoned with the same
+  exception; its slot is only freed once the worker actually finishes, so the pool
+  can never be oversubscribed by abandoned work.
+
+Per-call latency is recorded in ``HASH_LATENCY`` / ``VERIFY_LATENCY`` and logged
+periodically (see metrics.register_stats).
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from constants import (
+    PASSWORD_HASH_MAX_IN_FLIGHT,
+    PASSWORD_HASH_POOL_WORKERS,
+    PASSWORD_HASH_TIMEOUT_SECONDS,
+)
+from metrics import LatencyHistogram, register_stats
+
+HASH_LATENCY = LatencyHistogram("password_hash")
+VERIFY_LATENCY = LatencyHistogram("password_verify")
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_IN_FLIGHT)
+
+
+class PasswordHashingUnavailable(Exception):
+    """Raised when the hashing pool is saturated or a call misses its latency budget."""
+
+
+def _get_pool():
+    """Returns this process's hashing pool, creating it on first use.
+
+    The pool is created lazily and tied to the creating PID: gunicorn imports the app
+    in the master and then forks, and a pool inherited across a fork has no live
+    worker processes behind it.
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_POOL_WORKERS)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _discard_pool():
+    """Drops a broken pool so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _run(histogram: LatencyHistogram, fn, *args):
+    """Runs ``fn(*args)`` on the hashing pool within the slot and latency limits."""
+    if not _slots.acquire(blocking=False):
+        histogram.record_rejection()
+        raise PasswordHashingUnavailable("Password hashing pool is saturated")
+
+    start = time.perf_counter()
+    try:
+        future = _get_pool().submit(fn, *args)
+    except (BrokenProcessPool, RuntimeError) as exc:
+        _slots.release()
+        _discard_pool()
+        raise PasswordHashingUnavailable("Password hashing pool is unavailable") from exc
+
+    # Free the slot when the worker finishes, not when we stop waiting for it.
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        return future.result(timeout=PASSWORD_HASH_TIMEOUT_SECONDS)
+    except FutureTimeoutError as exc:
+        histogram.record_timeout()
+        logging.warning(
+            "%s exceeded its %ss budget", histogram.name, PASSWORD_HASH_TIMEOUT_SECONDS
+        )
+        raise PasswordHashingUnavailable("Password hashing timed out") from exc
+    except BrokenProcessPool as exc:
+        _discard_pool()
+        raise PasswordHashingUnavailable("Password hashing pool is unavailable") from exc
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+def hash_password(password: str) -> str:
+    """Returns a salted werkzeug hash of ``password``, computed off the request thread.
+
+    Raises:
+        PasswordHashingUnavailable: If the pool is saturated or the call times out.
+    """
+    return _run(HASH_LATENCY, generate_password_hash, password)
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """Checks ``password`` against ``password_hash``, computed off the request thread.
+
+    Raises:
+        PasswordHashingUnavailable: If the pool is saturated or the call times out.
+    """
+    return _run(VERIFY_LATENCY, check_password_hash, password_hash, password)
+
+
+def get_password_hashing_stats() -> dict:
+    """Returns latency/rejection counters for hashing and verification."""
+    return {
+        "hash": HASH_LATENCY.snapshot(),
+        "verify": VERIFY_LATENCY.snapshot(),
+    }
+
+
+register_stats("password_hashing", get_password_hashing_stats)
@@ -0,0 +1,58 @@
+"""Rebuilds the positions table (see core/positions.py) from the transactions.
+
+Runs in the release step after `flask db upgrade` (see the Procfile) to backfill the
+positions of the wallets that predate 0013_positions, and can be run at any time to
+repair them:
+
+    python replay_positions.py                  # wallets not replayed yet
+    python replay_positions.py --all            # every wallet
+    python replay_positions.py <wallet_id> ...  # only these wallets
+
+Each wallet is replayed and committed under its row lock, so this can run while the
+app is serving orders, and is idempotent: once every wallet has been replayed, the
+default mode finds nothing to do. /get_positions_pnl refuses a wallet until it has
+been replayed (see Wallet.positions_replayed_at).
+"""
+
+import logging
+import sys
+
+from app import app
+from core.app import _lock_wallet
+from core.positions import replay_positions
+from extensions import db
+from models import Wallet
+
+
+def main(args):
+    with app.app_context():
+        if args == ["--all"]:
+            wallet_ids = db.session.scalars(db.select(Wallet.id)).all()
+        elif not args:
+            wallet_ids = db.session.scalars(
+                db.select(Wallet.id).where(Wallet.positions_replayed_at.is_(None))
+            ).all()
+        else:
+            wallet_ids = args
+
+        failed = 0
+        for wallet_id in wallet_ids:
+            try:
+                if _lock_wallet(wallet_id) is None:
+                    db.session.rollback()
+                    print(f"Wallet {wallet_id} not found")
+                    failed += 1
+                    continue
+                fills = replay_positions(wallet_id)
+                db.session.commit()
+                print(f"Wallet {wallet_id}: replayed {fills} fills")
+            except Exception:
+                db.session.rollback()
+                logging.exception("Failed to replay the positions of %s", wallet_id)
+                failed += 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
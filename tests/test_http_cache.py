@@ -0,0 +1,59 @@
+"""Precompressed variants served by http_cache.cached_json_response."""
+
+import gzip
+
+import brotli
+import orjson
+import pytest
+from flask import Flask
+from flask_compress import Compress
+
+import http_cache
+
+# Highly compressible: the br variant is far below MIN_COMPRESS_SIZE
+LARGE_PAYLOAD = {"coins": [{"id": "bitcoin", "price": 1.0}] * 500}
+SMALL_PAYLOAD = {"id": "bitcoin"}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    Compress(app)
+    builds = []
+
+    @app.route("/<name>")
+    def resource(name):
+        payload = LARGE_PAYLOAD if name == "large" else SMALL_PAYLOAD
+
+        def build():
+            builds.append(name)
+            return payload
+
+        return http_cache.cached_json_response(f"test:{name}", 1, build)
+
+    http_cache._bodies.clear()
+    client = app.test_client()
+    client.builds = builds
+    return client
+
+
+@pytest.mark.parametrize("encoding, decompress", [
+    ("br", brotli.decompress),
+    ("gzip", gzip.decompress),
+])
+def test_large_body_is_served_precompressed(client, encoding, decompress):
+    identity_etag = http_cache.etag_for("test:large", 1)
+    for _ in range(2):
+        response = client.get("/large", headers={"Accept-Encoding": encoding})
+        assert response.headers["Content-Encoding"] == encoding
+        assert response.headers["ETag"] == f'"{identity_etag}-{encoding}"'
+        assert len(response.data) < http_cache.MIN_COMPRESS_SIZE
+        assert orjson.loads(decompress(response.data)) == LARGE_PAYLOAD
+    assert client.builds == ["large"]
+
+
+def test_small_body_is_sent_as_identity(client):
+    response = client.get("/small", headers={"Accept-Encoding": "br"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == f'"{http_cache.etag_for("test:small", 1)}"'
+    assert orjson.loads(response.data) == SMALL_PAYLOAD
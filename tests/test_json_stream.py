@@ -0,0 +1,46 @@
+"""stream_json_object must produce the same JSON as jsonify."""
+
+import json
+from decimal import Decimal
+
+import pytest
+from flask import Flask, jsonify
+
+from json_provider import get_json_provider_class
+from json_stream import STREAM_BATCH_SIZE, stream_json_object
+
+
+@pytest.fixture(params=["stdlib", "orjson"])
+def app(request):
+    app = Flask(__name__)
+    app.json = get_json_provider_class(request.param)(app)
+    return app
+
+
+@pytest.mark.parametrize(
+    "length", [0, 1, STREAM_BATCH_SIZE - 1, STREAM_BATCH_SIZE, 2 * STREAM_BATCH_SIZE + 1]
+)
+def test_streamed_object_matches_jsonify(app, length):
+    timestamps = list(range(1_700_000_000, 1_700_000_000 + length))
+    balances = [Decimal("1000.01") + i for i in range(length)]
+    assets = [i / 3 for i in range(length)]
+
+    def fields():
+        return {
+            "balance": zip(timestamps, balances),
+            "assets": zip(timestamps, assets),
+            "empty": iter(()),
+        }
+
+    with app.app_context():
+        expected = json.loads(jsonify({k: list(v) for k, v in fields().items()}).data)
+        response = stream_json_object(fields())
+        assert response.is_streamed
+        body = b"".join(response.response)
+
+    assert json.loads(body) == expected
+
+
+def test_empty_object(app):
+    with app.app_context():
+        assert b"".join(stream_json_object({}).response) == b"{}"
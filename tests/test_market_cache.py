@@ -0,0 +1,67 @@
+"""Single-flight synchronous fetches in market_cache.CachedSnapshot."""
+
+import threading
+
+from core.market_cache import CachedSnapshot
+
+CALLERS = 16
+
+
+def _call_concurrently(snapshot: CachedSnapshot) -> list:
+    results = [None] * CALLERS
+
+    def call(i):
+        try:
+            results[i] = snapshot.get_versioned()
+        except Exception as exc:
+            results[i] = exc
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+def test_cold_start_fetches_once():
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(timeout=5)
+        return {"coins": []}
+
+    snapshot = CachedSnapshot(fetch, ttl=60, max_stale=600)
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results = _call_concurrently(snapshot)
+    timer.join()
+
+    assert len(calls) == 1
+    assert all(result == ({"coins": []}, 1, snapshot.updated_at) for result in results)
+
+
+def test_failed_fetch_is_shared_and_retried():
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(timeout=5)
+        if len(calls) == 1:
+            raise RuntimeError("rate limited")
+        return "fresh"
+
+    snapshot = CachedSnapshot(fetch, ttl=60, max_stale=600)
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results = _call_concurrently(snapshot)
+    timer.join()
+
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    # The failure is not cached: the next caller fetches again
+    assert snapshot.get() == "fresh"
+    assert len(calls) == 2
@@ -0,0 +1,128 @@
+"""Parity of the fixed-point integer kernel with the Decimal helpers in money.py."""
+
+import math
+import random
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from money import (
+    QTY_UNITS,
+    USD_UNITS,
+    pro_rata_units,
+    price_units,
+    qty_from_units,
+    qty_units,
+    quantize_qty,
+    quantize_usd,
+    usd_from_units,
+    usd_product,
+    usd_units,
+    value_units,
+)
+
+SAMPLES = 20_000
+
+
+def _random_amount(rng: random.Random, max_digits: int = 10, places: int = 24):
+    """A Decimal, float or int amount, including exact rounding ties."""
+    kind = rng.randrange(4)
+    if kind == 0:
+        return rng.randrange(-(10**max_digits), 10**max_digits)
+    if kind == 1:
+        return rng.uniform(-(10**max_digits), 10**max_digits)
+    digits = rng.randrange(10 ** (max_digits + places))
+    amount = Decimal(digits).scaleb(-places)
+    if kind == 3:
+        # A tie at the USD scale (5 right after the 8th decimal)
+        amount = Decimal(digits // 10**15 * 10 + 5).scaleb(-9)
+    return -amount if rng.random() < 0.5 else amount
+
+
+def _round_half_up(value: Fraction) -> int:
+    rounded = math.floor(abs(value) + Fraction(1, 2))
+    return rounded if value >= 0 else -rounded
+
+
+@pytest.fixture
+def rng():
+    return random.Random(48)
+
+
+def test_usd_units_round_like_quantize_usd(rng):
+    for _ in range(SAMPLES):
+        amount = _random_amount(rng)
+        assert usd_units(amount) == quantize_usd(amount) * USD_UNITS
+        assert usd_from_units(usd_units(amount)) == quantize_usd(amount)
+
+
+def test_qty_units_round_like_quantize_qty(rng):
+    for _ in range(SAMPLES):
+        amount = _random_amount(rng, max_digits=8)
+        assert qty_units(amount) == quantize_qty(amount) * QTY_UNITS
+        assert qty_from_units(qty_units(amount)) == quantize_qty(amount)
+
+
+def test_rounding_ties():
+    assert usd_units(Decimal("0.000000005")) == 1
+    assert usd_units(Decimal("-0.000000005")) == -1
+    assert usd_units(Decimal("0.0000000049999")) == 0
+    assert qty_units(Decimal("0.0000000000000000019")) == 1
+    assert qty_units(Decimal("-0.0000000000000000019")) == -1
+    assert quantize_usd(Decimal("0.000000005")) == Decimal("0.00000001")
+    assert quantize_qty(Decimal("-0.0000000000000000019")) == Decimal("-1E-18")
+
+
+def test_usd_product_is_exact(rng):
+    for _ in range(SAMPLES):
+        quantity = quantize_qty(abs(_random_amount(rng, max_digits=8)))
+        price = quantize_usd(abs(_random_amount(rng, max_digits=6)))
+        expected = _round_half_up(Fraction(quantity) * Fraction(price) * USD_UNITS)
+        assert usd_product(quantity, price) * USD_UNITS == expected
+
+
+def test_usd_product_matches_value_units(rng):
+    for _ in range(SAMPLES):
+        quantity = abs(_random_amount(rng, max_digits=8))
+        price = abs(_random_amount(rng, max_digits=6))
+        units = value_units(qty_units(quantity), price_units(price))
+        full_price = Decimal(price_units(price)).scaleb(-18)
+        assert usd_units(usd_product(quantize_qty(quantity), full_price)) == units
+
+
+def test_usd_product_avoids_double_rounding():
+    # The exact product is 21484.811329534999999999999995; the default 28-digit
+    # context rounds it to 21484.81132953500000000000000 first, a tie that
+    # quantize_usd would then round up
+    quantity = Decimal("1.740269733355406500")
+    price = Decimal("12345.67890123")
+    assert quantize_usd(quantity * price) == Decimal("21484.81132954")
+    assert usd_product(quantity, price) == Decimal("21484.81132953")
+
+
+def test_value_units_is_exact(rng):
+    for _ in range(SAMPLES):
+        quantity = qty_units(abs(_random_amount(rng, max_digits=8)))
+        price = price_units(abs(_random_amount(rng, max_digits=6)))
+        expected = _round_half_up(
+            Fraction(quantity, QTY_UNITS) * Fraction(price, QTY_UNITS) * USD_UNITS
+        )
+        assert value_units(quantity, price) == expected
+
+
+def test_pro_rata_units(rng):
+    for _ in range(SAMPLES):
+        total = usd_units(_random_amount(rng))
+        whole = rng.randrange(1, 10**30)
+        part = rng.randrange(whole + 1)
+        assert pro_rata_units(total, part, whole) == _round_half_up(
+            Fraction(total * part, whole)
+        )
+    assert pro_rata_units(123, 7, 7) == 123
+    assert pro_rata_units(-5, 1, 2) == -3
+
+
+def test_float_amounts_use_their_shortest_repr():
+    assert usd_units(0.1) == 10_000_000
+    assert qty_units(0.1) == 10**17
@@ -7,6 +7,10 @@ from core.app import (
     update_open_trades_in_background,
     update_user_wallet_value_in_background,
 )
+from core.news import update_news_articles_in_background
+from core.open_interest import check_open_interest_in_background
+from core.price_series import update_price_series_in_background
+from core.social import update_social_metrics_in_background
 
 
 def main():
@@ -14,7 +18,7 @@ def main():
     Dedicated single worker process that runs the background tasks.
 
     Mirrors the thread-start logic in app.py's `__main__` block so that limit/stop
-    orders auto-execute and wallet values update in production (where gunicorn serves
+    orders auto-execute and wallet values and the news store update in production (where gunicorn serves
     the web process and never runs that block). supervise_threads starts each task as
     a daemon thread and restarts any that die, then blocks the main thread forever.
     """
@@ -22,6 +26,10 @@ def main():
         [
             ("wallet-value-updater", update_user_wallet_value_in_background),
             ("open-trade-executor", update_open_trades_in_background),
+            ("news-updater", update_news_articles_in_background),
+            ("social-metrics-updater", update_social_metrics_in_background),
+            ("price-series-updater", update_price_series_in_background),
+            ("open-interest-checker", check_open_interest_in_background),
         ]
     )
 